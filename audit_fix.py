@@ -10,7 +10,7 @@ import shutil
 from pathlib import Path
 
 # Base directory
-BASE_DIR = Path(r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public")
+BASE_DIR = Path(os.environ.get("MOCYNO_PUBLIC_DIR") or Path(__file__).resolve().parent / "public")
 
 # Canonical nav blocks
 CANONICAL_FR = '''<nav class="links" role="navigation" aria-label="Navigation principale">
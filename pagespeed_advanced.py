@@ -2,7 +2,8 @@
 """
 PageSpeed Advanced Fixes Script
 Fixes:
-1. Swiper CSS: Add preload
+1. Swiper CSS: serve the local public/swiper-bundle.min.css instead of the CDN
+   (preload / preconnect hints are computed per page: mocyno-seo fix hints)
 2. Images: Add lazy loading to below-the-fold images
 3. CLS: Add width/height to images without dimensions
 """
@@ -11,12 +12,11 @@ import os
 import re
 from pathlib import Path
 
-BASE_DIR = Path(r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public")
+BASE_DIR = Path(os.environ.get("MOCYNO_PUBLIC_DIR") or Path(__file__).resolve().parent / "public")
 
-# Fix 1: Swiper CSS preload
+# Fix 1: Swiper CSS from the local copy (no third-party connection, no hard-coded hint)
 OLD_SWIPER_CSS = r'<link rel="stylesheet" href="https://cdn\.jsdelivr\.net/npm/swiper@11/swiper-bundle\.min\.css"\s*/?>'
-NEW_SWIPER_CSS = '''<link rel="preload" href="https://cdn.jsdelivr.net/npm/swiper@11/swiper-bundle.min.css" as="style" onload="this.onload=null;this.rel='stylesheet'">
-  <noscript><link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/swiper@11/swiper-bundle.min.css"></noscript>'''
+NEW_SWIPER_CSS = '<link rel="stylesheet" href="/swiper-bundle.min.css">'
 
 def fix_file(filepath):
     """Apply PageSpeed fixes to a single file."""
@@ -30,10 +30,10 @@ def fix_file(filepath):
     
     original = content
     
-    # Fix 1: Swiper CSS preload
+    # Fix 1: Swiper CSS from the local copy
     if re.search(OLD_SWIPER_CSS, content):
         content = re.sub(OLD_SWIPER_CSS, NEW_SWIPER_CSS, content)
-        changes.append("Swiper CSS: added preload")
+        changes.append("Swiper CSS: local copy")
     
     # Fix 2: Add lazy loading to images (except hero images which have loading="eager")
     # Match img tags without loading attribute (but not ones that already have loading="eager")
@@ -10,7 +10,7 @@ import os
 import re
 from pathlib import Path
 
-BASE_DIR = Path(r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public")
+BASE_DIR = Path(os.environ.get("MOCYNO_PUBLIC_DIR") or Path(__file__).resolve().parent / "public")
 
 # Old GTM pattern (synchronous inline)
 OLD_GTM_PATTERN = r'''  <!-- Google Tag Manager -->
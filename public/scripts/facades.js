@@ -0,0 +1,85 @@
+/* facades.js - MO'CYNO - chargement differe des widgets tiers
+ * Genere par scripts/mocyno_seo/facades.py (mocyno-seo fix facades --write-loader) :
+ * modifier WIDGETS dans facades.py puis regenerer, ne pas editer a la main.
+ */
+(function () {
+  'use strict';
+  var WIDGETS = {
+    "gtm": {
+      "trigger": "load",
+      "delay": 100
+    },
+    "tawk": {
+      "trigger": "interaction",
+      "delay": 3000,
+      "crossorigin": "*"
+    },
+    "maps": {
+      "trigger": "click",
+      "delay": 0,
+      "frame": true
+    }
+  };
+  var HOOKS = {
+    gtm: function () {
+      window.dataLayer = window.dataLayer || [];
+      window.dataLayer.push({ 'gtm.start': new Date().getTime(), event: 'gtm.js' });
+    },
+    tawk: function () {
+      window.Tawk_API = window.Tawk_API || {};
+      window.Tawk_LoadStart = new Date();
+    }
+  };
+
+  function load(el, name, conf) {
+    if (el.getAttribute('data-facade-loaded')) return;
+    el.setAttribute('data-facade-loaded', '1');
+    var src = el.getAttribute('data-src');
+    if (HOOKS[name]) HOOKS[name]();
+    if (conf.frame) {
+      var f = document.createElement('iframe');
+      f.src = src;
+      f.title = el.getAttribute('data-title') || '';
+      f.width = el.getAttribute('data-width') || '100%';
+      f.height = el.getAttribute('data-height') || '450';
+      f.loading = 'lazy';
+      f.style.border = '0';
+      f.setAttribute('allowfullscreen', '');
+      f.setAttribute('referrerpolicy', 'no-referrer-when-downgrade');
+      el.parentNode.replaceChild(f, el);
+      return;
+    }
+    var s = document.createElement('script');
+    s.async = true;
+    s.src = src;
+    s.charset = 'UTF-8';
+    if (conf.crossorigin) s.setAttribute('crossorigin', conf.crossorigin);
+    document.head.appendChild(s);
+  }
+
+  function arm(el) {
+    var name = el.getAttribute('data-facade'), conf = WIDGETS[name];
+    if (!conf) return;
+    var run = function () { load(el, name, conf); };
+    if (conf.trigger === 'click') {
+      el.addEventListener('click', run);
+      el.addEventListener('keydown', function (e) { if (e.key === 'Enter' || e.key === ' ') run(); });
+      return;
+    }
+    if (conf.trigger === 'load') {
+      var later = function () { setTimeout(run, conf.delay); };
+      if (document.readyState === 'complete') later(); else window.addEventListener('load', later);
+      return;
+    }
+    var events = ['scroll', 'mousemove', 'touchstart', 'click', 'keydown'];
+    var once = function () {
+      events.forEach(function (e) { window.removeEventListener(e, once); });
+      run();
+    };
+    events.forEach(function (e) { window.addEventListener(e, once, { passive: true, once: true }); });
+    if (conf.delay) setTimeout(once, conf.delay);
+  }
+
+  var nodes = document.querySelectorAll('[data-facade]');
+  for (var i = 0; i < nodes.length; i++) arm(nodes[i]);
+})();
@@ -3,7 +3,11 @@ import json
 with open('firebase.json', 'r', encoding='utf-8') as f:
     data = json.load(f)
 
-redirects = data.get('hosting', {}).get('redirects', [])
+hosting = data.get('hosting', {})
+# firebase.json may declare several hosting targets
+if isinstance(hosting, list):
+    hosting = hosting[0] if hosting else {}
+redirects = hosting.get('redirects', [])
 print(f"Total redirects: {len(redirects)}")
 
 sources = {}
@@ -115,8 +115,8 @@ def find_missing_pages(sitemap_urls):
     for pattern in ["fr/**/*.html", "en/**/*.html"]:
         html_files.extend(PUBLIC_DIR.glob(pattern))
     
-    # Exclut les pages légales (noindex)
-    excluded_patterns = ["mentions-legales", "politique-confidentialite", "cookies", "legal", "privacy"]
+    # Exclut les pages hors sitemap (legales, systeme) : categories de mocyno_seo/classify.py
+    from mocyno_seo.classify import category_of
     
     sitemap_paths = set()
     for url in sitemap_urls:
@@ -124,8 +124,8 @@ def find_missing_pages(sitemap_urls):
         sitemap_paths.add(file_path.resolve())
     
     for html_file in html_files:
-        # Skip si c'est une page légale
-        if any(pattern in str(html_file) for pattern in excluded_patterns):
+        # Skip si la categorie n'est pas listee dans les sitemaps
+        if not category_of(html_file.relative_to(PUBLIC_DIR).as_posix()).sitemap:
             continue
         
         if html_file.resolve() not in sitemap_paths:
@@ -290,7 +290,11 @@ def parse_firebase_redirects():
     with open(FIREBASE_JSON_PATH, 'r', encoding='utf-8') as f:
         config = json.load(f)
     
-    return config.get('hosting', {}).get('redirects', [])
+    hosting = config.get('hosting', {})
+    # firebase.json peut declarer plusieurs cibles hosting
+    if isinstance(hosting, list):
+        hosting = hosting[0] if hosting else {}
+    return hosting.get('redirects', [])
 
 
 def audit_firebase_redirects():
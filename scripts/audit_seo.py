@@ -4,8 +4,8 @@ import json
 from datetime import datetime
 from html.parser import HTMLParser
 
-ROOT_DIR = r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public"
-OUTPUT_FILE = r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\scripts\audit_results.json"
+ROOT_DIR = os.environ.get("MOCYNO_PUBLIC_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public")
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_results.json")
 
 class SEOParser(HTMLParser):
     def __init__(self):
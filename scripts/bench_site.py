@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Benchmark audits and fixers on synthetic 100 / 1,000 / 10,000-page sites.
+See mocyno_seo/bench.py (python scripts/bench_site.py --help).
+"""
+
+import sys
+
+from mocyno_seo.bench import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Build dist/ from public/ through the mocyno_seo rule pipeline.
+See mocyno_seo/build.py (python scripts/build_site.py --help).
+"""
+
+import sys
+
+from mocyno_seo.build import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Reverse-dependency index: which pages and sitemap entries reference a file.
+See mocyno_seo/deps.py (python scripts/deps_index.py --help).
+"""
+
+import sys
+
+from mocyno_seo.deps import main
+
+if __name__ == "__main__":
+    sys.exit(main())
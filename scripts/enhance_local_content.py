@@ -1,7 +1,8 @@
 import os
 import re
 
-FR_ZONES_DIR = r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public\fr\zones"
+ROOT_DIR = os.environ.get("MOCYNO_PUBLIC_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public")
+FR_ZONES_DIR = os.path.join(ROOT_DIR, "fr", "zones")
 
 def enhance_zones():
     if not os.path.exists(FR_ZONES_DIR):
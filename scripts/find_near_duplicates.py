@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate pages and repeated paragraphs across public/.
+See mocyno_seo/neardup.py (python scripts/find_near_duplicates.py --help).
+"""
+
+import sys
+
+from mocyno_seo.neardup import main
+
+if __name__ == "__main__":
+    sys.exit(main())
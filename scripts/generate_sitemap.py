@@ -3,7 +3,7 @@ import os
 import re
 from datetime import datetime
 
-ROOT_DIR = r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public"
+ROOT_DIR = os.environ.get("MOCYNO_PUBLIC_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public")
 SITEMAP_FILE = os.path.join(ROOT_DIR, "sitemap.xml")
 
 # Pages to strictly exclude
@@ -1,7 +1,7 @@
 import os
 
 # Configuration
-ROOT_DIR = r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public"
+ROOT_DIR = os.environ.get("MOCYNO_PUBLIC_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public")
 TARGET_URL = "https://teleservices-cnaps.interieur.gouv.fr/teleservices/ihm/#/morale/search"
 LINK_HTML = f'<a href="{TARGET_URL}" target="_blank" rel="noopener noreferrer" style="color:#fff;text-decoration:underline;">AUT-83-2124-09-09-20250998415</a>'
 
@@ -2,7 +2,7 @@ import os
 import shutil
 import re
 
-ROOT_DIR = r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public"
+ROOT_DIR = os.environ.get("MOCYNO_PUBLIC_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public")
 FR_DIR = os.path.join(ROOT_DIR, "fr")
 EN_DIR = os.path.join(ROOT_DIR, "en")
 MOBILE_DIR = os.path.join(ROOT_DIR, "mobile")
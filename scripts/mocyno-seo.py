@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+mocyno-seo: single entry point for the SEO tooling.
+See mocyno_seo/cli.py (python scripts/mocyno-seo.py --help).
+"""
+
+import sys
+
+from mocyno_seo.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""
+MO'CYNO SEO toolkit
+Shared engine for the site fixers and audits in scripts/.
+
+The legacy scripts each walk public/ on their own and rewrite files in
+place. This package holds the pieces they have in common (site layout,
+rule pipeline, build output) so new tooling reads public/ as source and
+writes its results elsewhere.
+"""
+
+__version__ = "0.1.0"
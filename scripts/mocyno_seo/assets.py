@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+ASSETS - duplicate and orphan binary assets
+Hashes every image, font and media file of the site (app shells aside)
+and sorts them against the reverse-dependency index (deps.py):
+
+  duplicate  byte-identical to another file; one copy per content is
+             canonical (most referrers, then the shortest path)
+  orphan     referenced by no page, stylesheet or sitemap, and its name
+             appears in no other file (JS, JSON, manifests, JSON-LD)
+
+Only files sharing a size are hashed (blake2b), so a run reads a few
+duplicates' bytes, not the whole asset tree.
+
+The build applies the plan to dist/ (public/ is never touched): links to
+a dropped copy are rewritten to the canonical one by a UrlMapRule, and
+dropped copies and orphans are left out of the output. A copy is only
+dropped when every reference to it is one the rewrite reaches (a page's
+root-relative or absolute URL); a stylesheet, a relative link or a
+mention in a script keeps it deployed.
+
+    python scripts/mocyno-seo.py images assets              # groups, orphans, bytes saved
+    python scripts/mocyno-seo.py images assets --map dedupe.csv
+    python scripts/build_site.py --prune-assets             # rewrite + prune into dist/
+"""
+
+import argparse
+import hashlib
+import posixpath
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .caching import STATIC_EXTENSIONS
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR
+from .deps import DEFAULT_DB, DependencyIndex
+from .findings import INFO, WARN, Finding, write_jsonl
+from .pagemodel import site_path
+from .loader import read_text
+from .site import is_app_shell, is_site_page, iter_site_files
+from .urlmap import UrlMap, UrlMapRule
+
+TEXT_EXTENSIONS = ("html", "css", "js", "mjs", "json", "webmanifest", "xml", "txt")
+# Asset URLs and names as they appear in scripts, JSON and JSON-LD
+_MENTION = re.compile(r"[\w:/.%@-]*\.(?:" + "|".join(STATIC_EXTENSIONS) + r")\b", re.IGNORECASE)
+
+
+def _extension(rel: str) -> str:
+    return rel.rsplit(".", 1)[-1].lower() if "." in posixpath.basename(rel) else ""
+
+
+def is_asset(rel: str) -> bool:
+    return _extension(rel) in STATIC_EXTENSIONS and not is_app_shell(rel)
+
+
+def content_groups(public_dir: Path, files: Sequence[str]) -> List[List[str]]:
+    """Groups of byte-identical files (two or more), each sorted."""
+    by_size: Dict[int, List[str]] = defaultdict(list)
+    for rel in files:
+        by_size[(public_dir / rel).stat().st_size].append(rel)
+    by_hash: Dict[str, List[str]] = defaultdict(list)
+    for size, rels in by_size.items():
+        if len(rels) < 2 or not size:
+            continue
+        for rel in rels:
+            by_hash[hashlib.blake2b((public_dir / rel).read_bytes(), digest_size=16).hexdigest()].append(rel)
+    return sorted(sorted(rels) for rels in by_hash.values() if len(rels) > 1)
+
+
+def _mention_keys(text: str, rel: str) -> Set[str]:
+    """
+    Site paths ("/images/x.png") of the root-relative and absolute asset
+    URLs in text, bare lowercase names ("x.png") for everything else: a
+    relative name in a script resolves against the document running it,
+    so only its name is known.
+    """
+    keys = set()
+    for token in set(_MENTION.findall(text)):
+        path = site_path(token, rel) if token.startswith(("/", "http:", "https:")) else None
+        keys.add(path if path else posixpath.basename(token).lower())
+    return keys
+
+
+def mentions(public_dir: Path, files: Sequence[str]) -> Dict[str, Set[str]]:
+    """{site path or bare name: text files mentioning it}, app shells and pages included."""
+    out: Dict[str, Set[str]] = defaultdict(set)
+    for rel in files:
+        if _extension(rel) not in TEXT_EXTENSIONS:
+            continue
+        for key in _mention_keys((public_dir / rel).read_bytes().decode("utf-8", "replace"), rel):
+            out[key].add(rel)
+    return out
+
+
+class Duplicate:
+    """One dropped copy and the canonical file its links move to."""
+
+    __slots__ = ("rel", "canonical", "size", "kept")
+
+    def __init__(self, rel: str, canonical: str, size: int, kept: str = ""):
+        self.rel = rel
+        self.canonical = canonical
+        self.size = size
+        # Why the copy stays deployed ("" when the build drops it)
+        self.kept = kept
+
+
+class AssetPlan:
+    """Duplicates and orphans of one tree, and what the build does with them."""
+
+    def __init__(self):
+        self.assets = 0
+        self.groups: List[List[str]] = []
+        self.duplicates: List[Duplicate] = []
+        # (rel, size, note)
+        self.orphans: List[Tuple[str, int, str]] = []
+
+    @property
+    def drop(self) -> Set[str]:
+        """Files the build leaves out of dist/."""
+        return {d.rel for d in self.duplicates if not d.kept} | {rel for rel, _, _ in self.orphans}
+
+    @property
+    def saved(self) -> int:
+        return sum(d.size for d in self.duplicates if not d.kept) + sum(size for _, size, _ in self.orphans)
+
+    def urlmap(self) -> UrlMap:
+        return UrlMap(("/" + d.rel, "/" + d.canonical) for d in self.duplicates if not d.kept)
+
+    def findings(self) -> List[Finding]:
+        out = [Finding("assets/duplicate", WARN, d.rel,
+                       f"identical to {d.canonical} ({d.size // 1024} KB)" + (f", kept: {d.kept}" if d.kept else ""),
+                       key=d.canonical)
+               for d in self.duplicates]
+        out.extend(Finding("assets/orphan", INFO if note else WARN, rel,
+                           f"referenced nowhere ({size // 1024} KB)" + (f", {note}" if note else ""), key="orphan")
+                   for rel, size, note in self.orphans)
+        return out
+
+
+class DedupeRule(UrlMapRule):
+    """Build rule pointing links at the canonical copy of each dropped duplicate."""
+
+    name = "asset-dedupe"
+    description = "Rewrite links to duplicate assets to their canonical copy (assets.py)"
+
+
+def plan(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH,
+         db_path: Path = DEFAULT_DB) -> AssetPlan:
+    public_dir = Path(public_dir)
+    files = list(iter_site_files(public_dir))
+    assets = [rel for rel in files if is_asset(rel)]
+    result = AssetPlan()
+    result.assets = len(assets)
+
+    # target -> [(source, source kind, url)]
+    referrers: Dict[str, List[Tuple[str, str, str]]] = defaultdict(list)
+    with DependencyIndex(db_path, public_dir, firebase_json) as index:
+        index.update()
+        for row in index.conn.execute(
+                "SELECT DISTINCT d.target, d.source, s.kind, d.url FROM deps d "
+                "JOIN sources s ON s.rel_path = d.source"):
+            referrers[row["target"]].append((row["source"], row["kind"], row["url"]))
+    named = mentions(public_dir, files)
+
+    def sources(rel: str) -> Set[str]:
+        return {source for source, _, _ in referrers[rel]}
+
+    def outside(rel: str) -> Set[str]:
+        """Files mentioning rel without a resolved reference to it."""
+        return (named.get("/" + rel, set()) | named.get(posixpath.basename(rel).lower(), set())) - sources(rel)
+
+    def rewritable(rel: str, canonical: str) -> bool:
+        """The url-map rule takes every mention of rel out of the pages naming it."""
+        single = UrlMap([("/" + rel, "/" + canonical)])
+        for source in outside(rel):
+            if not is_site_page(source):
+                return False
+            text, _ = single.rewrite(read_text(public_dir / source))
+            if _mention_keys(text, source) & {"/" + rel, posixpath.basename(rel).lower()}:
+                return False
+        return True
+
+    used = {rel for rel in assets if referrers[rel] or outside(rel)}
+    for group in content_groups(public_dir, assets):
+        live = [rel for rel in group if rel in used]
+        if not live:
+            continue
+        canonical = min(live, key=lambda rel: (-len(sources(rel)), rel.count("/"), len(rel), rel))
+        result.groups.append([canonical] + [rel for rel in group if rel != canonical])
+        size = (public_dir / canonical).stat().st_size
+        for rel in live:
+            if rel == canonical:
+                continue
+            kept = ""
+            if any(kind != "page" for _, kind, _ in referrers[rel]):
+                kept = "stylesheet / sitemap reference"
+            elif any(not url.startswith(("/", "http:", "https:")) for _, _, url in referrers[rel]):
+                kept = "relative link"
+            elif not rewritable(rel, canonical):
+                kept = "named in " + sorted(outside(rel))[0]
+            result.duplicates.append(Duplicate(rel, canonical, size, kept))
+
+    for rel in assets:
+        if rel in used:
+            continue
+        stem = rel.rsplit(".", 1)[0]
+        note = next((f"{posixpath.basename(stem)}.{ext} is referenced" for ext in ("webp", "avif")
+                     if f"{stem}.{ext}" in used), "")
+        result.orphans.append((rel, (public_dir / rel).stat().st_size, note))
+    return result
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    return plan(public_dir, firebase_json).findings()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Byte-identical duplicates and unreferenced binary assets.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="reverse-dependency index (deps.py)")
+    parser.add_argument("--map", type=Path, metavar="CSV",
+                        help="write the copy -> canonical table (input of fix migrate --map)")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write the findings as JSON lines")
+    parser.add_argument("--show", type=int, default=20, help="orphans listed")
+    args = parser.parse_args(argv)
+
+    result = plan(args.src, args.firebase, args.db)
+    print(f"\n[ASSETS] {result.assets} fichier(s) binaire(s), {len(result.groups)} groupe(s) identique(s), "
+          f"{len(result.orphans)} orphelin(s)")
+    print("=" * 70)
+    by_rel = {d.rel: d for d in result.duplicates}
+    for group in result.groups:
+        print(f"   {group[0]}")
+        for rel in group[1:]:
+            d = by_rel.get(rel)
+            status = "orphelin" if d is None else (f"conserve : {d.kept}" if d.kept else "")
+            print(f"      = {rel}" + (f"  ({status})" if status else ""))
+    print("-" * 70)
+    for rel, size, note in sorted(result.orphans, key=lambda o: -o[1])[:args.show]:
+        print(f"   {size // 1024:>6} KB  {rel}" + (f"  ({note})" if note else ""))
+    if len(result.orphans) > args.show:
+        print(f"             ... +{len(result.orphans) - args.show}")
+    print("-" * 70)
+
+    if args.map:
+        urlmap = result.urlmap()
+        with open(args.map, "w", encoding="utf-8", newline="") as f:
+            f.write("old,new\n")
+            f.writelines(f"{old},{new}\n" for old, new in sorted(urlmap.table.items()))
+        print(f"[OK] {len(urlmap)} correspondance(s) -> {args.map}")
+    if args.jsonl:
+        write_jsonl(result.findings(), args.jsonl)
+    print(f"[OK] --prune-assets retire {len(result.drop)} fichier(s) de dist/ "
+          f"({result.saved / 1024 / 1024:.1f} MB de moins a deployer)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+BENCH - synthetic site scaling
+Generates synthetic sites from the real page templates (fr/en zones,
+services, blog) at 100 / 1,000 / 10,000 pages, times the audits and
+fixers on each size, and compares against a stored baseline.
+
+Each target script runs unmodified in a fresh interpreter with the
+synthetic repo as cwd, so cwd- and __file__-relative paths resolve to the
+synthetic public/ and firebase.json. Fixers that rewrite pages get a
+fresh copy of the site for every round.
+
+The regression gate fails when a target is slower than its baseline by
+more than --tolerance, or when its runtime grows superlinearly with the
+page count (log-log slope above --max-exponent between two sizes).
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import BASE_URL, FIREBASE_JSON_PATH, PUBLIC_DIR, SCRIPTS_DIR
+from .site import is_site_page, iter_site_files
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_BASELINE = SCRIPTS_DIR / "bench_baseline.json"
+
+# Runtimes under this are dominated by interpreter/import noise
+NOISE_FLOOR_S = 0.05
+
+# name: (script, rewrites public/, required modules)
+TARGETS: Dict[str, Tuple[str, bool, Tuple[str, ...]]] = {
+    "audit_links_seo": ("audit_links_seo.py", False, ("bs4",)),
+    "validate_seo_tags": ("validate_seo_tags.py", False, ("bs4",)),
+    "sitemap": ("generate_strict_sitemap.py", True, ()),
+    "redirects": ("analyze_redirects.py", False, ()),
+    "final_head_cleanup": ("final_head_cleanup.py", True, ()),
+    "fix_seo_strict": ("fix_seo_strict.py", True, ()),
+}
+
+# Template families cloned by the generator (globs under public/)
+TEMPLATE_GLOBS = (
+    "fr/zones/*.html", "en/zones/*.html",
+    "fr/services/*/index.html", "en/services/*/index.html",
+    "fr/blog/*.html", "en/blog/*.html",
+)
+
+_RUNNER = """\
+import json, runpy, sys, time
+result, script = sys.argv[1], sys.argv[2]
+sys.argv = [script]
+start = time.perf_counter()
+try:
+    runpy.run_path(script, run_name="__main__")
+except SystemExit:
+    pass
+with open(result, "w") as f:
+    f.write(json.dumps(time.perf_counter() - start))
+"""
+
+
+# --- synthetic site ---------------------------------------------------------
+
+def _templates() -> List[Tuple[str, str, str, str]]:
+    """[(rel_path, lang, section, slug)] of the pages the generator clones."""
+    found = []
+    for pattern in TEMPLATE_GLOBS:
+        for path in sorted(PUBLIC_DIR.glob(pattern)):
+            rel = path.relative_to(PUBLIC_DIR).as_posix()
+            parts = rel.split("/")
+            lang, section = parts[0], parts[1]
+            slug = parts[2] if parts[-1] == "index.html" else Path(parts[2]).stem
+            if slug == "index" or slug.endswith("-test"):
+                continue
+            found.append((rel, lang, section, slug))
+    return found
+
+
+def _url_for(rel: str) -> str:
+    path = rel[:-len("index.html")] if rel.endswith("index.html") else rel[:-len(".html")] + "/"
+    return f"{BASE_URL}/{path}"
+
+
+def generate_site(root: Path, pages: int) -> Dict[str, int]:
+    """
+    Write a synthetic repo layout (public/, firebase.json) under root.
+
+    The real site pages are kept as-is and cloned until the site holds
+    `pages` HTML pages. A clone of fr/zones/cannes.html becomes
+    fr/zones/cannes-s00042/index.html with its own URLs and title; clones
+    are made in FR/EN pairs per index so hreflang clusters stay intact.
+    sitemap.xml and the firebase.json redirects grow with the site.
+
+    Returns:
+        {"pages": total, "clones": generated, "redirects": count}
+    """
+    root = Path(root)
+    public = root / "public"
+    public.mkdir(parents=True, exist_ok=True)
+
+    real_pages = []
+    for rel in iter_site_files(PUBLIC_DIR):
+        dst = public / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if rel.endswith((".html", ".xml", ".txt", ".css", ".js", ".json")):
+            shutil.copy2(PUBLIC_DIR / rel, dst)
+            if is_site_page(rel):
+                real_pages.append(rel)
+
+    templates = _templates()
+    sources = {rel: (PUBLIC_DIR / rel).read_text(encoding="utf-8", errors="ignore") for rel, *_ in templates}
+    with open(FIREBASE_JSON_PATH, "r", encoding="utf-8") as f:
+        firebase = json.load(f)
+    hosting = firebase["hosting"][0] if isinstance(firebase["hosting"], list) else firebase["hosting"]
+    redirects = hosting.setdefault("redirects", [])
+
+    urls = [_url_for(rel) for rel in real_pages if rel.startswith(("fr/", "en/"))]
+    clones = 0
+    index = 0
+    while len(real_pages) + clones < pages:
+        for rel, lang, section, slug in templates:
+            if len(real_pages) + clones >= pages:
+                break
+            new_slug = f"{slug}-s{index:05d}"
+            html = re.sub(
+                rf"(/(?:fr|en)/{section}/){re.escape(slug)}(?=[/.\"'#?])",
+                rf"\g<1>{new_slug}",
+                sources[rel],
+            )
+            html = re.sub(r"<title>(.*?)</title>", rf"<title>\1 #{index}</title>", html, count=1, flags=re.DOTALL)
+            out_rel = f"{lang}/{section}/{new_slug}/index.html"
+            out = public / out_rel
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_text(html, encoding="utf-8")
+            urls.append(_url_for(out_rel))
+            if lang == "fr":
+                redirects.append({"source": f"/{section}/{new_slug}",
+                                  "destination": f"/fr/{section}/{new_slug}/", "type": 301})
+            clones += 1
+        index += 1
+
+    with open(public / "sitemap.xml", "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for url in urls:
+            f.write(f"  <url><loc>{url}</loc></url>\n")
+        f.write("</urlset>\n")
+    with open(root / "firebase.json", "w", encoding="utf-8") as f:
+        json.dump(firebase, f, indent=2)
+
+    shutil.copytree(SCRIPTS_DIR, root / "scripts",
+                    ignore=shutil.ignore_patterns("__pycache__", "mocyno_seo", "*.json"))
+    return {"pages": len(real_pages) + clones, "clones": clones, "redirects": len(redirects)}
+
+
+# --- timing ------------------------------------------------------------------
+
+def run_target(root: Path, script: str) -> float:
+    """Run scripts/<script> with root as cwd; returns its wall time in seconds."""
+    fd, result = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-c", _RUNNER, result, str(root / "scripts" / script)],
+            cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1:] or ["?"]
+            raise RuntimeError(f"{script} failed: {last[0]}")
+        with open(result, "r") as f:
+            return json.load(f)
+    finally:
+        os.unlink(result)
+
+
+def bench_target(root: Path, name: str, rounds: int) -> Dict:
+    script, mutates, _ = TARGETS[name]
+    times = []
+    for _ in range(rounds):
+        if mutates:
+            work = Path(tempfile.mkdtemp(prefix="mocyno-bench-round-"))
+            try:
+                shutil.copytree(root, work, dirs_exist_ok=True)
+                times.append(run_target(work, script))
+            finally:
+                shutil.rmtree(work, ignore_errors=True)
+        else:
+            times.append(run_target(root, script))
+    return {
+        "min": round(min(times), 4),
+        "mean": round(statistics.fmean(times), 4),
+        "stddev": round(statistics.stdev(times), 4) if len(times) > 1 else 0.0,
+        "rounds": len(times),
+    }
+
+
+def missing_requirements(name: str) -> List[str]:
+    return [m for m in TARGETS[name][2] if importlib.util.find_spec(m) is None]
+
+
+def run_bench(sizes: List[int], names: List[str], rounds: int) -> Dict:
+    results: Dict = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "sizes": sizes,
+        "targets": {name: {} for name in names},
+        "skipped": {},
+    }
+    for name in names:
+        missing = missing_requirements(name)
+        if missing:
+            results["skipped"][name] = f"missing module(s): {', '.join(missing)}"
+            print(f"[WARN] {name} skipped ({results['skipped'][name]})")
+    active = [n for n in names if n not in results["skipped"]]
+
+    for size in sizes:
+        root = Path(tempfile.mkdtemp(prefix=f"mocyno-bench-{size}-"))
+        try:
+            info = generate_site(root, size)
+            print(f"\n[SITE] {info['pages']} pages ({info['clones']} clones, {info['redirects']} redirects)")
+            for name in active:
+                try:
+                    stat = bench_target(root, name, rounds)
+                except RuntimeError as e:
+                    stat = {"error": str(e)}
+                    print(f"   [WARN] {name:<20} {e}")
+                else:
+                    print(f"   [OK] {name:<20} min {stat['min'] * 1000:>9.1f} ms  "
+                          f"mean {stat['mean'] * 1000:>9.1f} ms  +/- {stat['stddev'] * 1000:.1f}")
+                results["targets"][name][str(size)] = stat
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+# --- regression gate ---------------------------------------------------------
+
+def scaling_exponents(series: Dict[str, Dict]) -> List[Tuple[int, int, float]]:
+    """
+    Log-log slope of min runtime between consecutive sizes.
+
+    1.0 is linear; pairs below the noise floor are skipped.
+    """
+    points = sorted((int(n), s["min"]) for n, s in series.items() if "min" in s)
+    slopes = []
+    for (n1, t1), (n2, t2) in zip(points, points[1:]):
+        if t1 < NOISE_FLOOR_S or t2 < NOISE_FLOOR_S or n2 == n1:
+            continue
+        slopes.append((n1, n2, math.log(t2 / t1) / math.log(n2 / n1)))
+    return slopes
+
+
+def gate(results: Dict, baseline: Optional[Dict], tolerance: float, max_exponent: float) -> List[str]:
+    """Findings that should block a merge (empty list = pass)."""
+    findings = []
+    for name, series in results["targets"].items():
+        for n1, n2, k in scaling_exponents(series):
+            if k > max_exponent:
+                findings.append(f"{name}: superlinear scaling {n1}->{n2} pages (exponent {k:.2f} > {max_exponent})")
+        if not baseline:
+            continue
+        base_series = baseline.get("targets", {}).get(name, {})
+        for size, stat in series.items():
+            base = base_series.get(size)
+            if not base or "min" not in base or "min" not in stat or base["min"] < NOISE_FLOOR_S:
+                continue
+            ratio = stat["min"] / base["min"]
+            if ratio > 1 + tolerance:
+                findings.append(f"{name} @ {size} pages: {stat['min']:.3f}s vs baseline {base['min']:.3f}s (x{ratio:.2f})")
+    return findings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark audits and fixers on synthetic sites.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="page counts (default: 100,1000,10000)")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"comma-separated subset of: {', '.join(TARGETS)}")
+    parser.add_argument("--rounds", type=int, default=3, help="runs per target and size (min is kept)")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="write results as JSON")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, type=Path, metavar="PATH",
+                        help=f"store results as the new baseline (default: scripts/{DEFAULT_BASELINE.name})")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline to compare against")
+    parser.add_argument("--gate", action="store_true", help="exit 1 on regression or superlinear scaling")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (default: 0.25)")
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="allowed log-log scaling slope (default: 1.3)")
+    parser.add_argument("--generate", type=Path, metavar="DIR", help="only write a synthetic site to DIR and exit")
+    parser.add_argument("--pages", type=int, default=1000, help="page count for --generate")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        info = generate_site(args.generate, args.pages)
+        print(f"[OK] {info['pages']} pages written to {args.generate / 'public'}")
+        return 0
+
+    sizes = sorted(int(s) for s in args.sizes.split(",") if s.strip())
+    names = [n.strip() for n in args.targets.split(",") if n.strip()]
+    unknown = [n for n in names if n not in TARGETS]
+    if unknown:
+        print(f"[ERREUR] Unknown target(s): {', '.join(unknown)}")
+        return 2
+
+    print("\n[BENCH] SYNTHETIC SITE SCALING")
+    print("=" * 70)
+    results = run_bench(sizes, names, max(1, args.rounds))
+
+    baseline = None
+    if args.baseline.exists() and args.save_baseline is None:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print("\n" + "=" * 70)
+    print("SCALING (log-log slope, 1.0 = linear)")
+    for name, series in results["targets"].items():
+        if name in results["skipped"]:
+            print(f"   {name:<20} skipped")
+            continue
+        slopes = scaling_exponents(series)
+        shown = ", ".join(f"{a}->{b}: {k:.2f}" for a, b, k in slopes) or "below noise floor"
+        print(f"   {name:<20} {shown}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[OK] Results : {args.json}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Baseline saved : {args.save_baseline}")
+
+    findings = gate(results, baseline, args.tolerance, args.max_exponent)
+    if findings:
+        print(f"\n[WARN] {len(findings)} regression(s):")
+        for finding in findings:
+            print(f"   - {finding}")
+    else:
+        print("\n[OK] No regression" + ("" if baseline else " (no baseline to compare against)"))
+    print("=" * 70)
+    return 1 if (args.gate and findings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+BUILD - public/ -> dist/
+Reads public/ as source, runs the rule pipeline in memory and writes an
+optimized copy of the site to dist/. public/ is never modified.
+
+- HTML pages of the site go through the pipeline and are written fresh;
+  pages no rule can match are copied without being decoded.
+- Everything else (images, CSS, JS, app shells) is hardlinked, so the
+  build costs no extra disk space; falls back to a copy across devices.
+- The tree is assembled in a staging directory and swapped in with two
+  renames, so dist/ is never observed half-written.
+- With --incremental, pages whose source (size, mtime) and pipeline
+  fingerprint match the previous build are reused from the old dist/.
+- With --prune-assets, byte-identical asset copies are folded into one
+  canonical file (links rewritten) and unreferenced assets are left out
+  (assets.py).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .config import DIST_DIR, PUBLIC_DIR
+from .instrument import Profiler
+from .loader import MODES, encode_text, open_page
+from .rules import DEFAULT_RULES, RULES, Pipeline, Rule
+from .site import is_site_page, iter_site_files
+
+MANIFEST_NAME = ".build-manifest.json"
+
+
+class BuildStats:
+    """Counters reported at the end of a build."""
+
+    def __init__(self):
+        self.pages_built = 0
+        self.pages_rewritten = 0
+        self.pages_reused = 0
+        self.files_linked = 0
+        self.files_copied = 0
+        self.files_removed = 0
+        self.files_excluded = 0
+        self.rule_hits: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+def load_manifest(dist_dir: Path) -> Dict:
+    """Previous build manifest, or an empty one."""
+    path = Path(dist_dir) / MANIFEST_NAME
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def link_or_copy(src: Path, dst: Path) -> bool:
+    """
+    Hardlink src to dst, copying when linking is not possible.
+
+    Returns:
+        True if dst is a hardlink
+    """
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        shutil.copy2(src, dst)
+        return False
+
+
+def render_page(src: Path, pipeline: Pipeline, profiler: Optional[Profiler] = None,
+                page: Optional[str] = None, read_mode: str = "auto"):
+    """
+    Run the pipeline over one page.
+
+    The gate literals are looked up in the raw bytes first; the page is
+    decoded only when at least one rule can match.
+
+    Returns:
+        (output_bytes, rule_hits); output_bytes is None when the page
+        comes out unchanged and can be copied as-is
+    """
+    if profiler is None:
+        with open_page(src, read_mode) as source:
+            found = pipeline.scanner.scan_bytes(source.raw)
+            if not pipeline.needs(found):
+                return None, {}
+            text = source.text
+        new_text, hits = pipeline.run(text, page=page, found=found)
+        if new_text == text:
+            return None, hits
+        return encode_text(new_text), hits
+
+    with profiler.span("read", page=page) as s:
+        source = open_page(src, read_mode)
+        s.nbytes = source.size
+    with source:
+        with profiler.span("prefilter", page=page, nbytes=source.size) as s:
+            found = pipeline.scanner.scan_bytes(source.raw)
+            s.matches = len(found)
+        if not pipeline.needs(found):
+            return None, {}
+        with profiler.span("decode", page=page, nbytes=source.size):
+            text = source.text
+    new_text, hits = pipeline.run(text, profiler, page, found=found)
+    if new_text == text:
+        return None, hits
+    with profiler.span("serialize", page=page, nbytes=len(new_text)):
+        out = encode_text(new_text)
+    return out, hits
+
+
+def _swap(staging: Path, dist_dir: Path) -> None:
+    """Replace dist_dir with staging; the old tree is removed afterwards."""
+    old = dist_dir.parent / f".{dist_dir.name}.old"
+    if old.exists():
+        shutil.rmtree(old)
+    if dist_dir.exists():
+        os.replace(dist_dir, old)
+    os.replace(staging, dist_dir)
+    if old.exists():
+        shutil.rmtree(old)
+
+
+def build(public_dir: Path = PUBLIC_DIR,
+          dist_dir: Path = DIST_DIR,
+          rule_names: Iterable[str] = DEFAULT_RULES,
+          incremental: bool = False,
+          swap: bool = True,
+          only: Optional[Iterable[str]] = None,
+          profiler: Optional[Profiler] = None,
+          read_mode: str = "auto",
+          extra_rules: Iterable[Rule] = (),
+          exclude: Iterable[str] = ()) -> BuildStats:
+    """
+    Build dist_dir from public_dir.
+
+    Args:
+        rule_names: rules applied to every site page, in order
+        incremental: reuse unchanged pages from the previous dist_dir
+        swap: assemble in a staging dir and swap it in (else write in place)
+        only: if given, rebuild these pages (POSIX paths relative to
+              public_dir) and reuse every other page from the previous build
+        profiler: records read/prefilter/decode/rule/serialize/write/link spans
+        read_mode: loader mode for pages ("auto", "mmap" or "bytes")
+        extra_rules: rule instances appended after rule_names (e.g. a
+                     UrlMapRule, which is built from a mapping file)
+        exclude: files of public_dir left out of the output (orphan and
+                 duplicate assets, see assets.py)
+    """
+    public_dir, dist_dir = Path(public_dir), Path(dist_dir)
+    pipeline = Pipeline(Pipeline.from_names(rule_names).rules + list(extra_rules))
+    only_set = set(only) if only is not None else None
+    exclude = set(exclude)
+
+    previous = load_manifest(dist_dir) if (incremental or only_set is not None) else {}
+    if previous.get("pipeline") != pipeline.fingerprint:
+        previous = {}
+    prev_files: Dict[str, Dict] = previous.get("files", {})
+
+    out_dir = dist_dir.parent / f".{dist_dir.name}.tmp" if swap else dist_dir
+    if swap and out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    stats = BuildStats()
+    manifest_files: Dict[str, Dict] = {}
+
+    for rel in iter_site_files(public_dir):
+        if rel in exclude:
+            stats.files_excluded += 1
+            continue
+        src = public_dir / rel
+        dst = out_dir / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+
+        if not is_site_page(rel):
+            if profiler is not None:
+                start = time.perf_counter_ns()
+                linked = link_or_copy(src, dst)
+                profiler.record("link", None, start, page=rel)
+            else:
+                linked = link_or_copy(src, dst)
+            if linked:
+                stats.files_linked += 1
+            else:
+                stats.files_copied += 1
+            continue
+
+        st = src.stat()
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        prev = prev_files.get(rel)
+        prev_out = dist_dir / rel
+        if only_set is not None:
+            reusable = rel not in only_set
+        else:
+            reusable = prev is not None and prev["size"] == entry["size"] and prev["mtime_ns"] == entry["mtime_ns"]
+        if reusable and prev is not None and prev_out.exists():
+            if prev_out != dst:
+                link_or_copy(prev_out, dst)
+            manifest_files[rel] = prev
+            stats.pages_reused += 1
+            continue
+
+        out, hits = render_page(src, pipeline, profiler, rel, read_mode)
+        start = time.perf_counter_ns()
+        if dst.exists():
+            dst.unlink()
+        if out is None:
+            # Unchanged: kernel-side copy, the content never enters Python
+            shutil.copyfile(src, dst)
+        else:
+            dst.write_bytes(out)
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+        if profiler is not None:
+            profiler.record("write", None, start, st.st_size if out is None else len(out), page=rel)
+        stats.pages_built += 1
+        if out is not None:
+            stats.pages_rewritten += 1
+        for name, count in hits.items():
+            stats.rule_hits[name] = stats.rule_hits.get(name, 0) + count
+        entry["rules"] = sorted(hits)
+        manifest_files[rel] = entry
+
+    if not swap:
+        stats.files_removed = _prune(out_dir, set(iter_site_files(public_dir)) - exclude)
+
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump({"pipeline": pipeline.fingerprint,
+                   "rules": [r.name for r in pipeline.rules],
+                   "files": manifest_files}, f, indent=1, sort_keys=True)
+
+    if swap:
+        _swap(out_dir, dist_dir)
+    return stats
+
+
+def _prune(out_dir: Path, keep: set) -> int:
+    """Delete files from an in-place build that no longer exist in the source."""
+    removed = 0
+    for rel in list(iter_site_files(out_dir)):
+        if rel not in keep:
+            (out_dir / rel).unlink()
+            removed += 1
+    return removed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build dist/ from public/ without touching the source tree.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="source tree (default: public/)")
+    parser.add_argument("--out", type=Path, default=DIST_DIR, help="output tree (default: dist/)")
+    parser.add_argument("--rules", default=",".join(DEFAULT_RULES),
+                        help="comma-separated rule names, in order ('' for a plain copy)")
+    parser.add_argument("--list-rules", action="store_true", help="list available rules and exit")
+    parser.add_argument("--incremental", action="store_true", help="rebuild only pages changed since the last build")
+    parser.add_argument("--page", action="append", dest="pages", metavar="REL_PATH",
+                        help="rebuild only this page (repeatable); other pages are reused")
+    parser.add_argument("--no-swap", action="store_true", help="write into --out directly instead of swapping")
+    parser.add_argument("--read-mode", choices=MODES, default="auto",
+                        help="page read path: mmap for large files (auto), always mmap, or read()")
+    parser.add_argument("--profile-json", type=Path, metavar="PATH", help="write per-stage/per-rule timings as JSON")
+    parser.add_argument("--trace", type=Path, metavar="PATH", help="write a Chrome trace (chrome://tracing)")
+    parser.add_argument("--url-map", type=Path, metavar="FILE",
+                        help="also rewrite internal URLs through this migration table (see urlmap.py)")
+    parser.add_argument("--prune-assets", action="store_true",
+                        help="fold duplicate assets into one copy and leave unreferenced ones out (see assets.py)")
+    parser.add_argument("--hints", action="store_true",
+                        help="also add each page's resource hints, planned on --src (see hints.py)")
+    args = parser.parse_args(argv)
+
+    if args.list_rules:
+        for name, rule in RULES.items():
+            default = "*" if name in DEFAULT_RULES else " "
+            print(f" {default} {name:<14} {rule.description}")
+        return 0
+
+    rule_names = [n.strip() for n in args.rules.split(",") if n.strip()]
+    extra_rules = []
+    exclude: set = set()
+    if args.url_map or args.prune_assets:
+        from .hosting import HostingSimulator, load_hosting
+        from .urlmap import UrlMap, UrlMapRule
+
+        sim = HostingSimulator(iter_site_files(args.src), load_hosting())
+    if args.url_map:
+        extra_rules.append(UrlMapRule(UrlMap.load(args.url_map).compile(sim)))
+    if args.prune_assets:
+        from .assets import DedupeRule, plan
+
+        assets = plan(args.src)
+        exclude = assets.drop
+        extra_rules.append(DedupeRule(assets.urlmap().compile(sim)))
+    if args.hints:
+        from .hints import Planner
+        from .rules import HintRule
+
+        extra_rules.append(HintRule(Planner(args.src)))
+    print("\n[BUILD] public/ -> dist/")
+    print("=" * 70)
+    print(f"Source : {args.src}")
+    print(f"Output : {args.out}")
+    print(f"Rules  : {', '.join(rule_names + [r.name for r in extra_rules]) or '(none)'}")
+
+    try:
+        profiler = Profiler() if (args.profile_json or args.trace) else None
+        stats = build(args.src, args.out, rule_names, incremental=args.incremental,
+                      swap=not args.no_swap, only=args.pages, profiler=profiler,
+                      read_mode=args.read_mode, extra_rules=extra_rules, exclude=exclude)
+    except KeyError as e:
+        print(f"[ERREUR] {e.args[0]}")
+        return 2
+
+    print(f"\n[OK] Pages built     : {stats.pages_built} ({stats.pages_rewritten} rewritten)")
+    print(f"[OK] Pages reused    : {stats.pages_reused}")
+    print(f"[OK] Files linked    : {stats.files_linked} (copied: {stats.files_copied})")
+    if stats.files_removed:
+        print(f"[OK] Files removed   : {stats.files_removed}")
+    if stats.files_excluded:
+        print(f"[OK] Assets pruned   : {stats.files_excluded}")
+    for name, count in sorted(stats.rule_hits.items()):
+        print(f"     {name:<14} {count} match(es)")
+    if profiler is not None:
+        profiler.print_summary()
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+            print(f"\n[OK] Profile : {args.profile_json}")
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+            print(f"[OK] Trace   : {args.trace}")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+CACHING - Cache-Control policy for firebase.json
+Classifies every deployable file (first matching class wins) and writes
+the smallest set of disjoint header rules that gives each class its
+Cache-Control:
+
+  html           pages, served at their clean URL   no-cache
+  sitemap        sitemap*.xml                       1 hour
+  robots         robots.txt, llms.txt               1 hour
+  fingerprinted  Vite content hash in the name,     1 year, immutable
+                 directly in a build's assets/
+                 (admin/assets/index-Br9heKqJ.js)
+  static         other images, fonts, media         7 days (+1 day stale-while-revalidate)
+  code           other CSS / JS / JSON              5 min (+1 day stale-while-revalidate)
+  other          anything else                      1 hour
+
+Only fingerprinted files are immutable: every other name is reused
+when the file changes (consent-ga.js, styles.css without ?v=, hero
+images replaced in place), and a year-long immutable copy would keep
+visitors on the old one. Their rules name the assets/ directory itself
+("/admin/assets/*.js"), never a tree above it, so a hand-named file
+added next to a bundle does not inherit the year.
+
+Rules are built per extension: a directory whose files of that
+extension all share one class gets a single "/dir/**/*.ext" rule, else
+its direct files get "/dir/*.ext" (or one rule per file) and its
+subdirectories are visited. Extensions of one class under the same
+pattern merge into "*.@(png|webp)". Pages get one regex rule over
+extension-less paths. No path matches two Cache-Control rules.
+
+The result is verified through the hosting simulator: for each file,
+the URL it is served at and the Cache-Control that URL actually
+receives, against the policy of its class (rule ids):
+
+  cache/missing                no Cache-Control
+  cache/overlap                several entries set Cache-Control
+  cache/policy                 value differs from the class policy
+  cache/immutable-unversioned  immutable on a name that is reused (ERROR)
+
+    python scripts/mocyno-seo.py fix cache              # classes, generated rules, check of firebase.json
+    python scripts/mocyno-seo.py fix cache --write      # replace the Cache-Control entries of firebase.json
+    python scripts/mocyno-seo.py fix cache --src dist   # classify the build output
+"""
+
+import argparse
+import fnmatch
+import posixpath
+import re
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import ERROR, WARN, Finding, write_jsonl
+from .hosting import HostingSimulator, load_hosting, replace_headers
+from .hreflang import page_key
+from .site import is_html, iter_site_files
+
+HEADER = "Cache-Control"
+YEAR = 31536000
+STATIC_EXTENSIONS = ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp",
+                     "woff", "woff2", "ttf", "otf", "eot", "mp4", "webm", "mp3", "ogg", "pdf")
+CODE_EXTENSIONS = ("css", "js", "mjs", "map", "json", "webmanifest")
+# Every clean URL: no dot in any segment (files always have an extension)
+PAGE_REGEX = "(?:/[^./]*)*/?"
+
+# Vite's 8-character content hash before the extension (index-KujCdZQR.js,
+# pwa-toast.entry-DIm-23FG.js). Timestamps in image names are not content
+# hashes: those files are only named once, not versioned.
+_FINGERPRINT = re.compile(r"-([A-Za-z0-9_-]{8})\.\w+$")
+# Vite's output directory (build.assetsDir); hashed names exist nowhere else
+FINGERPRINT_DIR = "assets"
+
+
+def is_fingerprinted(rel: str) -> bool:
+    # blog-villa-01-large.webp or photo-IMG_1234.png outside a build output is a name
+    if posixpath.basename(posixpath.dirname(rel)) != FINGERPRINT_DIR:
+        return False
+    m = _FINGERPRINT.search(posixpath.basename(rel))
+    # A lowercase word ("-dropdown.js") is a name, not a hash
+    return bool(m) and any(c.isdigit() or c.isupper() for c in m.group(1))
+
+
+def _extension(rel: str) -> str:
+    name = posixpath.basename(rel)
+    return name.rsplit(".", 1)[1] if "." in name.lstrip(".") else ""
+
+
+class CacheClass:
+    """One row of the policy: which files, which Cache-Control."""
+
+    __slots__ = ("name", "value", "test")
+
+    def __init__(self, name: str, value: str, test: Callable[[str], bool]):
+        self.name = name
+        self.value = value
+        self.test = test
+
+
+def _globs(*patterns: str) -> Callable[[str], bool]:
+    return lambda rel: any(fnmatch.fnmatch(rel, p) for p in patterns)
+
+
+CLASSES: Sequence[CacheClass] = (
+    CacheClass("html", "no-cache", is_html),
+    CacheClass("sitemap", "public, max-age=3600", _globs("sitemap*.xml", "*/sitemap*.xml")),
+    CacheClass("robots", "public, max-age=3600", _globs("robots.txt", "llms.txt")),
+    CacheClass("fingerprinted", f"public, max-age={YEAR}, immutable", is_fingerprinted),
+    CacheClass("static", "public, max-age=604800, stale-while-revalidate=86400",
+               lambda rel: _extension(rel).lower() in STATIC_EXTENSIONS),
+    CacheClass("code", "public, max-age=300, stale-while-revalidate=86400",
+               lambda rel: _extension(rel).lower() in CODE_EXTENSIONS),
+    CacheClass("other", "public, max-age=3600", lambda rel: True),
+)
+BY_NAME: Dict[str, CacheClass] = {c.name: c for c in CLASSES}
+
+
+def class_of(rel: str) -> CacheClass:
+    return next(c for c in CLASSES if c.test(rel))
+
+
+def served_path(rel: str) -> str:
+    """Request path a file answers on: the clean URL for pages, the file path otherwise."""
+    if not is_html(rel):
+        return "/" + rel
+    key = page_key(rel)
+    return key if key == "/" else key + "/"
+
+
+def generate(files: Sequence[str]) -> List[Dict]:
+    """Disjoint firebase.json header entries giving every file its class policy."""
+    classes = {rel: class_of(rel) for rel in files}
+    # (pattern directory, "**" or "*" or file name, class) -> extensions
+    rules: Dict[Tuple[str, str, str], List[str]] = defaultdict(list)
+
+    by_ext: Dict[str, List[str]] = defaultdict(list)
+    for rel in files:
+        if classes[rel].name != "html":
+            by_ext[_extension(rel)].append(rel)
+
+    for ext, rels in sorted(by_ext.items()):
+        if not ext:
+            for rel in rels:
+                rules[(posixpath.dirname(rel), posixpath.basename(rel), classes[rel].name)].append("")
+            continue
+        tree: Dict[str, List[str]] = defaultdict(list)
+        for rel in rels:
+            tree[posixpath.dirname(rel)].append(rel)
+
+        def visit(d: str) -> None:
+            under = [r for r in rels if d == "" or r.startswith(d + "/")]
+            names = {classes[r].name for r in under}
+            # Immutable rules stay on the assets/ directory itself (below)
+            if len(names) == 1 and names != {"fingerprinted"}:
+                rules[(d, "**", names.pop())].append(ext)
+                return
+            direct = tree.get(d, [])
+            direct_names = {classes[r].name for r in direct}
+            if len(direct_names) == 1:
+                rules[(d, "*", direct_names.pop())].append(ext)
+            else:
+                for rel in direct:
+                    rules[(d, posixpath.basename(rel), classes[rel].name)].append("")
+            children = sorted({r[len(d) + 1 if d else 0:].split("/", 1)[0] for r in under
+                               if posixpath.dirname(r) != d})
+            for child in children:
+                visit(posixpath.join(d, child) if d else child)
+
+        visit("")
+
+    order = {c.name: i for i, c in enumerate(CLASSES)}
+    entries = [{"regex": PAGE_REGEX, "headers": [{"key": HEADER, "value": BY_NAME["html"].value}]}]
+    for (d, kind, name), exts in sorted(rules.items(), key=lambda kv: (order[kv[0][2]], kv[0][0], kv[0][1])):
+        prefix = "/" + d + "/" if d else "/"
+        if kind == "**":
+            suffix = "**/*." + (exts[0] if len(exts) == 1 else "@(" + "|".join(exts) + ")")
+        elif kind == "*":
+            suffix = "*." + (exts[0] if len(exts) == 1 else "@(" + "|".join(exts) + ")")
+        else:
+            suffix = kind
+        entries.append({"source": prefix + suffix, "headers": [{"key": HEADER, "value": BY_NAME[name].value}]})
+    return entries
+
+
+def verify(sim: HostingSimulator, files: Sequence[str]) -> List[Finding]:
+    """Cache-Control each file's URL receives from the simulated site, against its class."""
+    out: List[Finding] = []
+    for rel in files:
+        path = served_path(rel)
+        response = sim.get(path)
+        if response.status != 200 or response.file != rel:
+            # Another file answers on this URL (x.html next to x/index.html)
+            continue
+        cls = class_of(rel)
+        setters = [e for e in sim.headers.matching(path)
+                   if any(h.get("key", "").lower() == HEADER.lower() for h in e.get("headers", []))]
+        value = next((v for k, v in sim.headers.resolve(path).items() if k.lower() == HEADER.lower()), None)
+        if value is None:
+            out.append(Finding("cache/missing", WARN, rel, f"{path}: no {HEADER} ({cls.name})", key=cls.name))
+            continue
+        if len(setters) > 1:
+            sources = [e.get("source") or e.get("regex") for e in setters]
+            out.append(Finding("cache/overlap", WARN, rel, f"{path}: {HEADER} set by {', '.join(sources)}",
+                               key=" ".join(sources)))
+        if "immutable" in value and cls.name != "fingerprinted":
+            out.append(Finding("cache/immutable-unversioned", ERROR, rel,
+                               f"{path}: '{value}' on a {cls.name} file whose name is reused when it changes",
+                               key=f"{cls.name} {value}"))
+        elif value.replace(" ", "") != cls.value.replace(" ", ""):
+            out.append(Finding("cache/policy", WARN, rel, f"{path}: '{value}', {cls.name} wants '{cls.value}'",
+                               key=f"{cls.name} {value}"))
+    return out
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    files = list(iter_site_files(public_dir))
+    return verify(HostingSimulator(files, load_hosting(firebase_json)), files)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate and verify the Cache-Control rules of firebase.json.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="deployed tree (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--write", action="store_true",
+                        help="replace every Cache-Control header of firebase.json by the generated rules")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write the checks as JSON lines")
+    parser.add_argument("--show", type=int, default=10, help="findings listed")
+    args = parser.parse_args(argv)
+
+    files = list(iter_site_files(args.src))
+    counts = Counter(class_of(rel).name for rel in files)
+    entries = generate(files)
+
+    print(f"\n[CACHE] {len(files)} fichier(s), {len(entries)} regle(s) generee(s)")
+    print("=" * 70)
+    for cls in CLASSES:
+        if counts[cls.name]:
+            print(f"   {cls.name:<14} {counts[cls.name]:>5}  {cls.value}")
+    print("-" * 70)
+    for entry in entries:
+        print(f"   {entry.get('source') or entry.get('regex'):<48} {entry['headers'][0]['value']}")
+    print("-" * 70)
+
+    if args.write:
+        removed = replace_headers(HEADER, entries, args.firebase)
+        print(f"[OK] {args.firebase} : {removed} entree(s) {HEADER} remplacee(s) par {len(entries)}")
+
+    found = verify(HostingSimulator(files, load_hosting(args.firebase)), files)
+    if args.jsonl:
+        write_jsonl(found, args.jsonl)
+    by_rule = Counter(f.rule for f in found)
+    print(f"[VERIFY] {args.firebase.name} simule sur {len(files)} URL(s) : "
+          + (", ".join(f"{rule} {n}" for rule, n in sorted(by_rule.items())) or "conforme"))
+    for f in found[:args.show]:
+        print(f)
+    if len(found) > args.show:
+        print(f"   ... +{len(found) - args.show}")
+    if not found:
+        print(f"[OK] Chaque URL recoit le {HEADER} de sa classe, sans chevauchement")
+    return 1 if any(f.severity == ERROR for f in found) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+CLASSIFY - page categories
+One declarative table says what every page is. It replaces the substring
+lists each script kept for itself (EXCLUDE_FILES in generate_sitemap.py,
+IGNORE_PATHS in generate_strict_sitemap.py, excluded_patterns in
+audit_links_seo.py, the 'services' in loc priority tests):
+
+  category    first CATEGORIES entry whose globs match the path
+  lang        fr / en from the first path segment, else <html lang>
+  indexable   no "noindex" in <meta name=robots>
+  canonical   the canonical URL serves this very file
+  sitemap     listed category, indexable and self-canonical
+  priority / changefreq   from the category
+
+A page is classified once, when it is parsed: SiteState keeps the result
+next to its PageModel, and sitemap, robots, gate and audits read it there.
+
+    python scripts/mocyno-seo.py audit pages                # category, lang, sitemap per page
+    python scripts/mocyno-seo.py audit pages --category system --json
+"""
+
+import argparse
+import fnmatch
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Sequence
+
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import ERROR, WARN, Finding, write_jsonl
+from .hreflang import page_key, url_key
+from .pagemodel import PageModel
+
+LANGS = ("fr", "en")
+# Root-level pages predate fr/ and en/ and carry no prefix
+DEFAULT_LANG = "fr"
+
+
+class Category:
+    """
+    One row of the table.
+
+    noindex: True when pages of this kind must carry noindex, False when
+    they must not, None when either is fine.
+    """
+
+    __slots__ = ("name", "patterns", "regex", "sitemap", "priority", "changefreq", "noindex")
+
+    def __init__(self, name: str, patterns: Sequence[str], sitemap: bool = True,
+                 priority: str = "0.8", changefreq: str = "weekly", noindex: Optional[bool] = False):
+        self.name = name
+        self.patterns = tuple(patterns)
+        # Every glob of the row in one alternation: one match per page and row
+        self.regex: Pattern = re.compile("|".join(fnmatch.translate(p) for p in self.patterns))
+        self.sitemap = sitemap
+        self.priority = priority
+        self.changefreq = changefreq
+        self.noindex = noindex
+
+
+# First match wins; globs are fnmatch patterns over the path relative to
+# public/ ("*" crosses "/").
+CATEGORIES: Sequence[Category] = (
+    Category("app-shell", ("admin/*", "client/*", "clients/*", "mobile/*"), sitemap=False, noindex=None),
+    Category("system", ("404.html", "*/404.html", "offline.html", "*/offline.html", "google*.html",
+                        "merci.html", "*/merci.html", "*/merci/index.html", "*/merci_*.html",
+                        "*-test.html"),
+             sitemap=False, noindex=True),
+    Category("legal", ("*mentions-legales*", "*politique-confidentialite*", "*cookies*",
+                       "*/legal.html", "*/privacy.html"),
+             sitemap=False, priority="0.3", changefreq="yearly", noindex=None),
+    Category("home", ("index.html", "fr/index.html", "en/index.html"), priority="1.0", changefreq="daily"),
+    Category("blog-index", ("blog/index.html", "*/blog/index.html"), changefreq="weekly"),
+    Category("blog-post", ("blog/*", "*/blog/*"), priority="0.7", changefreq="monthly"),
+    Category("service", ("services/*", "*/services/*"), priority="0.9"),
+    Category("zone", ("zones/*", "*/zones/*"), priority="0.9"),
+    Category("page", ("*",), changefreq="monthly"),
+)
+BY_NAME: Dict[str, Category] = {c.name: c for c in CATEGORIES}
+
+
+def category_of(rel: str) -> Category:
+    """Category of a path relative to public/ (no parse needed)."""
+    for category in CATEGORIES:
+        if category.regex.match(rel):
+            return category
+    return CATEGORIES[-1]
+
+
+class PageClass:
+    """What one page is, computed once from its path and PageModel."""
+
+    __slots__ = ("rel", "category", "lang", "indexable", "canonical")
+
+    def __init__(self, rel: str, category: Category, lang: Optional[str], indexable: bool, canonical: bool):
+        self.rel = rel
+        self.category = category
+        self.lang = lang
+        self.indexable = indexable
+        self.canonical = canonical
+
+    @property
+    def sitemap(self) -> bool:
+        return self.category.sitemap and self.indexable and self.canonical
+
+    @property
+    def priority(self) -> str:
+        return self.category.priority
+
+    @property
+    def changefreq(self) -> str:
+        return self.category.changefreq
+
+    def to_dict(self) -> Dict:
+        return {"page": self.rel, "category": self.category.name, "lang": self.lang,
+                "indexable": self.indexable, "canonical": self.canonical, "sitemap": self.sitemap,
+                "priority": self.priority, "changefreq": self.changefreq}
+
+
+def classify(rel: str, model: PageModel) -> PageClass:
+    first = rel.split("/", 1)[0]
+    html_lang = (model.lang or "").split("-")[0].lower() or None
+    lang = first if first in LANGS else html_lang or DEFAULT_LANG
+    indexable = "noindex" not in (model.robots or "").lower()
+    canonical = bool(model.canonical) and url_key(model.canonical) == page_key(rel)
+    return PageClass(rel, category_of(rel), lang, indexable, canonical)
+
+
+def check(classes: Dict[str, PageClass], pages: Dict[str, PageModel]) -> List[Finding]:
+    """noindex against the category, and <html lang> against the path."""
+    out: List[Finding] = []
+    for rel in sorted(classes):
+        page = classes[rel]
+        expected = page.category.noindex
+        if expected is True and page.indexable:
+            out.append(Finding("classify/system-indexable", WARN, rel,
+                               f"{page.category.name} page without noindex"))
+        elif expected is False and not page.indexable:
+            out.append(Finding("classify/content-noindex", ERROR, rel,
+                               f"{page.category.name} page is noindex"))
+        html_lang = (pages[rel].lang or "").split("-")[0].lower()
+        if rel.split("/", 1)[0] in LANGS and html_lang and html_lang != page.lang:
+            out.append(Finding("classify/lang-mismatch", WARN, rel,
+                               f"<html lang={pages[rel].lang}> under {page.lang}/"))
+    return out
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    from .watch import SiteState
+
+    state = SiteState(public_dir, firebase_json)
+    return check(state.classes, state.pages)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .watch import SiteState
+
+    parser = argparse.ArgumentParser(description="Classify every page: category, language, indexability.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--category", action="append", choices=list(BY_NAME), metavar="NAME",
+                        help=f"only these categories (repeatable: {', '.join(BY_NAME)})")
+    parser.add_argument("--json", action="store_true", help="print the classes as JSON")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write the checks as JSON lines")
+    args = parser.parse_args(argv)
+
+    state = SiteState(args.src, args.firebase)
+    classes = [c for rel, c in sorted(state.classes.items())
+               if not args.category or c.category.name in args.category]
+    found = check(state.classes, state.pages)
+    if args.jsonl:
+        write_jsonl(found, args.jsonl)
+    if args.json:
+        print(json.dumps([c.to_dict() for c in classes], indent=2))
+        return 0
+
+    print(f"\n[PAGES] {len(classes)} page(s)")
+    print("=" * 70)
+    for c in classes:
+        flags = ("sitemap" if c.sitemap else "-") + ("" if c.indexable else " noindex") + \
+                ("" if c.canonical else " non-canonical")
+        print(f"   {c.category.name:<10} {c.lang or '?':<3} {c.priority:<4} {flags:<24} {c.rel}")
+    print("-" * 70)
+    counts = Counter(c.category.name for c in classes)
+    print("   " + ", ".join(f"{name} {counts[name]}" for name in BY_NAME if counts[name]))
+    for f in found:
+        print(f)
+    if not found:
+        print("[OK] noindex et langue coherents avec les categories")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
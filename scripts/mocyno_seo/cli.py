@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+mocyno-seo - single entry point for the SEO tooling
+
+    mocyno-seo [--root DIR] [--public DIR] <command> <action> [args...]
+
+    audit      read-only reports (inventory, links, parity, duplicates, deps, nav)
+    fix        rewrite the site (build pipeline, profiling, legacy fixers)
+    sitemap    check sitemap entries, regenerate sitemap.xml
+    redirects  check firebase.json redirects, resolve URLs
+    robots     robots.txt / llms.txt checks, llms.txt generation
+    images     image weight / format audit, duplicate / orphan assets, width-height fixer
+    crawl      revalidating crawler (offline simulator or HTTP), local stand-in server
+    verify     head tags, JSON-LD, CSS, full site pass, live site
+    gate       all pre-deploy checks concurrently, one parse
+    deploy     files changed since the last recorded deploy
+    findings   JSON-lines findings stream, diff between runs
+    watch      revalidate on save
+    bench      synthetic-site benchmarks
+
+Nothing below the chosen action is imported: `mocyno-seo redirects check`
+loads json and the hosting model only, never BeautifulSoup, PIL or the
+XML parsers. --root / --public are exported as MOCYNO_ROOT /
+MOCYNO_PUBLIC_DIR before anything reads mocyno_seo.config, so every
+module and the patched legacy scripts see the same site root.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# action -> (target, help). A target is "module" (its main(argv) is called),
+# "module:function", or "legacy:<script>" for a scripts/*.py run as-is.
+COMMANDS: Dict[str, Tuple[str, Dict[str, Tuple[str, str]]]] = {
+    "audit": ("read-only reports", {
+        "pages": ("mocyno_seo.classify", "page classes: category, language, indexability, sitemap"),
+        "scripts": ("mocyno_seo.thirdparty", "scripts, resource hints, third-party origins, consent gating"),
+        "seo": ("mocyno_seo.inventory", "SQLite SEO inventory: update, query, sql, export-json"),
+        "links": ("legacy:audit_links_seo.py", "sitemap, <main> links and redirect report (bs4)"),
+        "parity": ("mocyno_seo.parity", "FR/EN structural parity through hreflang clusters"),
+        "duplicates": ("mocyno_seo.neardup", "near-duplicate pages and paragraphs (MinHash + LSH)"),
+        "deps": ("mocyno_seo.deps", "reverse-dependency index: affected, refs, deps, missing"),
+        "nav": ("legacy:audit_navigation_consistency.py", "navigation consistency report"),
+        "css": ("mocyno_seo.css", "CSS parser: check, unused selectors, critical CSS of a page"),
+    }),
+    "fix": ("rewrite the site", {
+        "build": ("mocyno_seo.build", "public/ -> dist/ through the rule pipeline"),
+        "migrate": ("mocyno_seo.urlmap", "rewrite internal links through an old -> new URL table"),
+        "facades": ("mocyno_seo.facades", "widget loaders -> placeholders + shared /scripts/facades.js"),
+        "hints": ("mocyno_seo.hints", "per-page preload / preconnect / dns-prefetch, Link headers in firebase.json"),
+        "cache": ("mocyno_seo.caching", "Cache-Control rules for firebase.json, verified through the simulator"),
+        "profile": ("mocyno_seo.profile_script", "profile a legacy fixer's regexes on a copy of public/"),
+        "run": ("mocyno_seo.cli:run_named_script", "run a legacy scripts/*.py fixer by name"),
+    }),
+    "sitemap": ("sitemaps", {
+        "check": ("mocyno_seo.sitemap", "every <loc> answers 200, is canonical and indexable"),
+        "generate": ("mocyno_seo.sitemap:generate_main", "rebuild sitemap-fr.xml / sitemap-en.xml from the page classes"),
+    }),
+    "redirects": ("firebase.json redirects", {
+        "check": ("mocyno_seo.redirects", "broken, chained, looping, shadowed and dead redirects"),
+        "resolve": ("mocyno_seo.redirects:resolve_main", "print the hops the live site answers for URLs"),
+    }),
+    "robots": ("robots.txt / llms.txt", {
+        "check": ("mocyno_seo.robots:check_main", "every robots.txt / llms.txt URL served directly and canonical"),
+        "llms": ("mocyno_seo.robots:generate_main", "rebuild llms.txt from the SEO inventory"),
+    }),
+    "images": ("images", {
+        "audit": ("mocyno_seo.images", "weight, missing WebP siblings, oversized dimensions (PIL optional)"),
+        "assets": ("mocyno_seo.assets", "byte-identical duplicates and unreferenced assets, pruned by build --prune-assets"),
+        "dimensions": ("legacy:fix_image_dimensions.py", "add width/height to <img> (bs4 + PIL)"),
+    }),
+    "crawl": ("HTTP crawler", {
+        "run": ("mocyno_seo.crawl", "crawl with If-None-Match revalidation through .seo-cache/http-cache.sqlite"),
+        "serve": ("mocyno_seo.crawl:serve_main", "serve the hosting simulator over HTTP as a local stand-in"),
+    }),
+    "verify": ("validation passes", {
+        "site": ("mocyno_seo.watch:once_main", "full validation pass, exit 1 on errors"),
+        "tags": ("legacy:validate_seo_tags.py", "exactly one title / description / og:description (bs4)"),
+        "jsonld": ("legacy:validate_jsonld.py", "JSON-LD blocks parse"),
+        "css": ("mocyno_seo.css:check_main", "CSS syntax, duplicate selectors, overridden declarations"),
+        "live": ("legacy:verify_live_tags_v2.py", "head tags on the live site (network)"),
+    }),
+}
+SINGLE: Dict[str, Tuple[str, str]] = {
+    "gate": ("mocyno_seo.gate", "pre-deploy gate: every check concurrently over one parse"),
+    "deploy": ("mocyno_seo.deploy", "files changed since the last recorded deploy (SHA-256 manifest)"),
+    "findings": ("mocyno_seo.findings", "JSON-lines findings: collect all audits, diff two runs"),
+    "watch": ("mocyno_seo.watch", "revalidate changed pages on save"),
+    "bench": ("mocyno_seo.bench", "synthetic-site benchmarks and scaling gate"),
+}
+
+
+def run_legacy(script: str, argv: List[str]) -> int:
+    """Run scripts/<script> unmodified, from the site root, as __main__."""
+    import runpy
+
+    from .config import BASE_DIR, SCRIPTS_DIR
+
+    path = SCRIPTS_DIR / script
+    if not path.exists():
+        path = BASE_DIR / script
+    if not path.exists():
+        print(f"[ERREUR] Script introuvable : {script}")
+        return 2
+    old_cwd, old_argv, old_path = os.getcwd(), sys.argv, list(sys.path)
+    os.chdir(BASE_DIR)
+    sys.argv = [str(path)] + argv
+    sys.path.insert(0, str(path.parent))
+    try:
+        runpy.run_path(str(path), run_name="__main__")
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        print(exc.code)
+        return 1
+    finally:
+        os.chdir(old_cwd)
+        sys.argv = old_argv
+        sys.path[:] = old_path
+    return 0
+
+
+def run_named_script(argv: Optional[List[str]] = None) -> int:
+    argv = list(argv or [])
+    if not argv or argv[0] in ("-h", "--help"):
+        print("usage: mocyno-seo fix run <script.py> [args...]")
+        return 0 if argv else 2
+    return run_legacy(os.path.basename(argv[0]), argv[1:])
+
+
+def dispatch(target: str, argv: List[str]) -> int:
+    if target.startswith("legacy:"):
+        return run_legacy(target[len("legacy:"):], argv)
+    module_name, _, func = target.partition(":")
+    module = importlib.import_module(module_name)
+    result = getattr(module, func or "main")(argv)
+    return int(result or 0)
+
+
+def _usage() -> str:
+    lines = ["commands:"]
+    for name, (summary, actions) in COMMANDS.items():
+        lines.append(f"  {name:10} {summary}: {', '.join(actions)}")
+    for name, (_, summary) in SINGLE.items():
+        lines.append(f"  {name:10} {summary}")
+    lines.append("\n`mocyno-seo <command>` lists its actions; `<command> <action> --help` its options.")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="mocyno-seo", description="MO'CYNO SEO tooling.", epilog=_usage(),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", metavar="DIR", help="repository root holding public/ and firebase.json")
+    parser.add_argument("--public", metavar="DIR", help="served directory (default: <root>/public)")
+    parser.add_argument("command", choices=sorted(list(COMMANDS) + list(SINGLE)), metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    if "mocyno_seo.config" in sys.modules and (args.root or args.public):
+        print("[WARN] mocyno_seo.config already imported; --root/--public only reach legacy scripts")
+    if args.root:
+        os.environ["MOCYNO_ROOT"] = os.path.abspath(args.root)
+    if args.public:
+        os.environ["MOCYNO_PUBLIC_DIR"] = os.path.abspath(args.public)
+
+    if args.command in SINGLE:
+        return dispatch(SINGLE[args.command][0], args.args)
+
+    summary, actions = COMMANDS[args.command]
+    if not args.args or args.args[0] in ("-h", "--help") or args.args[0] not in actions:
+        if args.args and args.args[0] not in ("-h", "--help"):
+            print(f"[ERREUR] Action inconnue : {args.command} {args.args[0]}\n")
+        print(f"usage: mocyno-seo {args.command} <action> [args...]   ({summary})\n")
+        for name, (_, text) in actions.items():
+            print(f"  {name:12} {text}")
+        return 0 if args.args[:1] in (["-h"], ["--help"]) else 2
+    return dispatch(actions[args.args[0]][0], args.args[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
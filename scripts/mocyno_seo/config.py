@@ -0,0 +1,32 @@
+"""
+Project layout shared by every mocyno_seo module.
+
+The site root can be moved with environment variables (set by
+`mocyno-seo --root/--public`, read once at import time):
+
+    MOCYNO_ROOT         repository root holding public/ and firebase.json
+    MOCYNO_PUBLIC_DIR   served directory (default: <root>/public)
+"""
+
+import os
+from pathlib import Path
+
+# Where the tooling itself lives (scripts/), independent of the site root
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+BASE_DIR = Path(os.environ.get("MOCYNO_ROOT") or SCRIPTS_DIR.parent).resolve()
+PUBLIC_DIR = Path(os.environ.get("MOCYNO_PUBLIC_DIR") or BASE_DIR / "public").resolve()
+DIST_DIR = BASE_DIR / "dist"
+# Persistent indexes (SEO inventory, ...), never deployed
+CACHE_DIR = BASE_DIR / ".seo-cache"
+FIREBASE_JSON_PATH = BASE_DIR / "firebase.json"
+# SHA-256 of every file of the last deploy (deploy.py), committed with the release
+DEPLOY_MANIFEST_PATH = BASE_DIR / "deploy-manifest.json"
+BASE_URL = "https://mocyno.com"
+
+# Vite build artefacts served from public/ (see docs/repo/BUILD.md)
+APP_SHELL_DIRS = ("admin", "client", "clients", "mobile")
+
+# Never part of the site: VCS, tooling and fixer backups
+SKIP_DIRS = ("node_modules", ".git", "__pycache__")
+SKIP_SUFFIXES = (".bak",)
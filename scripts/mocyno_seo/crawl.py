@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+CRAWL - revalidating crawler with an on-disk HTTP cache
+Crawls the site from seed paths, following same-site links, and keeps
+every response in .seo-cache/http-cache.sqlite: status, ETag,
+Last-Modified, Location, headers, the body (zlib) and, for pages, the
+summary parsed from it. The next run revalidates each URL with
+If-None-Match / If-Modified-Since: a 304 reuses the cached summary, so
+only the pages that changed are downloaded and parsed again
+(verify_live_tags*.py and debug_redirects.py sent no-cache and fetched
+everything every time).
+
+Redirects are followed one request per hop and every hop is recorded.
+A chain ends on a final answer, on a redirect to another host
+("external"), on a path it already visited ("loop") or after
+MAX_REDIRECT_HOPS redirects ("too-many-hops"). robots.txt is fetched
+(through the same cache) and honoured. A request that gets no HTTP
+answer (refused, timed out, DNS) is a status-0 hop and a crawl/status
+finding; the crawl goes on and the cached entry is kept.
+
+Two transports, same cache layout (entries are keyed by origin):
+
+  offline   the hosting simulator over public/ + firebase.json, with a
+            content-hash ETag and the file mtime as Last-Modified
+  --base    any HTTP origin: the live site, or the local stand-in that
+            `crawl serve` puts in front of the simulator
+
+    python scripts/mocyno-seo.py crawl run                      # offline, from /
+    python scripts/mocyno-seo.py crawl run --base https://mocyno.com --max-pages 50
+    python scripts/mocyno-seo.py crawl serve --port 8080        # simulator as a local HTTP server
+    python scripts/mocyno-seo.py crawl run --base http://127.0.0.1:8080
+"""
+
+import argparse
+import gzip
+import hashlib
+import http.client
+import json
+import mimetypes
+import sqlite3
+import sys
+import time
+import urllib.error
+import urllib.request
+import zlib
+from collections import Counter, deque
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from .config import BASE_URL, CACHE_DIR, FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import ERROR, INFO, WARN, Finding, write_jsonl
+from .hosting import MAX_REDIRECT_HOPS, HostingSimulator, load_hosting
+from .pagemodel import parse_page, site_path
+from .site import iter_site_files
+
+DEFAULT_DB = CACHE_DIR / "http-cache.sqlite"
+USER_AGENT = "mocyno-seo-crawler/1.0"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    status        INTEGER NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    location      TEXT,
+    headers       TEXT NOT NULL,
+    body          BLOB,
+    summary       TEXT,
+    fetched       REAL NOT NULL,
+    validated     REAL NOT NULL
+);
+"""
+
+
+class Fetched:
+    """One HTTP answer: status, lowercase headers, body, bytes on the wire (status 0: error, no answer)."""
+
+    __slots__ = ("status", "headers", "body", "wire", "error")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes = b"", wire: Optional[int] = None,
+                 error: str = ""):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.wire = len(body) if wire is None else wire
+        self.error = error
+
+
+class SimulatorTransport:
+    """Answers like Firebase Hosting would, from the tree and firebase.json."""
+
+    def __init__(self, public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH):
+        self.public_dir = Path(public_dir)
+        self.sim = HostingSimulator(iter_site_files(self.public_dir), load_hosting(firebase_json))
+        self.key = "sim:" + self.public_dir.as_posix()
+
+    def request(self, path: str, headers: Dict[str, str]) -> Fetched:
+        answer = self.sim.get(path)
+        out = {k.lower(): v for k, v in self.sim.headers.resolve(answer.path).items()}
+        if answer.is_redirect:
+            out["location"] = answer.location or "/"
+            return Fetched(answer.status, out)
+        if answer.file is None:
+            return Fetched(answer.status, out)
+        file = self.public_dir / answer.file
+        body = file.read_bytes()
+        out["etag"] = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        out["last-modified"] = formatdate(file.stat().st_mtime, usegmt=True)
+        out["content-type"] = mimetypes.guess_type(answer.file)[0] or "application/octet-stream"
+        if answer.status == 200 and out["etag"] in (t.strip() for t in headers.get("If-None-Match", "").split(",")):
+            return Fetched(304, out)
+        return Fetched(answer.status, out, body)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    """Plain HTTP(S) to one origin; redirects are returned, not followed."""
+
+    def __init__(self, base: str, timeout: float = 10):
+        parts = urlsplit(base)
+        self.key = f"{parts.scheme}://{parts.netloc}"
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(_NoRedirect)
+
+    def request(self, path: str, headers: Dict[str, str]) -> Fetched:
+        req = urllib.request.Request(self.key + path, headers=dict(
+            headers, **{"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}))
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                status, raw_headers, raw = resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as exc:
+            # 3xx (not followed), 304 and errors all land here
+            status, raw_headers, raw = exc.code, exc.headers, exc.read()
+        except (OSError, http.client.HTTPException) as exc:
+            # URLError (refused, DNS), timeouts, resets: no HTTP answer at all
+            return Fetched(0, {}, error=str(getattr(exc, "reason", None) or exc))
+        out = {k.lower(): v for k, v in raw_headers.items()}
+        body = gzip.decompress(raw) if out.get("content-encoding") == "gzip" and raw else raw
+        return Fetched(status, out, body, wire=len(raw))
+
+
+def summarize(body: bytes, path: str) -> Dict:
+    """What the checks need from a page, kept in the cache instead of reparsing."""
+    model = parse_page(body.decode("utf-8", "replace"))
+    source = path.split("?", 1)[0].lstrip("/")
+    links = []
+    for ref in model.links():
+        target = site_path(ref.url, source)
+        if target and target not in links:
+            links.append(target)
+    return {"title": model.title, "canonical": model.canonical, "robots": model.robots, "lang": model.lang,
+            "head_counts": model.head_counts, "hreflangs": len(model.hreflangs), "links": links}
+
+
+class Result:
+    """A crawled URL: its hops (status, path, location) and the final answer."""
+
+    __slots__ = ("path", "hops", "summary", "blocked", "error", "end")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hops: List[Tuple[int, str, Optional[str]]] = []
+        self.summary: Optional[Dict] = None
+        self.blocked = False
+        # Why the last hop got no HTTP answer
+        self.error = ""
+        # Why a chain stopped on a redirect: "external", "loop" or "too-many-hops"
+        self.end = ""
+
+    @property
+    def status(self) -> int:
+        return self.hops[-1][0] if self.hops else 0
+
+
+class Crawler:
+    """Conditional GETs through the on-disk cache, one transport."""
+
+    def __init__(self, transport, db_path: Path = DEFAULT_DB, robots: bool = True):
+        self.transport = transport
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        self.conn.commit()
+        self.stats: Counter = Counter()
+        # url -> row, for URLs already requested in this run (redirect targets are also links)
+        self._done: Dict[str, Union[sqlite3.Row, Dict]] = {}
+        self._robots: Optional[RobotFileParser] = None
+        self.robots = robots
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self) -> "Crawler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def fetch(self, path: str) -> Tuple[Union[sqlite3.Row, Dict], bool]:
+        """
+        (cache row after this request, whether the content changed). A
+        request with no answer gives {url, status: 0, location, error} and
+        leaves the cached entry as it was.
+        """
+        url = self.transport.key + path
+        if url in self._done:
+            return self._done[url], False
+        row = self.conn.execute("SELECT * FROM responses WHERE url = ?", (url,)).fetchone()
+        conditional = {}
+        if row is not None and row["status"] == 200:
+            if row["etag"]:
+                conditional["If-None-Match"] = row["etag"]
+            if row["last_modified"]:
+                conditional["If-Modified-Since"] = row["last_modified"]
+        answer = self.transport.request(path, conditional)
+        self.stats["requests"] += 1
+        if answer.status == 0:
+            self.stats["errors"] += 1
+            self._done[url] = {"url": url, "status": 0, "location": None, "error": answer.error}
+            return self._done[url], False
+        self.stats["wire"] += answer.wire
+        now = time.time()
+        if answer.status == 304 and row is not None:
+            self.stats["not_modified"] += 1
+            self.conn.execute("UPDATE responses SET validated = ? WHERE url = ?", (now, url))
+            self._done[url] = self.conn.execute("SELECT * FROM responses WHERE url = ?", (url,)).fetchone()
+            return self._done[url], False
+        self.stats["downloaded"] += 1
+        headers = answer.headers
+        body = zlib.compress(answer.body) if answer.status == 200 and answer.body else None
+        self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?, ?)",
+                          (url, answer.status, headers.get("etag"), headers.get("last-modified"),
+                           headers.get("location"), json.dumps(headers, sort_keys=True), body, now, now))
+        self._done[url] = self.conn.execute("SELECT * FROM responses WHERE url = ?", (url,)).fetchone()
+        return self._done[url], True
+
+    def body(self, row: sqlite3.Row) -> bytes:
+        return zlib.decompress(row["body"]) if row["body"] else b""
+
+    def allowed(self, path: str) -> bool:
+        if not self.robots:
+            return True
+        if self._robots is None:
+            self._robots = RobotFileParser()
+            row, _ = self.fetch("/robots.txt")
+            lines = self.body(row).decode("utf-8", "replace").splitlines() if row["status"] == 200 else []
+            self._robots.parse(lines)
+        return self._robots.can_fetch(USER_AGENT, BASE_URL + path)
+
+    def _local(self, location: str) -> Optional[str]:
+        """Path of a same-site redirect target, None for another host."""
+        parts = urlsplit(location)
+        if parts.netloc and self.transport.key != f"{parts.scheme}://{parts.netloc}" \
+                and site_path(location, "") is None:
+            return None
+        return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    def get(self, path: str) -> Result:
+        """Follow path hop by hop; pages are parsed only when they changed."""
+        result = Result(path)
+        seen = set()
+        while len(result.hops) <= MAX_REDIRECT_HOPS:
+            if not self.allowed(path):
+                result.blocked = True
+                self.stats["blocked"] += 1
+                break
+            row, changed = self.fetch(path)
+            result.hops.append((row["status"], path, row["location"]))
+            seen.add(path)
+            if row["status"] == 0:
+                result.error = row["error"]
+                break
+            if 300 <= row["status"] < 400 and row["location"]:
+                nxt = self._local(row["location"])
+                if nxt is None:
+                    result.end = "external"
+                    break
+                if nxt in seen:
+                    result.end = "loop"
+                    break
+                path = nxt
+                continue
+            if row["status"] == 200 and "html" in json.loads(row["headers"]).get("content-type", ""):
+                if changed or row["summary"] is None:
+                    result.summary = summarize(self.body(row), path)
+                    self.conn.execute("UPDATE responses SET summary = ? WHERE url = ?",
+                                      (json.dumps(result.summary), row["url"]))
+                    self._done[row["url"]] = self.conn.execute(
+                        "SELECT * FROM responses WHERE url = ?", (row["url"],)).fetchone()
+                    self.stats["parsed"] += 1
+                else:
+                    result.summary = json.loads(row["summary"])
+            break
+        else:
+            result.end = "too-many-hops"
+        return result
+
+    def crawl(self, seeds: List[str], max_pages: int = 500, follow: bool = True) -> List[Result]:
+        """Breadth-first over same-site links from seeds."""
+        queue = deque(seeds)
+        queued = set(seeds)
+        results: List[Result] = []
+        while queue and len(results) < max_pages:
+            result = self.get(queue.popleft())
+            results.append(result)
+            if follow and result.summary:
+                for link in result.summary["links"]:
+                    if link not in queued:
+                        queued.add(link)
+                        queue.append(link)
+        self.conn.commit()
+        return results
+
+
+def check(results: List[Result]) -> List[Finding]:
+    out = []
+    for r in results:
+        if r.blocked:
+            continue
+        final = r.hops[-1] if r.hops else (0, r.path, None)
+        redirects = sum(1 for status, _, _ in r.hops if 300 <= status < 400)
+        if r.error:
+            out.append(Finding("crawl/status", ERROR, r.path, f"no answer from {final[1]}: {r.error}", key="0"))
+        elif final[0] >= 400 or final[0] == 0:
+            out.append(Finding("crawl/status", ERROR, r.path, f"answers {final[0]}"
+                               + (f" after {redirects} redirect(s)" if redirects else ""), key=str(final[0])))
+        elif r.end == "loop":
+            out.append(Finding("crawl/redirect-loop", ERROR, r.path,
+                               " -> ".join(p for _, p, _ in r.hops) + f" -> {final[2]}"))
+        elif r.end == "too-many-hops":
+            out.append(Finding("crawl/too-many-hops", ERROR, r.path,
+                               f"still redirecting after {redirects} hops: "
+                               + " -> ".join(p for _, p, _ in r.hops), key=str(redirects)))
+        elif r.end == "external":
+            out.append(Finding("crawl/redirect-external", INFO, r.path,
+                               " -> ".join(p for _, p, _ in r.hops) + f" -> {final[2]}",
+                               key=urlsplit(final[2]).netloc))
+        elif 300 <= final[0] < 400:
+            out.append(Finding("crawl/status", ERROR, r.path, f"answers {final[0]} without Location",
+                               key=str(final[0])))
+        elif redirects > 1:
+            out.append(Finding("crawl/redirect-chain", WARN, r.path,
+                               f"{redirects} hops: " + " -> ".join(p for _, p, _ in r.hops), key=str(redirects)))
+        if r.summary is None:
+            continue
+        if r.summary["canonical"] is None:
+            out.append(Finding("crawl/canonical-missing", WARN, final[1], "no rel=canonical"))
+        for tag, count in sorted(r.summary["head_counts"].items()):
+            if count != 1:
+                out.append(Finding("crawl/head-count", WARN, final[1], f"{count} {tag} in <head>",
+                                   key=f"{tag} {count}"))
+    return out
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    transport: SimulatorTransport
+
+    def do_GET(self):
+        answer = self.transport.request(self.path, {k: v for k, v in self.headers.items()})
+        self.send_response(answer.status)
+        for key, value in answer.headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(answer.body)))
+        self.end_headers()
+        self.wfile.write(answer.body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the hosting simulator over HTTP (local stand-in).")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    handler = type("StandIn", (_StandIn,), {"transport": SimulatorTransport(args.src, args.firebase)})
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"[OK] {args.src} sur http://127.0.0.1:{server.server_port}/ (Ctrl+C pour arreter)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Crawl with conditional requests through an on-disk HTTP cache.")
+    parser.add_argument("seeds", nargs="*", default=["/"], help="paths to start from (default: /)")
+    parser.add_argument("--base", metavar="URL", help="HTTP origin to crawl (default: offline simulator)")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root for the simulator")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="HTTP cache database")
+    parser.add_argument("--max-pages", type=int, default=500)
+    parser.add_argument("--no-follow", action="store_true", help="fetch the seeds only")
+    parser.add_argument("--ignore-robots", action="store_true", help="do not fetch or honour robots.txt")
+    parser.add_argument("--hops", action="store_true", help="print every redirect hop")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write the findings as JSON lines")
+    parser.add_argument("--show", type=int, default=10, help="findings listed")
+    args = parser.parse_args(argv)
+
+    transport = HttpTransport(args.base) if args.base else SimulatorTransport(args.src, args.firebase)
+    start = time.perf_counter()
+    with Crawler(transport, args.db, robots=not args.ignore_robots) as crawler:
+        results = crawler.crawl(args.seeds, args.max_pages, follow=not args.no_follow)
+        stats = crawler.stats
+    ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n[CRAWL] {transport.key} : {len(results)} URL(s), {stats['requests']} requete(s) en {ms:.0f} ms")
+    print("=" * 70)
+    print(f"   304 (cache valide)   {stats['not_modified']:>6}")
+    print(f"   telecharges          {stats['downloaded']:>6}")
+    print(f"   pages parsees        {stats['parsed']:>6}")
+    print(f"   bloques (robots.txt) {stats['blocked']:>6}")
+    print(f"   sans reponse         {stats['errors']:>6}")
+    print(f"   octets recus         {stats['wire']:>6}")
+    if args.hops:
+        print("-" * 70)
+        for r in results:
+            if len(r.hops) > 1:
+                print(r.path)
+                for status, path, location in r.hops:
+                    print(f"   {status}  {path}" + (f" -> {location}" if location else ""))
+    print("-" * 70)
+    found = check(results)
+    if args.jsonl:
+        write_jsonl(found, args.jsonl)
+    for f in found[:args.show]:
+        print(f)
+    if len(found) > args.show:
+        print(f"   ... +{len(found) - args.show}")
+    if not found:
+        print("[OK] Aucune anomalie")
+    return 1 if any(f.severity == ERROR for f in found) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+"""
+CSS - tokenizer, parser and validator
+Parses a stylesheet once into a small AST (style rules, at-rules,
+declarations, each with line/column) and caches it by content hash in
+.seo-cache/css/, so the validator and the unused-CSS and critical-CSS
+stages all share one parse per file version.
+
+Checks (rule ids):
+  css/syntax                 tokenizer or parser error, with line:column
+  css/duplicate-selector     same selector in the same @media context twice
+                             (info: minifiers split rules this way)
+  css/overridden             a declaration always overridden by a later one
+                             (same rule or same selector in the same context)
+  css/unused-media           @media block that is empty or whose rules match
+                             nothing on the pages loading the stylesheet
+
+Value fallbacks (vendor prefixes, var(), clamp(), dvh...) are not reported
+as overridden: the earlier declaration is there for older browsers.
+"""
+
+import argparse
+import hashlib
+import pickle
+import re
+import sys
+from collections import defaultdict
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .config import CACHE_DIR, PUBLIC_DIR
+from .findings import ERROR, INFO, WARN, Finding, write_jsonl
+
+# Bump when the AST changes shape: old cache entries are then ignored
+PARSER_VERSION = 1
+CSS_CACHE_DIR = CACHE_DIR / "css"
+DEFAULT_FILES = ("styles.css", "styles-compat-patch.css", "css/luxe.css", "swiper-bundle.min.css")
+
+# At-rules whose block holds rules, declarations, or keyframe blocks
+GROUPING_AT_RULES = {"media", "supports", "document", "layer", "container", "scope"}
+KEYFRAMES_AT_RULES = {"keyframes", "-webkit-keyframes", "-moz-keyframes"}
+FALLBACK_VALUE = re.compile(r"-(?:webkit|moz|ms|o)-|\b(?:var|env|min|max|clamp|color-mix|oklch|lch|lab)\(|"
+                            r"\d(?:dvh|svh|lvh|dvw|svw|lvw|cqw|cqh)\b", re.I)
+# Classes set by JavaScript the usage scan cannot see (Swiper builds its DOM at runtime)
+DYNAMIC_PREFIXES = ("swiper",)
+
+
+# --- tokenizer ---------------------------------------------------------------
+
+class Token:
+    __slots__ = ("kind", "value", "line", "col")
+
+    def __init__(self, kind: str, value: str, line: int, col: int):
+        self.kind = kind
+        self.value = value
+        self.line = line
+        self.col = col
+
+    def __repr__(self) -> str:
+        return f"<{self.kind} {self.value!r} {self.line}:{self.col}>"
+
+
+_TOKEN_RE = re.compile(
+    r"(?P<ws>\s+)|(?P<comment>/\*.*?(?:\*/|\Z))|(?P<str>\"(?:[^\"\\\n]|\\.)*(?:\"|$)|'(?:[^'\\\n]|\\.)*(?:'|$))"
+    r"|(?P<url>url\(\s*(?![\"'])[^)]*\)?)|(?P<punct>[{}();:,\[\]])|(?P<other>(?:[^\s{}();:,\[\]\"'/\\]|\\.|/(?!\*))+)",
+    re.S | re.I | re.M)
+
+
+def tokenize(text: str, errors: List[Tuple[int, int, str]]) -> List[Token]:
+    """Tokens without whitespace/comments, except one "ws" token between words."""
+    tokens: List[Token] = []
+    line, line_start, pos, n = 1, 0, 0, len(text)
+    while pos < n:
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:  # lone backslash at end of input
+            errors.append((line, pos - line_start + 1, f"unexpected {text[pos]!r}"))
+            pos += 1
+            continue
+        kind, value = m.lastgroup, m.group()
+        col = pos - line_start + 1
+        if kind == "comment" and not value.endswith("*/"):
+            errors.append((line, col, "unterminated comment"))
+        elif kind == "str" and (len(value) < 2 or value[-1] != value[0]):
+            errors.append((line, col, "unterminated string"))
+        elif kind == "url" and not value.endswith(")"):
+            errors.append((line, col, "unterminated url("))
+        if kind == "ws":
+            if tokens and tokens[-1].kind != "ws":
+                tokens.append(Token("ws", " ", line, col))
+        elif kind != "comment":
+            tokens.append(Token(value if kind == "punct" else kind, value, line, col))
+        newlines = value.count("\n")
+        if newlines:
+            line += newlines
+            line_start = pos + value.rfind("\n") + 1
+        pos = m.end()
+    return tokens
+
+
+# --- AST ---------------------------------------------------------------------
+
+class Declaration:
+    __slots__ = ("name", "value", "important", "line", "col")
+
+    def __init__(self, name: str, value: str, important: bool, line: int, col: int):
+        self.name = name
+        self.value = value
+        self.important = important
+        self.line = line
+        self.col = col
+
+    def css(self) -> str:
+        return f"{self.name}:{self.value}{'!important' if self.important else ''}"
+
+
+class StyleRule:
+    __slots__ = ("selectors", "declarations", "line", "col")
+
+    def __init__(self, selectors: List[str], declarations: List[Declaration], line: int, col: int):
+        self.selectors = selectors
+        self.declarations = declarations
+        self.line = line
+        self.col = col
+
+    def css(self) -> str:
+        return ",".join(self.selectors) + "{" + ";".join(d.css() for d in self.declarations) + "}"
+
+
+class AtRule:
+    """@name prelude; or @name prelude { rules | declarations }."""
+    __slots__ = ("name", "prelude", "rules", "declarations", "line", "col")
+
+    def __init__(self, name: str, prelude: str, line: int, col: int):
+        self.name = name
+        self.prelude = prelude
+        self.rules: Optional[List] = None
+        self.declarations: Optional[List[Declaration]] = None
+        self.line = line
+        self.col = col
+
+    def css(self) -> str:
+        head = f"@{self.name}" + (f" {self.prelude}" if self.prelude else "")
+        if self.rules is not None:
+            return head + "{" + "".join(r.css() for r in self.rules) + "}"
+        if self.declarations is not None:
+            return head + "{" + ";".join(d.css() for d in self.declarations) + "}"
+        return head + ";"
+
+
+class Stylesheet:
+    __slots__ = ("name", "digest", "rules", "errors")
+
+    def __init__(self, name: str, digest: str, rules: List, errors: List[Tuple[int, int, str]]):
+        self.name = name
+        self.digest = digest
+        self.rules = rules
+        self.errors = errors
+
+    def walk(self) -> Iterator[Tuple[Tuple[str, ...], StyleRule]]:
+        """(at-rule context, style rule) for every style rule, keyframe blocks excluded."""
+        def visit(rules: List, context: Tuple[str, ...]):
+            for rule in rules:
+                if isinstance(rule, StyleRule):
+                    yield context, rule
+                elif rule.rules is not None and rule.name.lower() not in KEYFRAMES_AT_RULES:
+                    yield from visit(rule.rules, context + (f"@{rule.name} {rule.prelude}".strip(),))
+        return visit(self.rules, ())
+
+    def at_rules(self, name: str) -> Iterator[AtRule]:
+        def visit(rules: List):
+            for rule in rules:
+                if isinstance(rule, AtRule):
+                    if rule.name.lower() == name:
+                        yield rule
+                    if rule.rules is not None:
+                        yield from visit(rule.rules)
+        return visit(self.rules)
+
+
+# --- parser ------------------------------------------------------------------
+
+def _join(tokens: List[Token]) -> str:
+    return "".join(t.value for t in tokens).strip()
+
+
+class Parser:
+    def __init__(self, tokens: List[Token], errors: List[Tuple[int, int, str]]):
+        self.tokens = tokens
+        self.pos = 0
+        self.errors = errors
+
+    def error(self, token: Optional[Token], message: str) -> None:
+        if token is None:
+            token = self.tokens[-1] if self.tokens else Token("eof", "", 1, 1)
+        self.errors.append((token.line, token.col, message))
+
+    def peek(self) -> Optional[Token]:
+        while self.pos < len(self.tokens) and self.tokens[self.pos].kind == "ws":
+            self.pos += 1
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def rule_list(self, nested: bool) -> List:
+        rules: List = []
+        while True:
+            tok = self.peek()
+            if tok is None:
+                return rules
+            if tok.kind == "}":
+                if nested:
+                    return rules
+                self.error(tok, "unexpected '}'")
+                self.pos += 1
+            elif tok.kind == ";":
+                self.pos += 1
+            elif tok.kind == "other" and tok.value.startswith("@"):
+                rules.append(self.at_rule())
+            else:
+                rule = self.style_rule()
+                if rule is not None:
+                    rules.append(rule)
+
+    def component(self, stop: str) -> Tuple[List[Token], Optional[Token]]:
+        """Tokens up to one of `stop` at depth 0 (parens/brackets balanced)."""
+        out: List[Token] = []
+        depth: List[str] = []
+        while self.pos < len(self.tokens):
+            tok = self.tokens[self.pos]
+            if not depth and tok.kind in stop:
+                return out, tok
+            if tok.kind in "([":
+                depth.append(")" if tok.kind == "(" else "]")
+            elif tok.kind in ")]":
+                if depth and depth[-1] == tok.kind:
+                    depth.pop()
+                else:
+                    self.error(tok, f"unbalanced {tok.kind!r}")
+            elif tok.kind in "{}" and depth:
+                self.error(tok, f"unclosed {depth[-1].replace(')', '(').replace(']', '[')!r} before {tok.kind!r}")
+                depth.clear()
+                continue
+            out.append(tok)
+            self.pos += 1
+        return out, None
+
+    def block_end(self, open_tok: Token) -> None:
+        tok = self.peek()
+        if tok is None:
+            self.error(open_tok, "'{' never closed")
+        else:
+            self.pos += 1  # the '}'
+
+    def at_rule(self) -> AtRule:
+        start = self.tokens[self.pos]
+        self.pos += 1
+        prelude, end = self.component("{;}")
+        rule = AtRule(start.value[1:], _join(prelude), start.line, start.col)
+        if end is None:
+            self.error(start, f"@{rule.name} without ';' or block")
+            return rule
+        if end.kind in ";}":
+            if end.kind == ";":
+                self.pos += 1
+            return rule
+        self.pos += 1
+        name = rule.name.lower()
+        if name in GROUPING_AT_RULES:
+            rule.rules = self.rule_list(nested=True)
+        elif name in KEYFRAMES_AT_RULES:
+            rule.rules = self.keyframe_list()
+        else:
+            rule.declarations = self.declarations()
+        self.block_end(end)
+        return rule
+
+    def keyframe_list(self) -> List[StyleRule]:
+        frames = []
+        while True:
+            tok = self.peek()
+            if tok is None or tok.kind == "}":
+                return frames
+            rule = self.style_rule()
+            if rule is not None:
+                frames.append(rule)
+
+    def style_rule(self) -> Optional[StyleRule]:
+        start = self.peek()
+        prelude, end = self.component("{;}")
+        if end is None or end.kind != "{":
+            self.error(start, f"selector {_join(prelude)[:40]!r} without a block")
+            if end is not None and end.kind == ";":
+                self.pos += 1
+            return None
+        self.pos += 1
+        selectors = [s.strip() for s in _join(prelude).split(",")]
+        if not prelude or any(not s for s in selectors):
+            self.error(start, "empty selector")
+        rule = StyleRule([s for s in selectors if s], self.declarations(), start.line, start.col)
+        self.block_end(end)
+        return rule
+
+    def declarations(self) -> List[Declaration]:
+        out: List[Declaration] = []
+        while True:
+            tok = self.peek()
+            if tok is None or tok.kind == "}":
+                return out
+            if tok.kind == ";":
+                self.pos += 1
+                continue
+            parts, end = self.component(";{}")
+            if end is not None and end.kind == "{":
+                self.error(tok, "nested block inside a declaration list")
+                self.pos += 1
+                self.declarations()
+                self.block_end(end)
+                continue
+            if end is not None and end.kind == ";":
+                self.pos += 1
+            words = [t for t in parts if t.kind != "ws"]
+            if len(words) < 2 or words[1].kind != ":" or words[0].kind != "other":
+                self.error(tok, f"expected 'property: value', got {_join(parts)[:40]!r}")
+                continue
+            value = _join(parts[parts.index(words[1]) + 1:])
+            important = bool(re.search(r"!\s*important\s*$", value, re.I))
+            if important:
+                value = re.sub(r"\s*!\s*important\s*$", "", value, flags=re.I)
+            if not value:
+                self.error(tok, f"empty value for {words[0].value}")
+            out.append(Declaration(words[0].value.lower() if not words[0].value.startswith("--")
+                                   else words[0].value, value, important, tok.line, tok.col))
+
+
+def parse(text: str, name: str = "") -> Stylesheet:
+    errors: List[Tuple[int, int, str]] = []
+    tokens = tokenize(text, errors)
+    rules = Parser(tokens, errors).rule_list(nested=False)
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    return Stylesheet(name, digest, rules, sorted(errors))
+
+
+_MEMO: Dict[str, Stylesheet] = {}
+
+
+def load(path: Path, name: Optional[str] = None, cache_dir: Optional[Path] = CSS_CACHE_DIR) -> Stylesheet:
+    """
+    Parsed stylesheet, from memory or the on-disk cache when the content
+    hash matches; parsed (and cached) otherwise.
+    """
+    raw = Path(path).read_bytes()
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    key = f"{digest}-v{PARSER_VERSION}"
+    sheet = _MEMO.get(key)
+    if sheet is None and cache_dir is not None:
+        try:
+            with open(Path(cache_dir) / f"{key}.pickle", "rb") as f:
+                sheet = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            sheet = None
+    if sheet is None:
+        sheet = parse(raw.decode("utf-8", errors="replace"))
+        sheet.digest = digest
+        if cache_dir is not None:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            tmp = Path(cache_dir) / f"{key}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(sheet, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(Path(cache_dir) / f"{key}.pickle")
+    sheet.name = name or Path(path).name
+    _MEMO[key] = sheet
+    return sheet
+
+
+# --- usage: which selectors can match the site -----------------------------
+
+class Usage:
+    """Tags, classes, ids and attribute names present on a set of pages."""
+
+    def __init__(self):
+        self.tags: Set[str] = {"html", "body", "*"}
+        self.classes: Set[str] = set()
+        self.ids: Set[str] = set()
+        self.attrs: Set[str] = set()
+
+    def update(self, other: "Usage") -> None:
+        self.tags |= other.tags
+        self.classes |= other.classes
+        self.ids |= other.ids
+        self.attrs |= other.attrs
+
+
+_PSEUDO_FN = re.compile(r"::?(?:not|nth-[\w-]+)\((?:[^()]|\([^()]*\))*\)", re.I)
+_PSEUDO = re.compile(r"::?[\w-]+", re.I)
+_ALWAYS_FN = re.compile(r":(?:is|where|has|host|global)\(", re.I)
+_COMBINATOR = re.compile(r"\s*[>+~]\s*|\s+")
+
+
+def selector_used(selector: str, usage: Usage) -> bool:
+    """
+    Whether every compound of the selector can match something in usage.
+    Conservative: co-occurrence on one element is not checked.
+    """
+    if _ALWAYS_FN.search(selector):
+        return True
+    bare = _PSEUDO.sub("", _PSEUDO_FN.sub("", selector))
+    for compound in _COMBINATOR.split(bare.strip()):
+        if not compound:
+            continue
+        tag = re.match(r"[a-zA-Z][\w-]*", compound)
+        if tag and tag.group().lower() not in usage.tags:
+            return False
+        for cls in re.findall(r"\.((?:[\w-]|\\.)+)", compound):
+            if cls not in usage.classes and not cls.startswith(DYNAMIC_PREFIXES):
+                return False
+        for ident in re.findall(r"#((?:[\w-]|\\.)+)", compound):
+            if ident not in usage.ids:
+                return False
+        for attr in re.findall(r"\[\s*([\w-]+)", compound):
+            if attr.lower() not in usage.attrs:
+                return False
+    return True
+
+
+_SCRIPT_WORD = re.compile(r"[\"'`]([\w\- ]+)[\"'`]")
+
+
+class UsageParser(HTMLParser):
+    """Usage of one page, plus the usage of the part above the fold."""
+
+    # Elements after <body> counted as above the fold when no <section> closes first
+    FOLD_ELEMENTS = 150
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.usage = Usage()
+        self.fold = Usage()
+        self.stylesheets: List[str] = []
+        self._in_body = False
+        self._fold_open = True
+        self._section_depth = 0
+        self._seen = 0
+        self._in_script = False
+
+    def _add(self, usage: Usage, tag: str, attrs: Dict[str, Optional[str]]) -> None:
+        usage.tags.add(tag)
+        usage.attrs.update(attrs)
+        usage.classes.update((attrs.get("class") or "").split())
+        if attrs.get("id"):
+            usage.ids.add(attrs["id"])
+
+    def handle_starttag(self, tag, attrs):
+        attr_dict = {k.lower(): v for k, v in attrs}
+        self._add(self.usage, tag, attr_dict)
+        # Inline handlers toggle classes: onclick="...classList.toggle('open')"
+        for name, value in attr_dict.items():
+            if name.startswith("on") and value:
+                self._script_words(value)
+        rel = (attr_dict.get("rel") or "").lower()
+        if tag == "link" and attr_dict.get("href") and (
+                "stylesheet" in rel or ("preload" in rel and attr_dict.get("as") == "style")):
+            self.stylesheets.append(attr_dict["href"])
+        elif tag == "script":
+            self._in_script = True
+        elif tag == "body":
+            self._in_body = True
+        if self._in_body and self._fold_open:
+            self._add(self.fold, tag, attr_dict)
+            self._seen += 1
+            if tag == "section":
+                self._section_depth += 1
+            if self._seen >= self.FOLD_ELEMENTS:
+                self._fold_open = False
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_script = False
+        elif tag == "section" and self._section_depth:
+            self._section_depth -= 1
+            if not self._section_depth:
+                self._fold_open = False
+
+    def handle_data(self, data):
+        if self._in_script:
+            self._script_words(data)
+
+    def _script_words(self, text: str) -> None:
+        for m in _SCRIPT_WORD.finditer(text):
+            words = m.group(1).split()
+            self.usage.classes.update(words)
+            self.usage.ids.update(words)
+            if self._fold_open:
+                self.fold.classes.update(words)
+
+
+def site_usage(public_dir: Path = PUBLIC_DIR) -> Tuple[Dict[str, Usage], Dict[str, Usage]]:
+    """({stylesheet rel: usage of the pages loading it}, {page rel: above-the-fold usage})."""
+    from .loader import read_text
+    from .pagemodel import site_path
+    from .site import is_site_page, iter_site_files
+
+    per_sheet: Dict[str, Usage] = defaultdict(Usage)
+    fold: Dict[str, Usage] = {}
+    script_words = UsageParser()
+    for rel in iter_site_files(public_dir):
+        if rel.endswith(".js") and not rel.startswith(("admin/", "client", "mobile/")):
+            script_words._script_words(read_text(public_dir / rel))
+    for rel in iter_site_files(public_dir):
+        if not is_site_page(rel):
+            continue
+        parser = UsageParser()
+        parser.feed(read_text(public_dir / rel))
+        parser.close()
+        parser.usage.update(script_words.usage)
+        fold[rel] = parser.fold
+        for href in parser.stylesheets:
+            path = site_path(href, rel)
+            if path:
+                per_sheet[path.lstrip("/")].update(parser.usage)
+    return dict(per_sheet), fold
+
+
+def unused_rules(sheet: Stylesheet, usage: Usage) -> List[Tuple[Tuple[str, ...], StyleRule, List[str]]]:
+    """(context, rule, unused selectors) for rules with at least one unused selector."""
+    out = []
+    for context, rule in sheet.walk():
+        unused = [s for s in rule.selectors if not selector_used(s, usage)]
+        if unused:
+            out.append((context, rule, unused))
+    return out
+
+
+def critical_css(sheet: Stylesheet, usage: Usage) -> str:
+    """Rules (inside their @media/@supports wrappers) matching usage, as minified CSS."""
+    def emit(rules: List) -> str:
+        out = []
+        for rule in rules:
+            if isinstance(rule, StyleRule):
+                used = [s for s in rule.selectors if selector_used(s, usage)]
+                if used and rule.declarations:
+                    out.append(StyleRule(used, rule.declarations, rule.line, rule.col).css())
+            elif rule.name.lower() in GROUPING_AT_RULES and rule.rules is not None:
+                inner = emit(rule.rules)
+                if inner:
+                    out.append(f"@{rule.name} {rule.prelude}{{{inner}}}")
+            elif rule.name.lower() in ("font-face", "import", "charset") or rule.prelude.startswith("--"):
+                continue
+        return "".join(out)
+    root_vars = [r.css() for _, r in sheet.walk() if r.selectors == [":root"]]
+    body = emit(sheet.rules)
+    return "".join(v for v in root_vars if v not in body) + body
+
+
+# --- checks ------------------------------------------------------------------
+
+def _is_fallback(earlier: Declaration, later: Declaration) -> bool:
+    return bool(FALLBACK_VALUE.search(earlier.value) or FALLBACK_VALUE.search(later.value)) \
+        and earlier.value != later.value
+
+
+def check(sheet: Stylesheet, usage: Optional[Usage] = None) -> List[Finding]:
+    out = [Finding("css/syntax", ERROR, sheet.name, message, f"line {line}:{col}")
+           for line, col, message in sheet.errors]
+
+    first_seen: Dict[Tuple[Tuple[str, ...], str], StyleRule] = {}
+    # (context, selector, property) -> declaration currently winning
+    winning: Dict[Tuple[Tuple[str, ...], str, str], Declaration] = {}
+    for context, rule in sheet.walk():
+        where = " ".join(context)
+        for selector in rule.selectors:
+            key = (context, " ".join(selector.split()))
+            earlier = first_seen.get(key)
+            if earlier is not None and earlier is not rule:
+                out.append(Finding("css/duplicate-selector", INFO, sheet.name,
+                                   f"{selector} {where}".strip() + f" already at line {earlier.line}:{earlier.col}",
+                                   f"line {rule.line}:{rule.col}", key=f"{where} {key[1]} #{rule.line}"))
+            else:
+                first_seen[key] = rule
+            for decl in rule.declarations:
+                slot = (context, key[1], decl.name)
+                prev = winning.get(slot)
+                if prev is not None and prev is not decl and not (prev.important and not decl.important) \
+                        and not _is_fallback(prev, decl):
+                    out.append(Finding("css/overridden", INFO if prev.value == decl.value else WARN, sheet.name,
+                                       f"{key[1]} {{{prev.name}:{prev.value}}} overridden at line "
+                                       f"{decl.line}:{decl.col} by {decl.value}",
+                                       f"line {prev.line}:{prev.col}",
+                                       key=f"{where} {key[1]} {prev.name}:{prev.value}"))
+                if prev is None or not (prev.important and not decl.important):
+                    winning[slot] = decl
+
+    for media in sheet.at_rules("media"):
+        if not media.rules:
+            out.append(Finding("css/unused-media", WARN, sheet.name, f"@media {media.prelude} is empty",
+                               f"line {media.line}:{media.col}", key=media.prelude))
+        elif usage is not None and all(
+                isinstance(r, StyleRule) and not any(selector_used(s, usage) for s in r.selectors)
+                for r in media.rules):
+            out.append(Finding("css/unused-media", WARN, sheet.name,
+                               f"@media {media.prelude}: none of its {len(media.rules)} rule(s) match a page",
+                               f"line {media.line}:{media.col}", key=media.prelude))
+    return out
+
+
+def _sheets(public_dir: Path, files: List[str]) -> List[Tuple[str, Stylesheet]]:
+    out = []
+    for rel in files:
+        path = public_dir / rel
+        if path.is_file():
+            out.append((rel, load(path, rel)))
+        else:
+            print(f"[WARN] {rel} introuvable")
+    return out
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Optional[Path] = None,
+             files: Tuple[str, ...] = DEFAULT_FILES) -> List[Finding]:
+    usage, _ = site_usage(Path(public_dir))
+    out = []
+    for rel, sheet in _sheets(Path(public_dir), list(files)):
+        out.extend(check(sheet, usage.get(rel, Usage())))
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="CSS parser: validate, find unused rules, extract critical CSS.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("check", parents=[common],
+                       help="syntax, duplicate selectors, overridden declarations, unused @media")
+    c.add_argument("files", nargs="*", default=list(DEFAULT_FILES), help="stylesheets under --src")
+    c.add_argument("--syntax-only", action="store_true", help="skip the site usage scan")
+    c.add_argument("--jsonl", type=Path, metavar="PATH", help="also write findings as JSON lines")
+    c.add_argument("--show", type=int, default=10, help="findings listed per rule and file")
+    u = sub.add_parser("unused", parents=[common], help="selectors matching no page that loads the stylesheet")
+    u.add_argument("files", nargs="*", default=list(DEFAULT_FILES))
+    k = sub.add_parser("critical", parents=[common], help="above-the-fold CSS of a page")
+    k.add_argument("page", help="page under --src, e.g. fr/index.html")
+    k.add_argument("-o", "--output", type=Path, help="write the CSS here (default: stdout)")
+    args = parser.parse_args(argv)
+    public_dir = Path(args.src)
+
+    if args.command == "check":
+        usage = None if args.syntax_only else site_usage(public_dir)[0]
+        found: List[Finding] = []
+        print(f"\n[CSS] {len(args.files)} feuille(s) de style")
+        print("=" * 70)
+        for rel, sheet in _sheets(public_dir, args.files):
+            items = check(sheet, None if usage is None else usage.get(rel, Usage()))
+            found.extend(items)
+            rules = sum(1 for _ in sheet.walk())
+            errors = sum(1 for f in items if f.severity == ERROR)
+            print(f"{'[ERREUR]' if errors else '[OK]':8} {rel:28} {rules:>5} regles, {errors} erreur(s), "
+                  f"{len(items) - errors} remarque(s)")
+            by_rule: Dict[str, List[Finding]] = defaultdict(list)
+            for f in items:
+                by_rule[f.rule].append(f)
+            for rule_id, group in by_rule.items():
+                for f in group[:args.show]:
+                    print(f"            {f}")
+                if len(group) > args.show:
+                    print(f"            ... +{len(group) - args.show} {rule_id}")
+        if args.jsonl:
+            write_jsonl(found, args.jsonl)
+        return 1 if any(f.severity == ERROR for f in found) else 0
+
+    if args.command == "unused":
+        usage = site_usage(public_dir)[0]
+        for rel, sheet in _sheets(public_dir, args.files):
+            unused = unused_rules(sheet, usage.get(rel, Usage()))
+            total = sum(1 for _ in sheet.walk())
+            dead = [r for _, r, sel in unused if len(sel) == len(r.selectors)]
+            saved = sum(len(r.css()) for r in dead)
+            print(f"\n[UNUSED] {rel} : {len(dead)}/{total} regle(s) inutilisee(s), ~{saved / 1024:.1f} KB")
+            for context, rule, selectors in unused[:40]:
+                where = f" ({' '.join(context)})" if context else ""
+                print(f"   line {rule.line}:{rule.col}  {', '.join(selectors)}{where}")
+            if len(unused) > 40:
+                print(f"   ... +{len(unused) - 40}")
+        return 0
+
+    _, fold = site_usage(public_dir)
+    if args.page not in fold:
+        print(f"[ERREUR] Page inconnue : {args.page}")
+        return 2
+    from .loader import read_text
+    from .pagemodel import site_path
+
+    page = UsageParser()
+    page.feed(read_text(public_dir / args.page))
+    chunks = []
+    for href in page.stylesheets:
+        path = site_path(href, args.page)
+        if path and (public_dir / path.lstrip("/")).is_file():
+            chunks.append(critical_css(load(public_dir / path.lstrip("/"), path.lstrip("/")), fold[args.page]))
+    css = "".join(chunks)
+    if args.output:
+        args.output.write_text(css, encoding="utf-8")
+        print(f"[OK] {len(css) / 1024:.1f} KB de CSS critique -> {args.output}")
+    else:
+        print(css)
+    return 0
+
+
+def check_main(argv: Optional[List[str]] = None) -> int:
+    """mocyno-seo verify css"""
+    return main(["check"] + list(argv or []))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+DEPLOY - delta against the last deployed tree
+Records the SHA-256 of every deployable file (and of firebase.json) in
+deploy-manifest.json at the repository root, committed with the release,
+and compares the next tree against it:
+
+  added / removed / changed   files whose content changed
+  volatile                    changed only in bytes that carry no content:
+                              sitemap <lastmod>, JSON-LD dateModified
+
+The files are the ones `firebase deploy` uploads: everything under the
+hosting "public" directory that the hosting "ignore" globs leave, read
+from firebase.json, so a stray file the site tools skip (*.bak) still
+shows up if firebase.json would ship it.
+
+A fixer that rewrites a page with the same bytes leaves no trace here.
+One that only moves a date still makes the page upload, and shows up
+as volatile: that is churn to remove from the fixer, not content.
+
+For text files the manifest also keeps a "stable" hash, taken with the
+volatile patterns blanked out; a changed file whose stable hash matches
+is volatile.
+
+    python scripts/mocyno-seo.py deploy diff                  # delta since the recorded deploy
+    python scripts/mocyno-seo.py deploy diff --list up.txt    # paths to upload, one per line
+    python scripts/mocyno-seo.py deploy record                # after a deploy: record the tree
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import DEPLOY_MANIFEST_PATH, FIREBASE_JSON_PATH, PUBLIC_DIR
+from .hosting import glob_to_regex, load_hosting
+from .site import iter_site_files
+
+MANIFEST_VERSION = 1
+TEXT_SUFFIXES = (".html", ".xml", ".txt", ".css", ".js", ".json", ".webmanifest")
+
+# (name, pattern): bytes that change without the content changing
+VOLATILE: Sequence[Tuple[str, "re.Pattern"]] = (
+    ("lastmod", re.compile(rb"<lastmod>[^<]*</lastmod>")),
+    ("dateModified", re.compile(rb'"dateModified"\s*:\s*"[^"]*"')),
+)
+
+
+def stable_bytes(raw: bytes) -> Tuple[bytes, List[str]]:
+    """raw with every volatile match blanked, and the patterns that matched."""
+    found = []
+    for name, pattern in VOLATILE:
+        raw, count = pattern.subn(name.encode("ascii"), raw)
+        if count:
+            found.append(name)
+    return raw, found
+
+
+def file_entry(path: Path) -> Dict:
+    raw = path.read_bytes()
+    entry = {"sha256": hashlib.sha256(raw).hexdigest(), "size": len(raw)}
+    if path.suffix.lower() in TEXT_SUFFIXES:
+        stable, found = stable_bytes(raw)
+        if found:
+            entry["stable"] = hashlib.sha256(stable).hexdigest()
+            entry["volatile"] = found
+    return entry
+
+
+def deployed_files(root: Path, ignore: Sequence[str]) -> Iterator[str]:
+    """Files under root that the hosting "ignore" globs leave, as POSIX relative paths."""
+    patterns = [glob_to_regex(glob)[0] for glob in ignore]
+
+    def ignored(rel: str) -> bool:
+        return any(p.match(rel) for p in patterns)
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        # An ignored directory is not uploaded at all
+        dirnames[:] = sorted(d for d in dirnames if not ignored(prefix + d))
+        for name in sorted(filenames):
+            if not ignored(prefix + name):
+                yield prefix + name
+
+
+def snapshot(root: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> Dict:
+    """Manifest of the tree as it would deploy now."""
+    root = Path(root)
+    if Path(firebase_json).is_file():
+        files = deployed_files(root, load_hosting(firebase_json).get("ignore", []))
+    else:
+        files = iter_site_files(root)
+    manifest = {"version": MANIFEST_VERSION, "files": {rel: file_entry(root / rel) for rel in files}}
+    if Path(firebase_json).is_file():
+        manifest["firebase.json"] = hashlib.sha256(Path(firebase_json).read_bytes()).hexdigest()
+    return manifest
+
+
+def load(path: Path = DEPLOY_MANIFEST_PATH) -> Optional[Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path}: manifest version {manifest.get('version')}, expected {MANIFEST_VERSION}")
+    return manifest
+
+
+def record(manifest: Dict, path: Path = DEPLOY_MANIFEST_PATH) -> None:
+    manifest = dict(manifest, recorded=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def diff(old: Dict, new: Dict) -> Dict[str, List[str]]:
+    """{added, removed, changed, volatile, unchanged} file lists; volatile files are not in changed."""
+    before, after = old.get("files", {}), new.get("files", {})
+    out: Dict[str, List[str]] = {"added": [], "removed": sorted(set(before) - set(after)),
+                                 "changed": [], "volatile": [], "unchanged": []}
+    for rel in sorted(after):
+        prev, cur = before.get(rel), after[rel]
+        if prev is None:
+            out["added"].append(rel)
+        elif prev["sha256"] == cur["sha256"]:
+            out["unchanged"].append(rel)
+        elif "stable" in cur and prev.get("stable") == cur["stable"]:
+            out["volatile"].append(rel)
+        else:
+            out["changed"].append(rel)
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Files changed since the last recorded deploy.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="deployed tree (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--manifest", type=Path, default=DEPLOY_MANIFEST_PATH, help="recorded deploy manifest")
+    sub = parser.add_subparsers(dest="command", required=True)
+    d = sub.add_parser("diff", help="added / removed / changed / volatile-only files")
+    d.add_argument("--list", type=Path, metavar="PATH", help="write the paths to upload, one per line")
+    d.add_argument("--json", action="store_true", help="print the delta as JSON")
+    d.add_argument("--show", type=int, default=15, help="files listed per section")
+    sub.add_parser("record", help="record the current tree as deployed")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    current = snapshot(args.src, args.firebase)
+    ms = (time.perf_counter() - start) * 1000
+
+    if args.command == "record":
+        record(current, args.manifest)
+        total = sum(e["size"] for e in current["files"].values())
+        print(f"[OK] {len(current['files'])} fichier(s), {total / 1024 / 1024:.1f} MB -> {args.manifest} "
+              f"({ms:.0f} ms)")
+        return 0
+
+    try:
+        previous = load(args.manifest)
+    except ValueError as exc:
+        print(f"[ERREUR] {exc}")
+        return 2
+    if previous is None:
+        print(f"[WARN] {args.manifest} absent : tout le site serait envoye ('deploy record' apres le deploiement)")
+        previous = {"files": {}}
+    delta = diff(previous, current)
+    uploads = sorted(delta["changed"] + delta["added"] + delta["volatile"])
+    if args.list:
+        args.list.write_text("".join(rel + "\n" for rel in uploads), encoding="utf-8")
+    if args.json:
+        print(json.dumps({k: v for k, v in delta.items() if k != "unchanged"}, indent=2))
+        return 0
+
+    files = current["files"]
+    upload = sum(files[rel]["size"] for rel in uploads)
+    print(f"\n[DEPLOY] {len(files)} fichier(s) hashe(s) en {ms:.0f} ms, compare(s) a {args.manifest.name}"
+          + (f" ({previous['recorded']})" if previous.get("recorded") else ""))
+    print("=" * 70)
+    for key, label in (("added", "+"), ("changed", "~"), ("removed", "-"), ("volatile", "=")):
+        rels = delta[key]
+        if not rels:
+            continue
+        print(f"{key} : {len(rels)}")
+        for rel in rels[:args.show]:
+            detail = f"  ({', '.join(files[rel]['volatile'])})" if key == "volatile" else ""
+            print(f"   {label} {rel}{detail}")
+        if len(rels) > args.show:
+            print(f"     ... +{len(rels) - args.show}")
+    print("-" * 70)
+    if previous.get("firebase.json") and previous["firebase.json"] != current.get("firebase.json"):
+        print("[INFO] firebase.json modifie (headers / redirects redeployes)")
+    if delta["volatile"]:
+        print(f"[WARN] {len(delta['volatile'])} fichier(s) modifie(s) uniquement par des dates : "
+              "churn a eliminer dans les fixers")
+    print(f"[OK] {len(uploads)} fichier(s) a envoyer ({upload / 1024:.0f} KB"
+          + (f", dont {len(delta['volatile'])} de churn" if delta["volatile"] else "")
+          + f"), {len(delta['unchanged'])} inchange(s), {len(delta['removed'])} supprime(s)")
+    if args.list:
+        print(f"[OK] Liste -> {args.list}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
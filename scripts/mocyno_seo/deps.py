@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+REVERSE DEPENDENCIES
+Persistent index of who references what: every page, stylesheet and
+sitemap entry is recorded against the files it points at (pages,
+images, CSS, JS) and the firebase.json redirects its URLs go through.
+
+A tool that changed, renamed or deleted some files asks for the
+affected set and re-checks only those pages instead of the whole site:
+
+    python scripts/deps_index.py affected public/fr/a-propos.html
+
+References are extracted once per source file (reparsed only when its
+content hash changes) and resolved through the hosting simulator, so a
+firebase.json edit or a rename only re-resolves, never reparses.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import CACHE_DIR, FIREBASE_JSON_PATH, PUBLIC_DIR
+from .hosting import HostingSimulator, load_hosting
+from .hreflang import page_key, url_key
+from .loader import read_text
+from .pagemodel import parse_page, site_path
+from .site import is_site_page, iter_site_files
+
+DEFAULT_DB = CACHE_DIR / "deps.sqlite"
+SCHEMA_VERSION = 1
+
+MISSING_PREFIX = "missing:"
+REDIRECT_PREFIX = "redirect:"
+
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)|@import\s+(['"])([^'"]+)\3""")
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (
+    rel_path TEXT PRIMARY KEY,
+    kind     TEXT NOT NULL,
+    hash     TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    source TEXT NOT NULL REFERENCES sources(rel_path) ON DELETE CASCADE,
+    kind   TEXT NOT NULL,
+    url    TEXT NOT NULL,
+    path   TEXT NOT NULL,
+    line   INTEGER
+);
+CREATE TABLE IF NOT EXISTS deps (
+    source TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    url    TEXT NOT NULL,
+    line   INTEGER,
+    target TEXT NOT NULL
+);
+-- redirect edges the last re-resolution dropped (rule removed or no longer reached)
+CREATE TABLE IF NOT EXISTS dropped_redirects (
+    source TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    url    TEXT NOT NULL,
+    line   INTEGER,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_refs_source ON refs(source);
+CREATE INDEX IF NOT EXISTS idx_deps_target ON deps(target);
+CREATE INDEX IF NOT EXISTS idx_deps_source ON deps(source);
+"""
+
+
+def source_kind(rel: str) -> Optional[str]:
+    """Files whose references are indexed."""
+    if is_site_page(rel):
+        return "page"
+    if rel.endswith(".css"):
+        return "css"
+    if rel.endswith(".xml") and "sitemap" in rel.rsplit("/", 1)[-1]:
+        return "sitemap"
+    return None
+
+
+def extract_refs(kind: str, rel: str, text: str) -> List[Tuple[str, str, str, int]]:
+    """(kind, url, site path, line) for every same-site reference in a source file."""
+    out: List[Tuple[str, str, str, int]] = []
+
+    def add(ref_kind: str, url: Optional[str], line: int) -> None:
+        path = site_path(url, rel) if url else None
+        if path:
+            out.append((ref_kind, url, path, line))
+
+    if kind == "page":
+        model = parse_page(text)
+        for ref in model.references:
+            add(ref.kind, ref.url, ref.line)
+        if model.canonical:
+            add("canonical", model.canonical, 0)
+        for _, href in model.hreflangs:
+            add("hreflang", href, 0)
+    elif kind == "css":
+        for m in _CSS_URL_RE.finditer(text):
+            url = m.group(2) or m.group(4)
+            if url and not url.startswith(("data:", "#")):
+                add("import" if m.group(4) else "asset", url, text.count("\n", 0, m.start()) + 1)
+    elif kind == "sitemap":
+        try:
+            root = ET.fromstring(text.encode("utf-8"))
+        except ET.ParseError:
+            return out
+        for loc in root.iter(_SITEMAP_NS + "loc"):
+            if loc.text:
+                add("sitemap", loc.text.strip(), 0)
+    return out
+
+
+def public_rel(name: str) -> str:
+    """Accept public/x, ./public/x or x for a file under public/."""
+    name = name.replace("\\", "/")
+    while name.startswith("./"):
+        name = name[2:]
+    return name[len("public/"):] if name.startswith("public/") else name
+
+
+def missing_key(path: str) -> str:
+    return MISSING_PREFIX + (url_key(path) or path)
+
+
+class DependencyIndex:
+    """SQLite-backed reverse-dependency index of public/."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB, public_dir: Path = PUBLIC_DIR,
+                 firebase_json: Path = FIREBASE_JSON_PATH):
+        self.public_dir = Path(public_dir)
+        self.firebase_json = Path(firebase_json)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "DependencyIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    # --- update ------------------------------------------------------------
+
+    def update(self) -> Dict[str, int]:
+        """
+        Reparse changed sources, then re-resolve if anything the resolution
+        depends on (sources, file set, firebase.json) changed.
+        """
+        files = list(iter_site_files(self.public_dir))
+        known = {r["rel_path"]: (r["size"], r["mtime_ns"], r["hash"])
+                 for r in self.conn.execute("SELECT rel_path, size, mtime_ns, hash FROM sources")}
+        counts = {"sources": 0, "parsed": 0, "removed": 0, "resolved": 0}
+        seen = set()
+        with self.conn:
+            for rel in files:
+                kind = source_kind(rel)
+                if kind is None:
+                    continue
+                seen.add(rel)
+                counts["sources"] += 1
+                path = self.public_dir / rel
+                st = path.stat()
+                prev = known.get(rel)
+                if prev and prev[:2] == (st.st_size, st.st_mtime_ns):
+                    continue
+                raw = path.read_bytes()
+                digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+                if prev and prev[2] == digest:
+                    self.conn.execute("UPDATE sources SET size = ?, mtime_ns = ? WHERE rel_path = ?",
+                                      (st.st_size, st.st_mtime_ns, rel))
+                    continue
+                self.conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                                  (rel, kind, digest, st.st_size, st.st_mtime_ns))
+                self.conn.execute("DELETE FROM refs WHERE source = ?", (rel,))
+                self.conn.executemany(
+                    "INSERT INTO refs (source, kind, url, path, line) VALUES (?, ?, ?, ?, ?)",
+                    [(rel,) + ref for ref in extract_refs(kind, rel, read_text(path))])
+                counts["parsed"] += 1
+            for rel in set(known) - seen:
+                self.conn.execute("DELETE FROM sources WHERE rel_path = ?", (rel,))
+                counts["removed"] += 1
+
+            hosting = load_hosting(self.firebase_json) if self.firebase_json.exists() else {}
+            fingerprint = hashlib.sha1(json.dumps([files, hosting], sort_keys=True)
+                                       .encode("utf-8")).hexdigest()
+            if counts["parsed"] or counts["removed"] or self._meta("resolution") != fingerprint:
+                counts["resolved"] = self._resolve(HostingSimulator(files, hosting))
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('resolution', ?)", (fingerprint,))
+        return counts
+
+    def _resolve(self, sim: HostingSimulator) -> int:
+        """Rebuild deps: each reference's final file and the redirects on the way."""
+        cache: Dict[str, List[str]] = {}
+        rows = []
+        for ref in self.conn.execute("SELECT source, kind, url, path, line FROM refs"):
+            targets = cache.get(ref["path"])
+            if targets is None:
+                hops = sim.follow(ref["path"])
+                targets = [REDIRECT_PREFIX + h.rule["source"] for h in hops
+                           if h.rule is not None and h.is_redirect and "source" in h.rule]
+                final = hops[-1]
+                if final.status == 404 or final.is_redirect:
+                    targets.append(missing_key(ref["path"]))
+                elif final.file:
+                    targets.append(final.file)
+                cache[ref["path"]] = targets
+            rows.extend((ref["source"], ref["kind"], ref["url"], ref["line"], t) for t in targets)
+        # A removed redirect leaves no node once deps is rebuilt: keep its old edges for affected()
+        kept = {row[4] for row in rows if row[4].startswith(REDIRECT_PREFIX)}
+        dropped = [tuple(r) for r in self.conn.execute(
+            "SELECT source, kind, url, line, target FROM deps WHERE target LIKE ?", (REDIRECT_PREFIX + "%",))
+            if r["target"] not in kept]
+        self.conn.execute("DELETE FROM dropped_redirects")
+        self.conn.executemany("INSERT INTO dropped_redirects (source, kind, url, line, target) "
+                              "VALUES (?, ?, ?, ?, ?)", dropped)
+        self.conn.execute("DELETE FROM deps")
+        self.conn.executemany("INSERT INTO deps (source, kind, url, line, target) VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # --- queries -----------------------------------------------------------
+
+    @staticmethod
+    def target_keys(name: str) -> Set[str]:
+        """
+        deps.target values meaning "name": the file itself and, for a file
+        that no longer exists (deleted, renamed), the missing-path keys
+        its old URLs now resolve to.
+        """
+        if name.startswith((REDIRECT_PREFIX, MISSING_PREFIX)):
+            return {name}
+        rel = name.lstrip("/")
+        keys = {rel, missing_key("/" + rel)}
+        if rel.endswith(".html"):
+            keys.add(MISSING_PREFIX + page_key(rel))
+        return keys
+
+    def referrers(self, name: str) -> List[sqlite3.Row]:
+        keys = sorted(self.target_keys(name))
+        marks = ",".join("?" * len(keys))
+        return self.conn.execute(
+            f"SELECT DISTINCT source, kind, url, line, target FROM deps WHERE target IN ({marks}) "
+            "ORDER BY source, line", keys).fetchall()
+
+    def dependencies(self, source: str) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT kind, url, line, target FROM deps WHERE source = ? ORDER BY line, kind",
+            (source,)).fetchall()
+
+    def missing(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT source, kind, url, line FROM deps WHERE target LIKE ? ORDER BY source, line",
+            (MISSING_PREFIX + "%",)).fetchall()
+
+    def redirect_targets(self) -> List[str]:
+        """Redirect nodes of the current resolution and those the last re-resolution dropped."""
+        return [r[0] for r in self.conn.execute(
+            "SELECT target FROM deps WHERE target LIKE ? UNION SELECT target FROM dropped_redirects",
+            (REDIRECT_PREFIX + "%",))]
+
+    def dropped_referrers(self, name: str) -> List[sqlite3.Row]:
+        """Referrers a removed redirect had before the last re-resolution."""
+        return self.conn.execute(
+            "SELECT DISTINCT source, kind, url, line, target FROM dropped_redirects WHERE target = ? "
+            "ORDER BY source, line", (name,)).fetchall()
+
+    def affected(self, names: Iterable[str]) -> Dict[str, List]:
+        """
+        Minimal re-check set for a change to names (files relative to
+        public/, "firebase.json", or "redirect:<source>").
+
+        Stylesheets are followed transitively: an image used by a CSS
+        file affects every page that loads that CSS. A firebase.json
+        change covers the redirects removed by the last re-resolution
+        too, so pages linking to a deleted rule's source are re-checked.
+        """
+        kinds = {r["rel_path"]: r["kind"] for r in self.conn.execute("SELECT rel_path, kind FROM sources")}
+        queue = deque()
+        for name in names:
+            name = public_rel(name)
+            if Path(name).name == "firebase.json":
+                queue.extend(self.redirect_targets())
+            else:
+                queue.append(name)
+
+        pages: Set[str] = set()
+        entries: Set[Tuple[str, str]] = set()
+        seen: Set[str] = set()
+        while queue:
+            name = queue.popleft()
+            if name in seen:
+                continue
+            seen.add(name)
+            if kinds.get(name) == "page":
+                pages.add(name)
+            rows = self.referrers(name)
+            if name.startswith(REDIRECT_PREFIX):
+                rows += self.dropped_referrers(name)
+            for row in rows:
+                kind = kinds.get(row["source"])
+                if kind == "page":
+                    pages.add(row["source"])
+                elif kind == "sitemap":
+                    entries.add((row["source"], row["url"]))
+                elif kind == "css":
+                    queue.append(row["source"])
+        return {"pages": sorted(pages),
+                "sitemap_entries": [{"sitemap": s, "loc": u} for s, u in sorted(entries)]}
+
+
+def _print_rows(rows: List[sqlite3.Row]) -> None:
+    if not rows:
+        print("   [OK] Aucun resultat")
+        return
+    for row in rows:
+        print("   • " + "  ".join(f"{k}={row[k]}" for k in row.keys() if row[k] not in (None, 0)))
+    print(f"\n   {len(rows)} ligne(s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reverse-dependency index of public/.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="index database path")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("update", help="reparse changed sources and re-resolve")
+    a = sub.add_parser("affected", help="pages and sitemap entries to re-check after a change")
+    a.add_argument("names", nargs="+", help="changed files, firebase.json or redirect:<source>")
+    a.add_argument("--json", action="store_true", help="print the result as JSON")
+    r = sub.add_parser("refs", help="direct references to a file")
+    r.add_argument("name")
+    d = sub.add_parser("deps", help="what a page, stylesheet or sitemap references")
+    d.add_argument("source")
+    sub.add_parser("missing", help="references that resolve to nothing")
+    args = parser.parse_args(argv)
+
+    with DependencyIndex(args.db, args.src, args.firebase) as index:
+        counts = index.update()
+        if args.command == "update":
+            print(f"[OK] {counts['sources']} sources : {counts['parsed']} reparsed, "
+                  f"{counts['removed']} removed, {counts['resolved']} edges resolved")
+        elif args.command == "affected":
+            result = index.affected(args.names)
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                print(f"\n[AFFECTED] {len(result['pages'])} page(s), "
+                      f"{len(result['sitemap_entries'])} entree(s) de sitemap")
+                for page in result["pages"]:
+                    print(f"   • {page}")
+                for entry in result["sitemap_entries"]:
+                    print(f"   • {entry['sitemap']} : {entry['loc']}")
+        elif args.command == "refs":
+            _print_rows(index.referrers(public_rel(args.name)))
+        elif args.command == "deps":
+            _print_rows(index.dependencies(public_rel(args.source)))
+        elif args.command == "missing":
+            _print_rows(index.missing())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
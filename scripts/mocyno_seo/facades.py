@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+FACADES - deferred third-party widgets
+Replaces each page's inline widget loader with a small placeholder and
+loads the widget from one shared, cacheable script (/scripts/facades.js)
+when its trigger fires:
+
+  gtm    Google Tag Manager     after window load (+100 ms), so after the
+                                deferred consent gate
+  tawk   tawk.to chat           first interaction, or 3 s idle
+  maps   embedded Google Maps   click on the placeholder (keeps the size)
+
+WIDGETS is the configuration: a marker the loader must contain, what to
+extract from it (container id, embed URL), the trigger, and the words
+that mean a block does more than load the widget (a consent default, a
+gtag() call), which is then left alone.
+
+    python scripts/mocyno-seo.py fix facades                  # what the stage would replace, bytes saved
+    python scripts/mocyno-seo.py fix facades --write-loader   # regenerate public/scripts/facades.js
+    python scripts/build_site.py --rules facades              # apply it into dist/
+
+The `facades` build rule (rules.py) calls rewrite(); public/ is never
+touched.
+"""
+
+import argparse
+import html
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import PUBLIC_DIR
+from .loader import read_text, write_if_changed
+from .site import is_site_page, iter_site_files
+
+LOADER_PATH = "/scripts/facades.js"
+LOADER_TAG = f'<script defer src="{LOADER_PATH}"></script>'
+# Inline blocks longer than this hold more than a loader
+MAX_LOADER_CHARS = 1200
+
+# Inline classic scripts only: src, module and JSON-LD blocks never match
+_SCRIPT_BLOCK = re.compile(r"<script(?:\s+type=[\"']text/javascript[\"'])?\s*>(?P<body>(?:(?!</script>).)*)</script>",
+                           re.DOTALL | re.IGNORECASE)
+_IFRAME = re.compile(r"<iframe\b(?P<attrs>[^>]*)>\s*</iframe>", re.IGNORECASE)
+_ATTR = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_HTML_LANG_EN = re.compile(r"<html[^>]*\blang=[\"']?en", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'data-facade="([\w-]+)" data-src="([^"]*)"')
+
+
+class Widget:
+    """One third-party widget the facade stage knows how to defer."""
+
+    def __init__(self, name: str, marker: str, src: str, trigger: str, delay: int = 0,
+                 unless: Sequence[str] = (), crossorigin: Optional[str] = None,
+                 template: Optional[str] = None, frame: bool = False,
+                 label: Optional[Dict[str, str]] = None):
+        self.name = name
+        # Substring every loader of this widget contains (also the build prefilter literal)
+        self.marker = marker
+        # Regex whose match, or {id} template filled from group "id", is the URL to load
+        self.src = re.compile(src)
+        self.template = template
+        self.trigger = trigger
+        self.delay = delay
+        self.unless = tuple(unless)
+        self.crossorigin = crossorigin
+        self.frame = frame
+        self.label = label or {}
+
+    def source(self, code: str) -> Optional[str]:
+        m = self.src.search(code)
+        if not m:
+            return None
+        return self.template.format(**m.groupdict()) if self.template else m.group(0)
+
+    def js_config(self) -> Dict:
+        conf = {"trigger": self.trigger, "delay": self.delay}
+        if self.crossorigin:
+            conf["crossorigin"] = self.crossorigin
+        if self.frame:
+            conf["frame"] = True
+        return conf
+
+
+WIDGETS: Sequence[Widget] = (
+    Widget("gtm", "googletagmanager.com/gtm.js", r"(?P<id>GTM-[A-Z0-9]+)", "load", delay=100,
+           template="https://www.googletagmanager.com/gtm.js?id={id}", unless=("consent", "gtag(")),
+    Widget("tawk", "embed.tawk.to", r"https://embed\.tawk\.to/[\w/]+", "interaction", delay=3000,
+           crossorigin="*", unless=("consent",)),
+    Widget("maps", "google.com/maps/embed", r"https://www\.google\.com/maps/embed[^\"'\s]*", "click",
+           frame=True, label={"fr": "Afficher la carte", "en": "Show map"}),
+)
+BY_NAME: Dict[str, Widget] = {w.name: w for w in WIDGETS}
+LITERALS = tuple(w.marker for w in WIDGETS)
+
+# Run before the widget script is added (what each inline loader did first)
+_HOOKS = {
+    "gtm": "window.dataLayer = window.dataLayer || [];\n"
+           "      window.dataLayer.push({ 'gtm.start': new Date().getTime(), event: 'gtm.js' });",
+    "tawk": "window.Tawk_API = window.Tawk_API || {};\n"
+            "      window.Tawk_LoadStart = new Date();",
+}
+
+LOADER_JS = """/* facades.js - MO'CYNO - chargement differe des widgets tiers
+ * Genere par scripts/mocyno_seo/facades.py (mocyno-seo fix facades --write-loader) :
+ * modifier WIDGETS dans facades.py puis regenerer, ne pas editer a la main.
+ */
+(function () {
+  'use strict';
+  var WIDGETS = %(widgets)s;
+  var HOOKS = {
+%(hooks)s
+  };
+
+  function load(el, name, conf) {
+    if (el.getAttribute('data-facade-loaded')) return;
+    el.setAttribute('data-facade-loaded', '1');
+    var src = el.getAttribute('data-src');
+    if (HOOKS[name]) HOOKS[name]();
+    if (conf.frame) {
+      var f = document.createElement('iframe');
+      f.src = src;
+      f.title = el.getAttribute('data-title') || '';
+      f.width = el.getAttribute('data-width') || '100%%';
+      f.height = el.getAttribute('data-height') || '450';
+      f.loading = 'lazy';
+      f.style.border = '0';
+      f.setAttribute('allowfullscreen', '');
+      f.setAttribute('referrerpolicy', 'no-referrer-when-downgrade');
+      el.parentNode.replaceChild(f, el);
+      return;
+    }
+    var s = document.createElement('script');
+    s.async = true;
+    s.src = src;
+    s.charset = 'UTF-8';
+    if (conf.crossorigin) s.setAttribute('crossorigin', conf.crossorigin);
+    document.head.appendChild(s);
+  }
+
+  function arm(el) {
+    var name = el.getAttribute('data-facade'), conf = WIDGETS[name];
+    if (!conf) return;
+    var run = function () { load(el, name, conf); };
+    if (conf.trigger === 'click') {
+      el.addEventListener('click', run);
+      el.addEventListener('keydown', function (e) { if (e.key === 'Enter' || e.key === ' ') run(); });
+      return;
+    }
+    if (conf.trigger === 'load') {
+      var later = function () { setTimeout(run, conf.delay); };
+      if (document.readyState === 'complete') later(); else window.addEventListener('load', later);
+      return;
+    }
+    var events = ['scroll', 'mousemove', 'touchstart', 'click', 'keydown'];
+    var once = function () {
+      events.forEach(function (e) { window.removeEventListener(e, once); });
+      run();
+    };
+    events.forEach(function (e) { window.addEventListener(e, once, { passive: true, once: true }); });
+    if (conf.delay) setTimeout(once, conf.delay);
+  }
+
+  var nodes = document.querySelectorAll('[data-facade]');
+  for (var i = 0; i < nodes.length; i++) arm(nodes[i]);
+})();
+"""
+
+
+def render_loader() -> str:
+    widgets = json.dumps({w.name: w.js_config() for w in WIDGETS}, indent=2).replace("\n", "\n  ")
+    hooks = ",\n".join(f"    {name}: function () {{\n      {body}\n    }}" for name, body in _HOOKS.items())
+    return LOADER_JS % {"widgets": widgets, "hooks": hooks}
+
+
+def _placeholder(widget: Widget, src: str) -> str:
+    return f'<template data-facade="{widget.name}" data-src="{html.escape(src)}"></template>'
+
+
+def _frame_placeholder(widget: Widget, attrs: Dict[str, str], src: str, lang: str) -> str:
+    width, height = attrs.get("width", "100%"), attrs.get("height", "450")
+    size = "".join(f"{k}:{v if not v.isdigit() else v + 'px'};" for k, v in (("width", width), ("height", height)))
+    title = attrs.get("title", "")
+    return (f'<div class="facade facade-{widget.name}" data-facade="{widget.name}" data-src="{html.escape(src)}" '
+            f'data-title="{html.escape(title)}" data-width="{width}" data-height="{height}" role="button" '
+            f'tabindex="0" style="{size}display:flex;align-items:center;justify-content:center;'
+            f'background:#e9eef2;cursor:pointer">{widget.label.get(lang, "")}</div>')
+
+
+def placeholders(text: str) -> List[Tuple[Widget, str]]:
+    """(widget, URL it will load) for each placeholder rewrite() left in a page."""
+    return [(BY_NAME[name], html.unescape(src)) for name, src in _PLACEHOLDER.findall(text) if name in BY_NAME]
+
+
+def rewrite(text: str) -> Tuple[str, Counter]:
+    """Replace every widget loader of a page; (new text, Counter of widget -> replacements)."""
+    hits: Counter = Counter()
+    script_widgets = [w for w in WIDGETS if not w.frame and w.marker in text]
+    frame_widgets = [w for w in WIDGETS if w.frame and w.marker in text]
+    if not script_widgets and not frame_widgets:
+        return text, hits
+
+    def script_repl(m: "re.Match") -> str:
+        body = m.group("body")
+        if len(body) > MAX_LOADER_CHARS:
+            return m.group(0)
+        for widget in script_widgets:
+            if widget.marker in body and not any(word in body for word in widget.unless):
+                src = widget.source(body)
+                if src:
+                    hits[widget.name] += 1
+                    return _placeholder(widget, src)
+        return m.group(0)
+
+    lang = "en" if _HTML_LANG_EN.search(text) else "fr"
+
+    def frame_repl(m: "re.Match") -> str:
+        attrs = {k.lower(): a if a is not None else b for k, a, b in _ATTR.findall(m.group("attrs"))}
+        for widget in frame_widgets:
+            src = attrs.get("src", "")
+            if widget.marker in src:
+                hits[widget.name] += 1
+                return _frame_placeholder(widget, attrs, html.unescape(src), lang)
+        return m.group(0)
+
+    if script_widgets:
+        text = _SCRIPT_BLOCK.sub(script_repl, text)
+    if frame_widgets:
+        text = _IFRAME.sub(frame_repl, text)
+    if hits and LOADER_PATH not in text:
+        head_end = text.lower().find("</head>")
+        if head_end != -1:
+            text = text[:head_end] + LOADER_TAG + "\n" + text[head_end:]
+    return text, hits
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Defer third-party widgets behind one shared loader.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--write-loader", action="store_true",
+                        help=f"regenerate {LOADER_PATH} under --src from WIDGETS")
+    parser.add_argument("--show", type=int, default=10, help="pages listed")
+    args = parser.parse_args(argv)
+
+    loader = args.src / LOADER_PATH.lstrip("/")
+    if args.write_loader:
+        loader.parent.mkdir(parents=True, exist_ok=True)
+        if write_if_changed(loader, render_loader()):
+            print(f"[OK] {loader} regenere ({len(render_loader())} octets)")
+        else:
+            print(f"[OK] {loader} deja a jour")
+    elif not loader.is_file() or read_text(loader) != render_loader():
+        print(f"[WARN] {LOADER_PATH} absent ou perime : --write-loader pour le regenerer")
+
+    totals: Counter = Counter()
+    saved, pages = 0, []
+    for rel in iter_site_files(args.src):
+        if not is_site_page(rel):
+            continue
+        text = read_text(args.src / rel)
+        new_text, hits = rewrite(text)
+        if hits:
+            totals.update(hits)
+            delta = len(text.encode("utf-8")) - len(new_text.encode("utf-8"))
+            saved += delta
+            pages.append((rel, hits, delta))
+
+    print(f"\n[FACADES] {len(pages)} page(s), " + ", ".join(f"{w} x{n}" for w, n in sorted(totals.items())))
+    print("=" * 70)
+    for rel, hits, delta in sorted(pages, key=lambda p: -p[2])[:args.show]:
+        print(f"   {delta:>6} o  {rel}  ({', '.join(sorted(hits))})")
+    if len(pages) > args.show:
+        print(f"         ... +{len(pages) - args.show} page(s)")
+    print(f"[OK] {saved} octets de HTML en moins au total, {LOADER_PATH} mis en cache une fois")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+FINDINGS - machine-readable audit output
+Every audit can emit its results as a JSON-lines stream, one finding per
+line, in a fixed key order and sorted, so two runs on the same tree are
+byte-identical:
+
+    {"fingerprint": "3f0c...", "rule": "links/broken", "severity": "error",
+     "page": "fr/index.html", "location": "line 212", "message": "href /zones -> 404"}
+
+The fingerprint hashes rule, page and a stable key (the message unless the
+audit supplies a better one), never the location: a finding that moves a
+few lines keeps its fingerprint. Repeats within a run get #2, #3...
+
+    python scripts/mocyno-seo.py findings collect -o run.jsonl
+    python scripts/mocyno-seo.py findings diff before.jsonl run.jsonl --fail-on-new error
+
+diff loads each run into a dict keyed by fingerprint, so comparing two
+runs is O(n) whatever their size.
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ERROR, WARN, INFO = "error", "warn", "info"
+SEVERITY_RANK = {INFO: 0, WARN: 1, ERROR: 2}
+SEVERITY_MARKERS = {ERROR: "[ERREUR]", WARN: "[WARN]", INFO: "[INFO]"}
+FIELDS = ("fingerprint", "rule", "severity", "page", "location", "message")
+
+# name -> module exposing findings(public_dir, firebase_json); imported on demand
+COLLECTORS: Dict[str, str] = {
+    "site": "mocyno_seo.watch",
+    "pages": "mocyno_seo.classify",
+    "scripts": "mocyno_seo.thirdparty",
+    "redirects": "mocyno_seo.redirects",
+    "sitemap": "mocyno_seo.sitemap",
+    "robots": "mocyno_seo.robots",
+    "images": "mocyno_seo.images",
+    "parity": "mocyno_seo.parity",
+    "duplicates": "mocyno_seo.neardup",
+    "css": "mocyno_seo.css",
+    "cache": "mocyno_seo.caching",
+    "assets": "mocyno_seo.assets",
+}
+
+
+class Finding:
+    __slots__ = ("rule", "severity", "page", "location", "message", "key", "fingerprint")
+
+    def __init__(self, rule: str, severity: str, page: str, message: str,
+                 location: str = "", key: Optional[str] = None, fingerprint: str = ""):
+        self.rule = rule
+        self.severity = severity
+        self.page = page
+        self.location = location
+        self.message = message
+        self.key = message if key is None else key
+        self.fingerprint = fingerprint or self.base_fingerprint()
+
+    def base_fingerprint(self) -> str:
+        raw = "\0".join((self.rule, self.page, self.key))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def to_dict(self) -> Dict[str, str]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Finding":
+        return cls(data["rule"], data["severity"], data["page"], data.get("message", ""),
+                   data.get("location", ""), fingerprint=data["fingerprint"])
+
+    def __str__(self) -> str:
+        where = f"{self.page}:{self.location}" if self.location else self.page
+        return f"{SEVERITY_MARKERS.get(self.severity, '[?]')} {where} {self.rule} {self.message}"
+
+
+def finalize(findings: Iterable[Finding]) -> List[Finding]:
+    """Sort into the stream order and number repeated fingerprints."""
+    ordered = sorted(findings, key=lambda f: (f.page, f.rule, f.location, f.message))
+    seen: Counter = Counter()
+    for finding in ordered:
+        base = finding.base_fingerprint()
+        seen[base] += 1
+        finding.fingerprint = base if seen[base] == 1 else f"{base}#{seen[base]}"
+    return ordered
+
+
+def write_jsonl(findings: Iterable[Finding], path: Path) -> int:
+    """Write the stream to path ('-' for stdout); returns the number of findings."""
+    ordered = finalize(findings)
+    lines = "".join(json.dumps(f.to_dict(), ensure_ascii=False) + "\n" for f in ordered)
+    if str(path) == "-":
+        sys.stdout.write(lines)
+    else:
+        Path(path).write_text(lines, encoding="utf-8")
+    return len(ordered)
+
+
+def read_jsonl(path: Path) -> Dict[str, Finding]:
+    handle = sys.stdin if str(path) == "-" else open(path, encoding="utf-8")
+    try:
+        return {f.fingerprint: f for f in
+                (Finding.from_dict(json.loads(line)) for line in handle if line.strip())}
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def diff(old: Dict[str, Finding], new: Dict[str, Finding]) -> Tuple[List[Finding], List[Finding], int]:
+    """(introduced, fixed, unchanged count) between two runs, by fingerprint."""
+    introduced = [f for fp, f in new.items() if fp not in old]
+    fixed = [f for fp, f in old.items() if fp not in new]
+    return introduced, fixed, len(new) - len(introduced)
+
+
+def collect(names: Iterable[str], public_dir: Path, firebase_json: Path) -> List[Finding]:
+    out: List[Finding] = []
+    for name in names:
+        module = importlib.import_module(COLLECTORS[name])
+        out.extend(module.findings(public_dir, firebase_json))
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .config import FIREBASE_JSON_PATH, PUBLIC_DIR
+
+    parser = argparse.ArgumentParser(description="JSON-lines audit findings: collect and diff runs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("collect", help="run audits and write one findings stream")
+    c.add_argument("-o", "--output", type=Path, default=Path("-"), help="output file (default: stdout)")
+    c.add_argument("--only", action="append", choices=sorted(COLLECTORS), metavar="AUDIT",
+                   help=f"audit to run, repeatable (default: all of {', '.join(COLLECTORS)})")
+    c.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    c.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    d = sub.add_parser("diff", help="compare two runs by fingerprint")
+    d.add_argument("old", type=Path)
+    d.add_argument("new", type=Path)
+    d.add_argument("--fail-on-new", choices=sorted(SEVERITY_RANK, key=SEVERITY_RANK.get), metavar="SEVERITY",
+                   help="exit 1 if a finding at or above this severity was introduced")
+    d.add_argument("--json", action="store_true", help="print {introduced, fixed} as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        names = args.only or list(COLLECTORS)
+        count = write_jsonl(collect(names, args.src, args.firebase), args.output)
+        if str(args.output) != "-":
+            print(f"[OK] {count} finding(s) ({', '.join(names)}) -> {args.output}")
+        return 0
+
+    introduced, fixed, unchanged = diff(read_jsonl(args.old), read_jsonl(args.new))
+    if args.json:
+        print(json.dumps({"introduced": [f.to_dict() for f in introduced],
+                          "fixed": [f.to_dict() for f in fixed], "unchanged": unchanged}, indent=2))
+    else:
+        print(f"\n[DIFF] {len(introduced)} nouveau(x), {len(fixed)} corrige(s), {unchanged} inchange(s)")
+        print("=" * 70)
+        for f in introduced:
+            print(f"   + {f}")
+        for f in fixed:
+            print(f"   - [CORRIGE] {f.page} {f.rule} {f.message}")
+    if args.fail_on_new:
+        floor = SEVERITY_RANK[args.fail_on_new]
+        return 1 if any(SEVERITY_RANK.get(f.severity, 0) >= floor for f in introduced) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
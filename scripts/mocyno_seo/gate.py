@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+GATE - pre-deploy validation
+Parses the site once (page models, hosting simulator, hreflang clusters:
+the watch-mode SiteState), then runs every check concurrently over that
+shared parse:
+
+  tags       one <title> / meta description / og:description in <head>,
+             canonical present and resolving (validate_seo_tags.py)
+  jsonld     every application/ld+json block parses (validate_jsonld.py)
+  links      internal links and assets resolve, without redirects
+  anchors    "#fragment" links land on an id of the target page
+  hreflang   hreflang targets resolve and point back
+  pages      noindex and <html lang> agree with the page class (classify.py)
+  sitemap    sitemap entries answer 200, canonical, indexable
+  redirects  firebase.json redirects end on a page in one hop
+  robots     robots.txt / llms.txt entries served directly and canonical
+  scripts    no parser-blocking third party, consent gate on every page,
+             trackers wait for it (thirdparty.py)
+  nav        header navigation identical to fr/index.html or en/index.html
+             (audit_navigation_consistency.py)
+  css        stylesheets parse; duplicate selectors, overridden
+             declarations (css.py, replaces validate_css.py)
+  cache      every URL gets its class's Cache-Control, nothing reused
+             is immutable (caching.py)
+
+Where fork() exists the checks run in worker processes that inherit the
+parse; elsewhere in threads. The gate therefore takes the parse plus the
+slowest check, not the sum. A blocker is an error-severity finding; with
+--baseline, only errors not already in that findings stream block.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import ERROR, SEVERITY_MARKERS, WARN, Finding, finalize, read_jsonl, write_jsonl
+from .watch import SiteState
+
+NAV_BASELINES = {"fr": "fr/index.html", "en": "en/index.html"}
+
+
+def check_tags(state: SiteState) -> List[Finding]:
+    return [d.to_finding() for rel in sorted(state.pages) for d in state.check_head(rel)]
+
+
+def check_links(state: SiteState) -> List[Finding]:
+    return [d.to_finding() for rel in sorted(state.pages) for d in state.check_links(rel)]
+
+
+def check_anchors(state: SiteState) -> List[Finding]:
+    return [d.to_finding() for rel in sorted(state.pages) for d in state.check_anchors(rel)]
+
+
+def check_hreflang(state: SiteState) -> List[Finding]:
+    return [d.to_finding() for rel in sorted(state.pages) for d in state.check_hreflang(rel)]
+
+
+def check_jsonld(state: SiteState) -> List[Finding]:
+    out = []
+    for rel in sorted(state.pages):
+        for number, (line, text) in enumerate(state.pages[rel].jsonld, 1):
+            try:
+                json.loads(text)
+            except json.JSONDecodeError as exc:
+                out.append(Finding("jsonld/invalid", ERROR, rel, f"block {number}: {exc.msg}",
+                                   f"line {line + exc.lineno - 1}"))
+    return out
+
+
+def check_pages(state: SiteState) -> List[Finding]:
+    from . import classify
+
+    return classify.check(state.classes, state.pages)
+
+
+def check_sitemap(state: SiteState) -> List[Finding]:
+    from . import sitemap
+
+    return sitemap.to_findings(sitemap.check(state.public_dir, state.firebase_json,
+                                             sim=state.sim, pages=state.pages, classes=state.classes))
+
+
+def check_redirects(state: SiteState) -> List[Finding]:
+    from . import redirects
+
+    return redirects.to_findings(redirects.check(state.public_dir, state.firebase_json, sim=state.sim))
+
+
+def check_robots(state: SiteState) -> List[Finding]:
+    from . import robots
+
+    def meta(rel):
+        model = state.pages.get(rel)
+        return (model.canonical, model.robots) if model else None
+
+    return robots.check(state.public_dir, state.firebase_json, sim=state.sim, page_meta=meta)
+
+
+def check_scripts(state: SiteState) -> List[Finding]:
+    from .thirdparty import Inventory
+
+    return Inventory(state.public_dir, state.pages, state.classes).check()
+
+
+def check_nav(state: SiteState) -> List[Finding]:
+    out = []
+    baselines = {lang: state.pages[rel].header_links
+                 for lang, rel in NAV_BASELINES.items() if rel in state.pages}
+    for rel in sorted(state.pages):
+        model = state.pages[rel]
+        lang = (model.lang or "").split("-")[0].lower()
+        if lang not in baselines or rel == NAV_BASELINES[lang]:
+            continue
+        if not model.header_links:
+            out.append(Finding("nav/missing", WARN, rel, "no <header> navigation"))
+            continue
+        expected = baselines[lang]
+        if model.header_links == expected:
+            continue
+        missing = [h for h in expected if h not in model.header_links]
+        extra = [h for h in model.header_links if h not in expected]
+        detail = (f"missing {', '.join(missing[:3])}" if missing else "") + \
+                 ("; " if missing and extra else "") + \
+                 (f"extra {', '.join(extra[:3])}" if extra else "")
+        out.append(Finding("nav/divergent", WARN, rel,
+                           f"differs from {NAV_BASELINES[lang]}: {detail or 'order'}",
+                           key=f"{NAV_BASELINES[lang]} {sorted(missing)} {sorted(extra)}"))
+    return out
+
+
+def check_css(state: SiteState) -> List[Finding]:
+    from . import css
+
+    # No usage scan (a second HTML parse): unused @media is left to `mocyno-seo verify css`
+    out = []
+    for rel in css.DEFAULT_FILES:
+        path = state.public_dir / rel
+        if path.is_file():
+            out.extend(css.check(css.load(path, rel)))
+    return out
+
+
+def check_cache(state: SiteState) -> List[Finding]:
+    from . import caching
+
+    return caching.verify(state.sim, sorted(state.sim.files))
+
+
+CHECKS: Dict[str, Callable[[SiteState], List[Finding]]] = {
+    "tags": check_tags,
+    "jsonld": check_jsonld,
+    "links": check_links,
+    "anchors": check_anchors,
+    "hreflang": check_hreflang,
+    "pages": check_pages,
+    "sitemap": check_sitemap,
+    "redirects": check_redirects,
+    "robots": check_robots,
+    "scripts": check_scripts,
+    "nav": check_nav,
+    "css": check_css,
+    "cache": check_cache,
+}
+
+# Set before the pool starts so forked workers inherit it instead of reparsing
+_STATE: Optional[SiteState] = None
+
+
+def _run(name: str) -> Tuple[str, List[Finding], float, Optional[str]]:
+    start = time.perf_counter()
+    try:
+        found = finalize(CHECKS[name](_STATE))
+        error = None
+    except Exception as exc:  # a crashing check is reported, not fatal to the gate
+        found, error = [], f"{type(exc).__name__}: {exc}"
+    return name, found, (time.perf_counter() - start) * 1000, error
+
+
+def run_gate(state: SiteState, names: List[str], jobs: int, fail_fast: bool = False,
+             known: Optional[Set[str]] = None, use_threads: bool = False,
+             on_result: Optional[Callable] = None) -> Dict[str, Dict]:
+    """Run checks concurrently; {name: {findings, blockers, ms, error}} (skipped checks absent)."""
+    global _STATE
+    _STATE = state
+    known = known or set()
+    forkable = "fork" in multiprocessing.get_all_start_methods()
+    pool = (ThreadPool(jobs) if use_threads or not forkable or jobs == 1
+            else multiprocessing.get_context("fork").Pool(jobs))
+    results: Dict[str, Dict] = {}
+    try:
+        for name, found, ms, error in pool.imap_unordered(_run, names):
+            blockers = [f for f in found if f.severity == ERROR and f.fingerprint not in known]
+            results[name] = {"findings": found, "blockers": blockers, "ms": ms, "error": error}
+            if on_result:
+                on_result(name, results[name])
+            if fail_fast and (blockers or error):
+                break
+    finally:
+        pool.terminate()
+        pool.join()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run every pre-deploy check concurrently over one parse.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--only", action="append", choices=list(CHECKS), metavar="CHECK",
+                        help=f"check to run, repeatable (default: {', '.join(CHECKS)})")
+    parser.add_argument("--skip", action="append", choices=list(CHECKS), default=[], metavar="CHECK")
+    parser.add_argument("--fail-fast", action="store_true", help="stop at the first check with a blocker")
+    parser.add_argument("--baseline", type=Path, metavar="JSONL",
+                        help="findings stream of the last deploy: only new errors block")
+    parser.add_argument("--jobs", type=int, default=0, help="workers (default: one per check, up to CPUs)")
+    parser.add_argument("--threads", action="store_true", help="use threads instead of forked processes")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="write all findings as JSON lines")
+    parser.add_argument("--show", type=int, default=5, help="blockers listed per check")
+    args = parser.parse_args(argv)
+
+    names = [n for n in (args.only or list(CHECKS)) if n not in args.skip]
+    known = set(read_jsonl(args.baseline)) if args.baseline else set()
+    jobs = args.jobs or max(1, min(len(names), os.cpu_count() or 1))
+
+    start = time.perf_counter()
+    state = SiteState(args.src, args.firebase)
+    parse_ms = (time.perf_counter() - start) * 1000
+    print(f"\n[GATE] {len(state.pages)} pages parsees en {parse_ms:.0f} ms, "
+          f"{len(names)} controle(s) sur {jobs} worker(s)")
+    print("=" * 70)
+
+    def report(name: str, result: Dict) -> None:
+        errors = sum(1 for f in result["findings"] if f.severity == ERROR)
+        warns = sum(1 for f in result["findings"] if f.severity == WARN)
+        if result["error"]:
+            print(f"[ERREUR] {name:10} plantage : {result['error']}")
+            return
+        marker = SEVERITY_MARKERS[ERROR] if result["blockers"] else "[OK]"
+        print(f"{marker:8} {name:10} {len(result['blockers']):>4} bloquant(s)  {errors:>4} erreur(s)  "
+              f"{warns:>4} warn  {result['ms']:>7.0f} ms")
+        for f in result["blockers"][:args.show]:
+            print(f"            {f}")
+        if len(result["blockers"]) > args.show:
+            print(f"            ... +{len(result['blockers']) - args.show}")
+
+    results = run_gate(state, names, jobs, args.fail_fast, known, args.threads, on_result=report)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    skipped = [n for n in names if n not in results]
+    blockers = sum(len(r["blockers"]) for r in results.values())
+    crashed = [n for n, r in results.items() if r["error"]]
+    print("-" * 70)
+    if skipped:
+        print(f"[WARN] Arret anticipe, non executes : {', '.join(skipped)}")
+    print(f"Total {wall_ms:.0f} ms (parse {parse_ms:.0f} ms + controles en parallele ; "
+          f"somme des controles {sum(r['ms'] for r in results.values()):.0f} ms)")
+    if args.jsonl:
+        count = write_jsonl([f for r in results.values() for f in r["findings"]], args.jsonl)
+        print(f"[OK] {count} finding(s) -> {args.jsonl}")
+    if blockers or crashed:
+        print(f"[ERREUR] {blockers} bloquant(s)" + (f", {len(crashed)} controle(s) en echec" if crashed else "")
+              + " : deploiement refuse")
+        return 1
+    print("[OK] Aucun bloquant : deploiement autorise")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+HINTS - resource hints from each page's own dependencies
+Computes, from the page model and the script inventory (thirdparty.py),
+the few hints a page needs, for what the preload scanner cannot see or
+would fetch too late:
+
+  preload image   the LCP candidate: first eager <img> after the header,
+                  <picture> sources first (media / type kept), high priority
+  preload font    woff2 files of the @font-face rules in the first-party
+                  stylesheets the page links (at most MAX_FONTS)
+  preconnect      third-party origins reached early: injected by a script
+                  that runs while the page is parsed, or implied by a
+                  stylesheet (Google Fonts CSS -> fonts.gstatic.com)
+  dns-prefetch    origins reached later: deferred loaders, first-party .js,
+                  widget facades that load on `load` or on interaction
+
+Stylesheets, <script src> and origins referenced in the markup get no
+hint: the scanner finds them on its own. preconnect, dns-prefetch and
+image / font preloads the page has but the plan does not are removed;
+async stylesheets (<link rel=preload as=style onload=...>) and prefetch
+are not hints of this kind and are left alone.
+
+The hints shared by a whole set of pages (origins, fonts) also become
+`Link:` headers in firebase.json, one entry per distinct header value,
+matched by a regex over the URLs of those pages. The LCP preload differs
+on every page and stays in the HTML.
+
+    python scripts/mocyno-seo.py fix hints                    # per page: added / removed, Link groups
+    python scripts/mocyno-seo.py fix hints --page fr/index.html
+    python scripts/mocyno-seo.py fix hints --write-headers    # replace the Link entries of firebase.json
+    python scripts/build_site.py --hints                      # same rewrite, into dist/ only
+
+Pages are planned as the build sees them (after the default rules,
+e.g. facades); --as-is plans public/ unchanged.
+"""
+
+import argparse
+import hashlib
+import posixpath
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from . import facades
+from .classify import category_of
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR
+from .hosting import replace_headers
+from .hreflang import page_key
+from .loader import read_text
+from .pagemodel import PageModel, parse_page, site_path
+from .site import is_site_page, iter_site_files
+from .thirdparty import IMPLIED_ORIGINS, SKIPPED_CATEGORIES, Inventory, origin_of
+
+# More preconnects than this compete with the page's own requests
+MAX_PRECONNECT = 2
+# Preloading every declared weight would fetch fonts the page never uses
+MAX_FONTS = 2
+# Preloads this stage owns; as=style is the async stylesheet pattern
+MANAGED_PRELOADS = ("image", "font")
+# Smaller images are icons and badges, never the LCP element
+MIN_LCP_WIDTH = 200
+IMAGE_TYPES = {".webp": "image/webp", ".avif": "image/avif", ".jpg": "image/jpeg",
+               ".jpeg": "image/jpeg", ".png": "image/png", ".svg": "image/svg+xml"}
+
+_HEAD_LINK = re.compile(r"[ \t]*<link\b[^>]*>[ \t]*\n?", re.IGNORECASE)
+_ATTR = re.compile(r"""([\w:-]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+_HEAD_OPEN = re.compile(r"<head\b[^>]*>", re.IGNORECASE)
+_CHARSET = re.compile(r"<meta\b[^>]*\bcharset\b[^>]*>", re.IGNORECASE)
+_CSS_URL = re.compile(r"""url\(\s*["']?([^"')]+)["']?\s*\)(?:\s*format\(\s*["']?([\w-]+))?""")
+
+
+class Hint:
+    """One <link> hint; the same hint renders as a tag or as a Link header."""
+
+    __slots__ = ("rel", "href", "attrs")
+
+    def __init__(self, rel: str, href: Optional[str], **attrs: Optional[str]):
+        self.rel = rel
+        self.href = href
+        # as, type, crossorigin, media, fetchpriority, imagesrcset, imagesizes
+        self.attrs = {k.replace("_", ""): v for k, v in attrs.items() if v is not None}
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return key_of(self.rel, self.href, self.attrs.get("imagesrcset"))
+
+    @property
+    def shared(self) -> bool:
+        """Same on every page that needs it (origins, fonts), as opposed to the LCP image."""
+        return self.attrs.get("as") != "image"
+
+    def tag(self) -> str:
+        parts = [f'rel="{self.rel}"']
+        if self.href:
+            parts.append(f'href="{self.href}"')
+        for name, value in self.attrs.items():
+            parts.append(name if value == "" else f'{name}="{value}"')
+        return f"<link {' '.join(parts)}>"
+
+    def header(self) -> str:
+        params = [f"rel={self.rel}"]
+        for name, value in self.attrs.items():
+            params.append(name if value == "" else f'{name}="{value}"' if " " in value or "," in value
+                          else f"{name}={value}")
+        return f"<{self.href}>; " + "; ".join(params)
+
+    def __repr__(self) -> str:
+        return self.tag()
+
+
+def key_of(rel: str, href: Optional[str], imagesrcset: Optional[str] = None) -> Tuple[str, str]:
+    """What makes two hints the same: origin hints compare by origin, preloads by URL."""
+    if rel in ("preconnect", "dns-prefetch"):
+        return rel, (origin_of(href or "") or (href or "")).rstrip("/")
+    return rel, href or imagesrcset or ""
+
+
+def _attrs(tag: str) -> Dict[str, str]:
+    return {m.group(1).lower(): next((g for g in m.group(2, 3, 4) if g is not None), "")
+            for m in _ATTR.finditer(tag[5:-1])}
+
+
+def _image_type(url: str) -> Optional[str]:
+    return IMAGE_TYPES.get(posixpath.splitext(url.split("?", 1)[0])[1].lower())
+
+
+def _width(value: Optional[str]) -> Optional[int]:
+    return int(value) if value and value.strip().isdigit() else None
+
+
+def lcp_images(model: PageModel) -> List[Hint]:
+    """Preloads for the first eager, non-icon body image (one per <source media>)."""
+    for image in model.images:
+        attrs = image.attrs
+        width = _width(attrs.get("width"))
+        if width is not None and width < MIN_LCP_WIDTH:
+            continue
+        if (attrs.get("loading") or "").lower() == "lazy" or not (attrs.get("src") or attrs.get("srcset")):
+            return []
+        if (attrs.get("src") or "").startswith("data:"):
+            continue
+        hints, media = [], []
+        for source in image.sources:
+            if not source.get("srcset") or (source.get("type") and source["type"] not in IMAGE_TYPES.values()):
+                continue
+            if source.get("media"):
+                media.append(source["media"])
+                hints.append(_image_hint(source.get("srcset"), None, source.get("sizes"), source.get("type"),
+                                         source["media"]))
+            else:
+                # First media-less source the browser supports wins over <img src>
+                fallback = "not all and " + media[0] if len(media) == 1 else None
+                return hints + [_image_hint(source["srcset"], None, source.get("sizes") or attrs.get("sizes"),
+                                            source.get("type"), fallback)]
+        if len(media) > 1:
+            # No single media query means "none of the above": the fallback is not preloaded
+            return hints
+        fallback = "not all and " + media[0] if media else None
+        return hints + [_image_hint(attrs.get("srcset"), attrs.get("src"), attrs.get("sizes"), None, fallback)]
+    return []
+
+
+def _image_hint(srcset: Optional[str], src: Optional[str], sizes: Optional[str],
+                type_: Optional[str], media: Optional[str]) -> Hint:
+    candidates = [c.strip() for c in (srcset or "").split(",") if c.strip()]
+    if len(candidates) > 1:
+        return Hint("preload", src, as_="image", imagesrcset=", ".join(candidates), imagesizes=sizes,
+                    type=type_, media=media, fetchpriority="high")
+    href = candidates[0].split()[0] if candidates else src
+    return Hint("preload", href, as_="image", type=type_ or _image_type(href or ""), media=media,
+                fetchpriority="high")
+
+
+class Planner:
+    """Hints of any page of one site root; .js and .css files are read once."""
+
+    def __init__(self, public_dir: Path = PUBLIC_DIR):
+        self.public_dir = Path(public_dir)
+        self.inventory = Inventory(public_dir, {})
+        self._fonts: Dict[str, List[str]] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the stylesheets and scripts a plan can read (fonts, injected origins)."""
+        digest = hashlib.sha1()
+        for rel in sorted(iter_site_files(self.public_dir)):
+            if rel.endswith((".css", ".js")):
+                digest.update(rel.encode("utf-8") + b"\0")
+                digest.update((self.public_dir / rel).read_bytes())
+        return digest.hexdigest()[:12]
+
+    def fonts(self, path: str) -> List[str]:
+        """woff2 URLs (site paths) of the @font-face rules of a first-party stylesheet."""
+        if path not in self._fonts:
+            from . import css
+
+            file = self.public_dir / path.lstrip("/")
+            found: List[str] = []
+            if file.is_file() and file.suffix == ".css":
+                for rule in css.load(file, path).at_rules("font-face"):
+                    for decl in rule.declarations or ():
+                        if decl.name.lower() != "src":
+                            continue
+                        for url, fmt in _CSS_URL.findall(decl.value):
+                            if fmt == "woff2" or url.split("?", 1)[0].endswith(".woff2"):
+                                resolved = site_path(url, path.lstrip("/"))
+                                if resolved and resolved not in found:
+                                    found.append(resolved)
+            self._fonts[path] = found
+        return self._fonts[path]
+
+    def plan(self, model: PageModel, text: str = "", rel: str = "index.html") -> List[Hint]:
+        hints = lcp_images(model)
+
+        fonts: List[str] = []
+        direct: Set[str] = set()
+        early: List[str] = []
+        for ref in model.references:
+            if ref.kind == "link" or ref.noscript:
+                continue
+            origin = origin_of(ref.url)
+            if origin:
+                direct.add(origin)
+                if ref.kind == "stylesheet":
+                    early.extend(IMPLIED_ORIGINS.get(origin, ()))
+            elif ref.kind in ("stylesheet", "preload"):
+                path = site_path(ref.url, rel)
+                if path:
+                    fonts.extend(f for f in self.fonts(path) if f not in fonts)
+        hints += [Hint("preload", f, as_="font", type="font/woff2", crossorigin="") for f in fonts[:MAX_FONTS]]
+
+        late: List[str] = []
+        for tag in model.scripts:
+            info = self.inventory.script_info(rel, tag)
+            if info.via != "src":
+                (early if info.immediate else late).extend(info.origins)
+        for widget, src in facades.placeholders(text):
+            if widget.trigger != "click" and origin_of(src):
+                late.append(origin_of(src))
+
+        preconnect = [o for o in dict.fromkeys(early) if o not in direct][:MAX_PRECONNECT]
+        prefetch = [o for o in dict.fromkeys(early + late) if o not in direct and o not in preconnect]
+        hints += [Hint("preconnect", o, crossorigin="" if o in _CORS_ORIGINS else None) for o in preconnect]
+        hints += [Hint("dns-prefetch", o) for o in prefetch]
+        return hints
+
+
+# Origins fetched in CORS mode (fonts): their preconnect needs crossorigin
+_CORS_ORIGINS = {o for implied in IMPLIED_ORIGINS.values() for o in implied}
+
+
+def rewrite(text: str, hints: Sequence[Hint]) -> Tuple[str, List[Hint], List[str]]:
+    """Apply a plan to a page: (new text, hints added, stale tags removed)."""
+    head_end = text.lower().find("</head>")
+    if head_end == -1:
+        return text, [], []
+    wanted = {h.key: h for h in hints}
+    kept: Set[Tuple[str, str]] = set()
+    removed: List[str] = []
+
+    def repl(m: "re.Match") -> str:
+        tag = m.group(0).strip()
+        attrs = _attrs(tag)
+        rels = (attrs.get("rel") or "").lower().split()
+        if len(rels) != 1:
+            return m.group(0)
+        rel = rels[0]
+        if rel == "preload" and (attrs.get("as") or "").lower() not in MANAGED_PRELOADS:
+            return m.group(0)
+        if rel not in ("preconnect", "dns-prefetch", "preload"):
+            return m.group(0)
+        key = key_of(rel, attrs.get("href"), attrs.get("imagesrcset"))
+        if key in wanted and key not in kept:
+            kept.add(key)
+            return m.group(0)
+        removed.append(tag)
+        return ""
+
+    head = _HEAD_LINK.sub(repl, text[:head_end])
+    added = [h for h in hints if h.key not in kept]
+    if added:
+        anchor = _CHARSET.search(head) or _HEAD_OPEN.search(head)
+        at = anchor.end() if anchor else 0
+        indent = re.match(r"\n?([ \t]*)", head[at:]).group(1) or "  "
+        head = head[:at] + "".join(f"\n{indent}{h.tag()}" for h in added) + head[at:]
+    if not added and not removed:
+        return text, [], []
+    return head + text[head_end:], added, removed
+
+
+def _re_path(path: str) -> str:
+    """A URL path as an RE2 literal (firebase.json "regex" sources)."""
+    return re.sub(r"([.+?*()\[\]{}|^$\\])", r"\\\1", path)
+
+
+def link_headers(plans: Dict[str, List[Hint]]) -> List[Dict]:
+    """
+    firebase.json header entries for the shared hints: pages with the same
+    Link value form one entry; whole directories of them collapse to a prefix.
+    """
+    value_of: Dict[str, str] = {}
+    # x/index.html is what Hosting serves when x.html exists too: it goes last and wins
+    for rel, hints in sorted(plans.items(), key=lambda kv: kv[0].endswith("/index.html")):
+        value = ", ".join(h.header() for h in hints if h.shared)
+        if value:
+            value_of[page_key(rel)] = value
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for key, value in sorted(value_of.items()):
+        groups[value].append(key)
+
+    all_keys = {page_key(rel) for rel in plans}
+    entries = []
+    for value, keys in groups.items():
+        members = set(keys)
+        alternatives, covered = [], set()
+        # Shortest directories first: a directory whose every page is in the group is one prefix
+        dirs = sorted({posixpath.dirname(k.rstrip("/")) for k in keys}, key=lambda d: (d.count("/"), d))
+        for d in dirs:
+            prefix = d.rstrip("/") + "/"
+            if d in ("", "/") or any(prefix.startswith(c) for c in covered):
+                continue
+            under = {k for k in all_keys if k.startswith(prefix) or k == d}
+            if under and under <= members:
+                covered.add(prefix)
+                alternatives.append(_re_path(prefix) + ".*")
+        for key in keys:
+            if not any(key.startswith(c) for c in covered):
+                alternatives.append(_re_path(key.rstrip("/")) + "/?" if key != "/" else "/")
+        entries.append({"regex": "(?:" + "|".join(alternatives) + ")",
+                        "headers": [{"key": "Link", "value": value}]})
+    return entries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .rules import DEFAULT_RULES, Pipeline
+
+    parser = argparse.ArgumentParser(description="Compute each page's resource hints and the matching Link headers.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--page", action="append", metavar="REL_PATH", help="print this page's plan in full")
+    parser.add_argument("--as-is", action="store_true",
+                        help="plan the pages unchanged instead of after the default build rules")
+    parser.add_argument("--write-headers", action="store_true",
+                        help="replace the Link headers of firebase.json by the generated entries")
+    parser.add_argument("--show", type=int, default=10, help="pages listed")
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline.from_names([] if args.as_is else DEFAULT_RULES)
+    planner = Planner(args.src)
+    skipped = set(SKIPPED_CATEGORIES)
+    plans: Dict[str, List[Hint]] = {}
+    changes: List[Tuple[str, List[Hint], List[str]]] = []
+    for rel in iter_site_files(args.src):
+        if not is_site_page(rel) or category_of(rel).name in skipped:
+            continue
+        text, _ = pipeline.run(read_text(args.src / rel))
+        plans[rel] = planner.plan(parse_page(text), text, rel)
+        _, added, removed = rewrite(text, plans[rel])
+        if added or removed:
+            changes.append((rel, added, removed))
+
+    for rel in args.page or []:
+        print(f"\n[PAGE] {rel}")
+        for hint in plans.get(rel, []):
+            print(f"   {hint.tag()}")
+
+    print(f"\n[HINTS] {len(plans)} page(s), {len(changes)} a mettre a jour")
+    print("=" * 70)
+    for rel, added, removed in sorted(changes, key=lambda c: -len(c[1]) - len(c[2]))[:args.show]:
+        print(f"   {rel}")
+        for hint in added:
+            print(f"      + {hint.tag()}")
+        for tag in removed:
+            print(f"      - {tag}")
+    if len(changes) > args.show:
+        print(f"   ... +{len(changes) - args.show} page(s)")
+
+    entries = link_headers(plans)
+    print("-" * 70)
+    print(f"[LINK] {len(entries)} entree(s) d'en-tete pour {sum(1 for h in plans.values() if any(x.shared for x in h))} page(s)")
+    for entry in entries:
+        print(f"   {entry['regex'][:60]:<60}  {entry['headers'][0]['value']}")
+    if args.write_headers:
+        removed = replace_headers("Link", entries, args.firebase)
+        print(f"[OK] {args.firebase} : {removed} entree(s) Link remplacee(s) par {len(entries)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""
+Firebase Hosting model
+Reads the hosting target from firebase.json and answers "what does the
+live site return for this path?" offline: redirects, cleanUrls,
+trailingSlash, static files, rewrites and the custom 404, in Firebase's
+priority order.
+
+Redirect sources are compiled once: literal sources go into a dict,
+glob and :param sources into a short list of regexes, and a lookup
+checks the dict first, so the cost does not grow with the number of
+literal redirects.
+"""
+
+import json
+import posixpath
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+from .config import FIREBASE_JSON_PATH
+
+MAX_REDIRECT_HOPS = 10
+
+_GLOB_CHARS = re.compile(r"[*?{}:!@()\[\]]")
+
+
+def load_hosting(path: Path = FIREBASE_JSON_PATH, target: Optional[str] = None) -> Dict:
+    """The hosting block of firebase.json (first target unless one is named)."""
+    with open(path, "r", encoding="utf-8") as f:
+        hosting = json.load(f).get("hosting", {})
+    # firebase.json may declare one hosting object or a list of targets
+    if isinstance(hosting, dict):
+        return hosting
+    for entry in hosting:
+        if target is None or entry.get("target") == target or entry.get("site") == target:
+            return entry
+    return {}
+
+
+def replace_headers(key: str, entries: List[Dict], path: Path = FIREBASE_JSON_PATH,
+                    target: Optional[str] = None) -> int:
+    """
+    Drop every `key` header from the hosting target's "headers" (and the
+    entries left empty), append entries, and write firebase.json back.
+    Only the "headers" array is re-serialized; the rest of the file keeps
+    its formatting. Returns the number of entries dropped.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    current = load_hosting(path, target).get("headers")
+    kept, dropped = [], 0
+    for entry in current or []:
+        others = [h for h in entry.get("headers", []) if h.get("key", "").lower() != key.lower()]
+        if others:
+            kept.append(dict(entry, headers=others))
+        elif entry.get("headers"):
+            dropped += 1
+    new = kept + entries
+
+    decoder = json.JSONDecoder()
+    for m in re.finditer(r'"headers"\s*:\s*(?=\[)', text):
+        value, end = decoder.raw_decode(text, m.end())
+        if current is not None and value == current:
+            indent = text[text.rfind("\n", 0, m.start()) + 1:m.start()]
+            dumped = json.dumps(new, indent=2, ensure_ascii=False).replace("\n", "\n" + indent)
+            Path(path).write_text(text[:m.end()] + dumped + text[end:], encoding="utf-8")
+            return dropped
+
+    # No "headers" array yet: add one (the whole file is re-serialized)
+    config = json.loads(text)
+    hosting = config.setdefault("hosting", {})
+    if isinstance(hosting, list):
+        hosting = next((h for h in hosting if target is None or target in (h.get("target"), h.get("site"))),
+                       hosting[0] if hosting else {})
+    hosting["headers"] = new
+    Path(path).write_text(json.dumps(config, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return dropped
+
+
+def glob_to_regex(source: str) -> Tuple[Pattern, List[str]]:
+    """
+    Compile a Firebase source pattern: ** (any path; "**/" also matches
+    no directory), * (one segment), ?, {a,b} alternatives, the extglobs
+    @(a|b) ?(a|b) +(a|b) *(a|b) !(a|b) and :name / :name* captures.
+
+    Returns the regex and the capture names, in order.
+    """
+    names: List[str] = []
+    return re.compile("^" + _glob_part(source, names) + "$"), names
+
+
+def _glob_part(source: str, names: List[str]) -> str:
+    out, i = [], 0
+    while i < len(source):
+        c = source[i]
+        if c in "@?+*!" and source.startswith("(", i + 1):
+            end = source.index(")", i)
+            alternatives = "|".join(_glob_part(p, names) for p in source[i + 2:end].split("|"))
+            out.append({"@": f"(?:{alternatives})", "?": f"(?:{alternatives})?", "+": f"(?:{alternatives})+",
+                        "*": f"(?:{alternatives})*", "!": f"(?!(?:{alternatives})(?:/|$))[^/]*"}[c])
+            i = end + 1
+        elif source.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif source.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "{":
+            end = source.index("}", i)
+            out.append("(?:" + "|".join(re.escape(p) for p in source[i + 1:end].split(",")) + ")")
+            i = end + 1
+        elif c == ":" and (i == 0 or source[i - 1] == "/"):
+            m = re.match(r":(\w+)(\*?)", source[i:])
+            names.append(m.group(1))
+            out.append("(.*)" if m.group(2) else "([^/]+)")
+            i += len(m.group(0))
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def _strip_slash(path: str) -> str:
+    return path.rstrip("/") or "/"
+
+
+class RedirectMatcher:
+    """
+    First-match-wins lookup over firebase.json redirects (or rewrites).
+
+    Literal sources match with or without a trailing slash, like the
+    live site does for clean URLs.
+    """
+
+    def __init__(self, rules: Iterable[Dict]):
+        self.rules: List[Dict] = list(rules)
+        self._exact: Dict[str, int] = {}
+        self._patterns: List[Tuple[int, Pattern, List[str]]] = []
+        for index, rule in enumerate(self.rules):
+            if "regex" in rule:
+                self._patterns.append((index, re.compile("^" + rule["regex"] + "$"), []))
+                continue
+            source = rule.get("source", "")
+            if _GLOB_CHARS.search(source):
+                regex, names = glob_to_regex(source)
+                self._patterns.append((index, regex, names))
+            else:
+                self._exact.setdefault(_strip_slash(source), index)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, path: str) -> Optional[Tuple[Dict, Optional[str]]]:
+        """(rule, destination with captures filled in) or None."""
+        best = self._exact.get(_strip_slash(path))
+        for index, regex, names in self._patterns:
+            if best is not None and index > best:
+                break
+            m = regex.match(path)
+            if m:
+                rule = self.rules[index]
+                dest = rule.get("destination")
+                if dest is not None:
+                    if names:
+                        for name, value in zip(names, m.groups()):
+                            dest = re.sub(rf":{name}\*?", value, dest)
+                    elif "regex" in rule:
+                        dest = re.sub(r"(?<!/):(\w+)",
+                                      lambda g: m.group(int(g.group(1)) if g.group(1).isdigit() else g.group(1)) or "",
+                                      dest)
+                return rule, dest
+        if best is None:
+            return None
+        rule = self.rules[best]
+        return rule, rule.get("destination")
+
+
+class HeaderMatcher:
+    """
+    firebase.json "headers" entries. Every entry whose source matches a
+    path applies, in file order, so a later entry overrides a header an
+    earlier one set (the generators keep their entries disjoint).
+    """
+
+    def __init__(self, entries: Iterable[Dict]):
+        self.entries: List[Dict] = list(entries)
+        self._patterns: List[Pattern] = [
+            re.compile("^" + e["regex"] + "$") if "regex" in e else glob_to_regex(e.get("source", ""))[0]
+            for e in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def matching(self, path: str) -> List[Dict]:
+        """Entries that apply to a request path, in file order."""
+        return [e for e, regex in zip(self.entries, self._patterns) if regex.match(path)]
+
+    def resolve(self, path: str) -> Dict[str, str]:
+        """Headers a response to path carries, names as written in firebase.json."""
+        out: Dict[str, str] = {}
+        lower: Dict[str, str] = {}
+        for entry in self.matching(path):
+            for header in entry.get("headers", []):
+                key = header.get("key", "")
+                out.pop(lower.get(key.lower(), key), None)
+                lower[key.lower()] = key
+                out[key] = header.get("value", "")
+        return out
+
+
+class Response:
+    """What the simulator answers for one request."""
+
+    __slots__ = ("path", "status", "location", "file", "rule")
+
+    def __init__(self, path: str, status: int, location: Optional[str] = None,
+                 file: Optional[str] = None, rule: Optional[Dict] = None):
+        self.path = path
+        self.status = status
+        self.location = location
+        self.file = file
+        self.rule = rule
+
+    @property
+    def is_redirect(self) -> bool:
+        return 300 <= self.status < 400
+
+    def __repr__(self) -> str:
+        target = self.location or self.file
+        return f"<Response {self.status} {self.path} -> {target}>"
+
+
+class HostingSimulator:
+    """
+    Offline answer to GET path for one hosting target, given the set of
+    files it serves (POSIX paths relative to its public directory).
+    """
+
+    def __init__(self, files: Iterable[str], hosting: Optional[Dict] = None):
+        hosting = hosting if hosting is not None else load_hosting()
+        self.hosting = hosting
+        self.files: Set[str] = set(files)
+        self.clean_urls = bool(hosting.get("cleanUrls"))
+        self.trailing_slash = hosting.get("trailingSlash")
+        self.redirects = RedirectMatcher(hosting.get("redirects", []))
+        self.rewrites = RedirectMatcher(hosting.get("rewrites", []))
+        self.headers = HeaderMatcher(hosting.get("headers", []))
+
+    def add_file(self, rel: str) -> None:
+        self.files.add(rel)
+
+    def remove_file(self, rel: str) -> None:
+        self.files.discard(rel)
+
+    def _static(self, path: str) -> Optional[Response]:
+        rel = path.lstrip("/")
+        slash = path.endswith("/")
+        base = rel.rstrip("/")
+
+        if base and base in self.files and not slash:
+            if self.clean_urls and base.endswith(".html"):
+                clean = "/" + base[:-5]
+                if clean.endswith("/index"):
+                    clean = clean[:-5]
+                elif self.trailing_slash:
+                    clean += "/"
+                return Response(path, 301, location=clean)
+            return Response(path, 200, file=base)
+
+        index = posixpath.join(base, "index.html") if base else "index.html"
+        if index in self.files:
+            if self.trailing_slash is not False and not slash and base:
+                return Response(path, 301, location=path + "/")
+            if self.trailing_slash is False and slash and base:
+                return Response(path, 301, location="/" + base)
+            return Response(path, 200, file=index)
+
+        if self.clean_urls and base and base + ".html" in self.files:
+            if self.trailing_slash and not slash:
+                return Response(path, 301, location=path + "/")
+            if self.trailing_slash is False and slash:
+                return Response(path, 301, location="/" + base)
+            return Response(path, 200, file=base + ".html")
+        return None
+
+    def get(self, path: str) -> Response:
+        """Single request, no redirect following."""
+        path = path.split("#", 1)[0].split("?", 1)[0] or "/"
+        if not path.startswith("/"):
+            path = "/" + path
+
+        hit = self.redirects.match(path)
+        if hit:
+            rule, dest = hit
+            return Response(path, int(rule.get("type", 301)), location=dest, rule=rule)
+
+        static = self._static(path)
+        if static:
+            return static
+
+        hit = self.rewrites.match(path)
+        if hit:
+            rule, dest = hit
+            if dest:
+                target = dest.lstrip("/")
+                return Response(path, 200, file=target if target in self.files else None, rule=rule)
+            # function / run rewrites: served dynamically
+            return Response(path, 200, rule=rule)
+
+        return Response(path, 404, file="404.html" if "404.html" in self.files else None)
+
+    def follow(self, path: str, max_hops: int = MAX_REDIRECT_HOPS) -> List[Response]:
+        """Every hop until a non-redirect answer (or a loop / hop limit)."""
+        hops = [self.get(path)]
+        seen = {hops[0].path}
+        while hops[-1].is_redirect and len(hops) <= max_hops:
+            location = hops[-1].location or "/"
+            if location.startswith(("http://", "https://")):
+                break
+            nxt = self.get(location)
+            if nxt.path in seen:
+                hops.append(nxt)
+                break
+            seen.add(nxt.path)
+            hops.append(nxt)
+        return hops
+
+    def resolve(self, path: str) -> Response:
+        """Final answer after following redirects."""
+        return self.follow(path)[-1]
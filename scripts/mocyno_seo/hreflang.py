@@ -0,0 +1,141 @@
+"""
+Hreflang cluster index
+Groups pages that point at each other through <link rel="alternate"
+hreflang> into language clusters, using the SEO inventory's hreflangs
+table, and resolves hreflang URLs back to the files that serve them.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import BASE_URL
+
+_SITE_HOST = urlsplit(BASE_URL).netloc
+
+
+def url_key(url: str) -> Optional[str]:
+    """
+    Path key shared by every URL that serves the same file under
+    cleanUrls + trailingSlash: /fr/zones/nice, /fr/zones/nice/,
+    /fr/zones/nice.html and /fr/zones/nice/index.html all give
+    "/fr/zones/nice". None for URLs on another host.
+    """
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host and host != _SITE_HOST:
+        return None
+    path = parts.path or "/"
+    if not path.startswith("/"):
+        path = "/" + path
+    path = path.rstrip("/")
+    if path.endswith(".html"):
+        path = path[:-5]
+    if path.endswith("/index") or path == "/index":
+        path = path[:-6]
+    return path or "/"
+
+
+def page_key(rel_path: str) -> str:
+    return url_key("/" + rel_path)
+
+
+class Cluster:
+    """One set of language alternates."""
+
+    def __init__(self, pages: List[str]):
+        self.pages = pages
+        self.by_lang: Dict[str, List[str]] = defaultdict(list)
+        self.primary: Dict[str, str] = {}
+
+    def pair(self, a: str = "fr", b: str = "en") -> Tuple[Optional[str], Optional[str]]:
+        return self.primary.get(a), self.primary.get(b)
+
+    def aliases(self, lang: str) -> List[str]:
+        """Pages of lang in the cluster other than its primary page."""
+        return [p for p in self.by_lang.get(lang, []) if p != self.primary.get(lang)]
+
+    def to_dict(self) -> Dict:
+        return {"pages": self.pages, "primary": self.primary,
+                "by_lang": {k: v for k, v in sorted(self.by_lang.items())}}
+
+
+class HreflangIndex:
+    """
+    Built from (rel_path, lang) rows and (rel_path, hreflang, href) rows,
+    i.e. the inventory's pages and hreflangs tables.
+    """
+
+    def __init__(self, pages: Iterable[Tuple[str, Optional[str]]],
+                 hreflangs: Iterable[Tuple[str, str, str]]):
+        self.lang: Dict[str, Optional[str]] = {}
+        self._by_key: Dict[str, str] = {}
+        for rel, lang in pages:
+            self.lang[rel] = lang
+            key = page_key(rel)
+            current = self._by_key.get(key)
+            # fr/zones/nice/index.html is what /fr/zones/nice/ serves, not fr/zones/nice.html
+            if current is None or (rel.endswith("/index.html") and not current.endswith("/index.html")):
+                self._by_key[key] = rel
+
+        self.links: Dict[str, List[Tuple[str, str, Optional[str]]]] = defaultdict(list)
+        for rel, hl, href in hreflangs:
+            if rel in self.lang:
+                self.links[rel].append((hl, href, self.resolve(href)))
+
+        self.clusters: List[Cluster] = self._build_clusters()
+        self.cluster_of: Dict[str, Cluster] = {p: c for c in self.clusters for p in c.pages}
+
+    @classmethod
+    def from_inventory(cls, inventory) -> "HreflangIndex":
+        pages = [(r["rel_path"], r["lang"]) for r in inventory.sql("SELECT rel_path, lang FROM pages")]
+        links = [(r["rel_path"], r["lang"], r["href"])
+                 for r in inventory.sql("SELECT rel_path, lang, href FROM hreflangs ORDER BY rowid")]
+        return cls(pages, links)
+
+    def resolve(self, url: str) -> Optional[str]:
+        """File served at url, or None (other host, missing page)."""
+        key = url_key(url) if url else None
+        return self._by_key.get(key) if key else None
+
+    def _build_clusters(self) -> List[Cluster]:
+        parent: Dict[str, str] = {p: p for p in self.lang}
+
+        def find(x: str) -> str:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for rel, links in self.links.items():
+            for _, _, target in links:
+                if target:
+                    ra, rb = find(rel), find(target)
+                    if ra != rb:
+                        parent[max(ra, rb)] = min(ra, rb)
+
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for p in self.lang:
+            groups[find(p)].append(p)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2 and not self.links.get(members[0]):
+                continue
+            cluster = Cluster(sorted(members))
+            votes: Dict[str, Counter] = defaultdict(Counter)
+            for rel in cluster.pages:
+                lang = self.lang.get(rel)
+                if lang:
+                    cluster.by_lang[lang].append(rel)
+                for hl, _, target in self.links.get(rel, []):
+                    if target and hl != "x-default":
+                        votes[hl.split("-")[0].lower()][target] += 1
+            for lang, pages in cluster.by_lang.items():
+                # The page the cluster's hreflangs point at; copies nobody points at are aliases
+                ranked = sorted(pages, key=lambda p: (-votes[lang][p], p.count("/") == 0, p))
+                cluster.primary[lang] = ranked[0]
+            clusters.append(cluster)
+        return sorted(clusters, key=lambda c: c.pages[0])
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+IMAGES - weight and format audit
+Reports, for every raster image under public/:
+
+  heavy      file larger than --max-kb
+  no-webp    PNG/JPEG without a .webp sibling of the same name
+  oversized  pixel width above --max-width (needs Pillow)
+
+Pillow is imported only when dimensions are requested; without it the
+audit runs on file sizes alone.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import PUBLIC_DIR
+from .findings import WARN, Finding, write_jsonl
+from .site import is_app_shell, iter_site_files
+
+RASTER = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".avif")
+CONVERTIBLE = (".png", ".jpg", ".jpeg")
+
+
+def audit(public_dir: Path = PUBLIC_DIR, max_kb: int = 200,
+          max_width: Optional[int] = None) -> List[Dict]:
+    public_dir = Path(public_dir)
+    files = [rel for rel in iter_site_files(public_dir)
+             if rel.lower().endswith(RASTER) and not is_app_shell(rel)]
+    present = set(files)
+
+    image_open = None
+    if max_width:
+        try:
+            from PIL import Image
+            image_open = Image.open
+        except ImportError:
+            print("[WARN] Pillow absent : controle des dimensions ignore (pip install Pillow)")
+
+    issues: List[Dict] = []
+    for rel in files:
+        size_kb = (public_dir / rel).stat().st_size / 1024
+        stem, dot, ext = rel.rpartition(".")
+        if size_kb > max_kb:
+            issues.append({"kind": "heavy", "file": rel, "detail": f"{size_kb:.0f} KB > {max_kb} KB"})
+        if "." + ext.lower() in CONVERTIBLE and stem + ".webp" not in present:
+            issues.append({"kind": "no-webp", "file": rel, "detail": f"{stem}.webp missing"})
+        if image_open is not None:
+            try:
+                with image_open(public_dir / rel) as img:
+                    width = img.size[0]
+            except OSError as exc:
+                issues.append({"kind": "unreadable", "file": rel, "detail": str(exc)})
+                continue
+            if width > max_width:
+                issues.append({"kind": "oversized", "file": rel, "detail": f"{width}px > {max_width}px"})
+    return issues
+
+
+def to_findings(issues: List[Dict]) -> List[Finding]:
+    # The measured value is not part of the key: a 410 KB image stays the same finding at 395 KB
+    return [Finding(f"images/{i['kind']}", WARN, i["file"], i["detail"], key="") for i in issues]
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Optional[Path] = None) -> List[Finding]:
+    return to_findings(audit(public_dir))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Audit image weight and formats under public/.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--max-kb", type=int, default=200, help="weight budget per image (default: 200)")
+    parser.add_argument("--max-width", type=int, help="flag images wider than this (needs Pillow)")
+    parser.add_argument("--json", action="store_true", help="print issues as JSON")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write findings as JSON lines")
+    args = parser.parse_args(argv)
+
+    issues = audit(args.src, args.max_kb, args.max_width)
+    if args.jsonl:
+        write_jsonl(to_findings(issues), args.jsonl)
+    if args.json:
+        print(json.dumps(issues, indent=2))
+        return 0
+    print(f"\n[IMAGES] {len(issues)} remarque(s)")
+    print("=" * 70)
+    for issue in issues:
+        print(f"[WARN]   {issue['kind']:10} {issue['file']}  ({issue['detail']})")
+    if not issues:
+        print("[OK] Images dans le budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Instrumentation
+Records where a fixer run spends its time: one span per stage (read,
+parse, rule, serialize, write, image probe...) with wall time, bytes
+processed and match count, attributed to a page and a rule.
+
+Spans export as an aggregated JSON report or as a Chrome trace
+(chrome://tracing, https://ui.perfetto.dev).
+"""
+
+import builtins
+import io
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+class Span:
+    """One timed unit of work."""
+
+    __slots__ = ("stage", "name", "page", "start_ns", "dur_ns", "nbytes", "matches")
+
+    def __init__(self, stage: str, name: Optional[str], page: Optional[str],
+                 start_ns: int, nbytes: int = 0):
+        self.stage = stage
+        self.name = name
+        self.page = page
+        self.start_ns = start_ns
+        self.dur_ns = 0
+        self.nbytes = nbytes
+        self.matches = 0
+
+
+class Profiler:
+    """Collects spans; pass one to build() / Pipeline.run() to enable timing."""
+
+    def __init__(self):
+        self.origin_ns = time.perf_counter_ns()
+        self.spans: List[Span] = []
+        # Page the legacy-script tracer attributes regex calls to
+        self.current_page: Optional[str] = None
+
+    @contextmanager
+    def span(self, stage: str, name: Optional[str] = None, page: Optional[str] = None,
+             nbytes: int = 0) -> Iterator[Span]:
+        s = Span(stage, name, page if page is not None else self.current_page,
+                 time.perf_counter_ns(), nbytes)
+        try:
+            yield s
+        finally:
+            s.dur_ns = time.perf_counter_ns() - s.start_ns
+            self.spans.append(s)
+
+    def record(self, stage: str, name: Optional[str], start_ns: int, nbytes: int = 0,
+               matches: int = 0, page: Optional[str] = None) -> None:
+        """Add a span that started at start_ns and ends now."""
+        s = Span(stage, name, page if page is not None else self.current_page, start_ns, nbytes)
+        s.dur_ns = time.perf_counter_ns() - start_ns
+        s.matches = matches
+        self.spans.append(s)
+
+    # --- reports -----------------------------------------------------------
+
+    def summary(self) -> List[Dict]:
+        """
+        Aggregate spans per (stage, name), slowest first.
+
+        Returns:
+            [{stage, name, calls, total_ms, max_ms, bytes, matches, pages, pages_matched}]
+        """
+        groups: Dict[tuple, Dict] = {}
+        for s in self.spans:
+            g = groups.get((s.stage, s.name))
+            if g is None:
+                g = groups[(s.stage, s.name)] = {
+                    "stage": s.stage, "name": s.name, "calls": 0, "total_ns": 0,
+                    "max_ns": 0, "bytes": 0, "matches": 0, "_pages": set(), "_matched": set(),
+                }
+            g["calls"] += 1
+            g["total_ns"] += s.dur_ns
+            g["max_ns"] = max(g["max_ns"], s.dur_ns)
+            g["bytes"] += s.nbytes
+            g["matches"] += s.matches
+            if s.page is not None:
+                g["_pages"].add(s.page)
+                if s.matches:
+                    g["_matched"].add(s.page)
+
+        rows = []
+        for g in groups.values():
+            rows.append({
+                "stage": g["stage"],
+                "name": g["name"],
+                "calls": g["calls"],
+                "total_ms": round(g["total_ns"] / 1e6, 3),
+                "max_ms": round(g["max_ns"] / 1e6, 3),
+                "bytes": g["bytes"],
+                "matches": g["matches"],
+                "pages": len(g["_pages"]),
+                "pages_matched": len(g["_matched"]),
+            })
+        rows.sort(key=lambda r: r["total_ms"], reverse=True)
+        return rows
+
+    def per_page(self) -> Dict[str, Dict[str, Dict]]:
+        """{page: {"stage:name": {ms, bytes, matches}}} for drill-down."""
+        pages: Dict[str, Dict[str, Dict]] = {}
+        for s in self.spans:
+            if s.page is None:
+                continue
+            key = f"{s.stage}:{s.name}" if s.name else s.stage
+            cell = pages.setdefault(s.page, {}).setdefault(key, {"ms": 0.0, "bytes": 0, "matches": 0})
+            cell["ms"] = round(cell["ms"] + s.dur_ns / 1e6, 3)
+            cell["bytes"] += s.nbytes
+            cell["matches"] += s.matches
+        return pages
+
+    def write_json(self, path: Path) -> None:
+        total_ms = (time.perf_counter_ns() - self.origin_ns) / 1e6
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"wall_ms": round(total_ms, 3),
+                       "summary": self.summary(),
+                       "pages": self.per_page()}, f, indent=1, ensure_ascii=False)
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Trace Event Format, complete ("X") events, one thread per stage."""
+        tids: Dict[str, int] = {}
+        events = []
+        for s in self.spans:
+            tid = tids.setdefault(s.stage, len(tids) + 1)
+            events.append({
+                "name": s.name or s.stage,
+                "cat": s.stage,
+                "ph": "X",
+                "ts": (s.start_ns - self.origin_ns) / 1e3,
+                "dur": s.dur_ns / 1e3,
+                "pid": 1,
+                "tid": tid,
+                "args": {"page": s.page, "bytes": s.nbytes, "matches": s.matches},
+            })
+        for stage, tid in tids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                           "args": {"name": stage}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def print_summary(self, top: int = 15) -> None:
+        rows = self.summary()
+        print(f"\n{'STAGE':<10} {'NAME':<64} {'CALLS':>6} {'TOTAL ms':>9} {'MAX ms':>8} {'MATCHES':>8} {'PAGES':>6}")
+        print("-" * 117)
+        for r in rows[:top]:
+            name = (r["name"] or "")[:64]
+            print(f"{r['stage']:<10} {name:<64} {r['calls']:>6} {r['total_ms']:>9.2f} "
+                  f"{r['max_ms']:>8.2f} {r['matches']:>8} {r['pages_matched']:>3}/{r['pages']:<3}")
+        if len(rows) > top:
+            print(f"... {len(rows) - top} more (see --profile-json)")
+
+
+# --- regex tracing for legacy scripts ---------------------------------------
+
+class TracedPattern:
+    """Wraps a compiled pattern; every call is recorded as a "regex" span."""
+
+    def __init__(self, pattern: "re.Pattern", label: str, profiler: Profiler):
+        self._p = pattern
+        self._label = label
+        self._prof = profiler
+
+    def __getattr__(self, attr):
+        return getattr(self._p, attr)
+
+    def _timed(self, string, matches_of, call):
+        start = time.perf_counter_ns()
+        result = call()
+        nbytes = len(string) if isinstance(string, (str, bytes)) else 0
+        self._prof.record("regex", self._label, start, nbytes, matches_of(result))
+        return result
+
+    def search(self, string, *args, **kw):
+        return self._timed(string, lambda m: int(m is not None), lambda: self._p.search(string, *args, **kw))
+
+    def match(self, string, *args, **kw):
+        return self._timed(string, lambda m: int(m is not None), lambda: self._p.match(string, *args, **kw))
+
+    def fullmatch(self, string, *args, **kw):
+        return self._timed(string, lambda m: int(m is not None), lambda: self._p.fullmatch(string, *args, **kw))
+
+    def findall(self, string, *args, **kw):
+        return self._timed(string, len, lambda: self._p.findall(string, *args, **kw))
+
+    def finditer(self, string, *args, **kw):
+        found = self._timed(string, len, lambda: list(self._p.finditer(string, *args, **kw)))
+        return iter(found)
+
+    def split(self, string, *args, **kw):
+        return self._timed(string, lambda parts: len(parts) - 1, lambda: self._p.split(string, *args, **kw))
+
+    def subn(self, repl, string, *args, **kw):
+        return self._timed(string, lambda r: r[1], lambda: self._p.subn(repl, string, *args, **kw))
+
+    def sub(self, repl, string, *args, **kw):
+        return self.subn(repl, string, *args, **kw)[0]
+
+
+def _call_site(depth: int = 2) -> str:
+    frame = sys._getframe(depth)
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+
+def _label(pattern, site: str) -> str:
+    text = pattern.pattern if hasattr(pattern, "pattern") else pattern
+    if isinstance(text, bytes):
+        text = text.decode("latin-1")
+    text = text.replace("\n", "\\n")
+    if len(text) > 48:
+        # Keep both ends: long alternations often differ only at the tail
+        text = f"{text[:22]}...{text[-23:]}"
+    return f"{site} /{text}/"
+
+
+@contextmanager
+def trace_regex(profiler: Profiler):
+    """
+    Record every re.* call made while active, labelled by call site.
+
+    Patches re.compile (and the module-level helpers that go through it)
+    plus open()/io.open() so reads of .html files set the current page.
+    Intended for running a legacy fixer unchanged under the profiler.
+    """
+    real_compile = re.compile
+    real_open = builtins.open
+    saved = {name: getattr(re, name) for name in
+             ("compile", "search", "match", "fullmatch", "findall", "finditer", "split", "sub", "subn")}
+
+    def compile_(pattern, flags=0):
+        if isinstance(pattern, TracedPattern):
+            return pattern
+        return TracedPattern(real_compile(pattern, flags), _label(pattern, _call_site()), profiler)
+
+    # Position of the positional `flags` argument after `pattern`
+    flags_at = {"search": 1, "match": 1, "fullmatch": 1, "findall": 1, "finditer": 1,
+                "split": 2, "sub": 3, "subn": 3}
+
+    def helper(method):
+        def call(pattern, *args, **kw):
+            flags = kw.pop("flags", 0)
+            if len(args) > flags_at[method]:
+                flags = args[flags_at[method]]
+                args = args[:flags_at[method]]
+            p = pattern._p if isinstance(pattern, TracedPattern) else real_compile(pattern, flags)
+            traced = TracedPattern(p, _label(pattern, _call_site()), profiler)
+            return getattr(traced, method)(*args, **kw)
+        return call
+
+    def open_(file, mode="r", *args, **kw):
+        if "r" in mode and str(file).endswith(".html"):
+            profiler.current_page = str(file)
+        return real_open(file, mode, *args, **kw)
+
+    re.compile = compile_
+    for name in saved:
+        if name != "compile":
+            setattr(re, name, helper(name))
+    builtins.open = open_
+    io.open = open_
+    try:
+        yield profiler
+    finally:
+        for name, fn in saved.items():
+            setattr(re, name, fn)
+        builtins.open = real_open
+        io.open = real_open
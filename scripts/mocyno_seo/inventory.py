@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+SEO INVENTORY - SQLite
+Incremental version of audit_seo.py: the same per-page fields (title, h1,
+description, canonical, hreflangs, word_count, last_mod) kept in an
+SQLite database instead of a JSON dump.
+
+An update only reparses pages whose content hash changed; the (size,
+mtime) pair is checked first so untouched files are not even hashed.
+Audit questions (duplicate titles, missing descriptions, thin pages...)
+are indexed SQL queries.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import BASE_URL, CACHE_DIR, PUBLIC_DIR
+from .loader import ENCODING, ENCODING_ERRORS
+from .site import is_site_page, iter_site_files
+
+DEFAULT_DB = CACHE_DIR / "seo_inventory.sqlite"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    rel_path    TEXT PRIMARY KEY,
+    url         TEXT NOT NULL,
+    lang        TEXT,
+    hash        TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    title       TEXT,
+    h1          TEXT,
+    description TEXT,
+    canonical   TEXT,
+    robots      TEXT,
+    word_count  INTEGER NOT NULL,
+    last_mod    TEXT
+);
+CREATE TABLE IF NOT EXISTS hreflangs (
+    rel_path TEXT NOT NULL REFERENCES pages(rel_path) ON DELETE CASCADE,
+    lang     TEXT,
+    href     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_canonical ON pages(canonical);
+CREATE INDEX IF NOT EXISTS idx_pages_lang ON pages(lang);
+CREATE INDEX IF NOT EXISTS idx_pages_title ON pages(title);
+CREATE INDEX IF NOT EXISTS idx_pages_description ON pages(description);
+CREATE INDEX IF NOT EXISTS idx_pages_word_count ON pages(word_count);
+CREATE INDEX IF NOT EXISTS idx_hreflangs_page ON hreflangs(rel_path);
+CREATE INDEX IF NOT EXISTS idx_hreflangs_href ON hreflangs(href);
+"""
+
+
+class SEOParser(HTMLParser):
+    """Extracts the audit_seo.py fields in one pass over the page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lang = None
+        self.title = None
+        self.h1 = None
+        self.meta_desc = None
+        self.canonical = None
+        self.robots = None
+        self.hreflangs = []
+        self.text_content = []
+        self._title_parts: Optional[List[str]] = None
+        self._h1_parts: Optional[List[str]] = None
+        self.in_body = False
+        self.in_script_style = False
+
+    def handle_starttag(self, tag, attrs):
+        attr_dict = dict(attrs)
+        if tag == 'html':
+            self.lang = attr_dict.get('lang')
+        elif tag == 'title' and self.title is None:
+            self._title_parts = []
+        elif tag == 'h1' and self.h1 is None:
+            self._h1_parts = []
+        elif tag == 'meta':
+            name = (attr_dict.get('name') or '').lower()
+            if name == 'description' and self.meta_desc is None:
+                self.meta_desc = attr_dict.get('content')
+            elif name == 'robots':
+                self.robots = attr_dict.get('content')
+        elif tag == 'link':
+            rel = (attr_dict.get('rel') or '').lower()
+            if rel == 'canonical' and self.canonical is None:
+                self.canonical = attr_dict.get('href')
+            elif rel == 'alternate' and 'hreflang' in attr_dict:
+                self.hreflangs.append({
+                    'lang': attr_dict.get('hreflang'),
+                    'href': attr_dict.get('href')
+                })
+        elif tag == 'body':
+            self.in_body = True
+        elif tag in ('script', 'style'):
+            self.in_script_style = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip()
+            self._title_parts = None
+        elif tag == 'h1' and self._h1_parts is not None:
+            self.h1 = " ".join("".join(self._h1_parts).split())
+            self._h1_parts = None
+        elif tag == 'body':
+            self.in_body = False
+        elif tag in ('script', 'style'):
+            self.in_script_style = False
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._h1_parts is not None:
+            self._h1_parts.append(data)
+        if self.in_body and not self.in_script_style:
+            self.text_content.append(data)
+
+
+def count_words(text_list: Iterable[str]) -> int:
+    return len(" ".join(text_list).split())
+
+
+def get_clean_url(rel_path: str) -> str:
+    """fr/zones/nice.html -> https://mocyno.com/fr/zones/nice/"""
+    url = rel_path.replace("\\", "/")
+    if url.endswith("index.html"):
+        url = url[:-10]
+    elif url.endswith(".html"):
+        url = url[:-5] + "/"
+    if not url.startswith("/"):
+        url = "/" + url
+    return f"{BASE_URL}{url}"
+
+
+def page_lang(rel_path: str, html_lang: Optional[str]) -> Optional[str]:
+    """Primary language subtag: <html lang> first, else the /fr/ or /en/ prefix."""
+    if html_lang:
+        return html_lang.split("-")[0].lower()
+    first = rel_path.split("/", 1)[0]
+    return first if first in ("fr", "en") else None
+
+
+def parse_page(content: str) -> SEOParser:
+    parser = SEOParser()
+    parser.feed(content)
+    parser.close()
+    return parser
+
+
+class Inventory:
+    """SQLite-backed page inventory."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "Inventory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- update ------------------------------------------------------------
+
+    def update(self, public_dir: Path = PUBLIC_DIR) -> Dict[str, int]:
+        """
+        Bring the inventory in line with public_dir.
+
+        Returns:
+            {"scanned", "parsed", "touched", "removed"} counts; "touched"
+            are files whose mtime changed but content did not
+        """
+        public_dir = Path(public_dir)
+        known: Dict[str, Tuple[int, int, str]] = {
+            row["rel_path"]: (row["size"], row["mtime_ns"], row["hash"])
+            for row in self.conn.execute("SELECT rel_path, size, mtime_ns, hash FROM pages")
+        }
+        counts = {"scanned": 0, "parsed": 0, "touched": 0, "removed": 0}
+        seen = set()
+
+        with self.conn:
+            for rel in iter_site_files(public_dir):
+                if not is_site_page(rel) or os.path.basename(rel).startswith("google"):
+                    continue
+                seen.add(rel)
+                counts["scanned"] += 1
+                path = public_dir / rel
+                st = path.stat()
+                prev = known.get(rel)
+                if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+                    continue
+
+                raw = path.read_bytes()
+                digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+                if prev and prev[2] == digest:
+                    self.conn.execute("UPDATE pages SET size = ?, mtime_ns = ? WHERE rel_path = ?",
+                                      (st.st_size, st.st_mtime_ns, rel))
+                    counts["touched"] += 1
+                    continue
+
+                self._upsert(rel, raw, digest, st)
+                counts["parsed"] += 1
+
+            for rel in set(known) - seen:
+                self.conn.execute("DELETE FROM pages WHERE rel_path = ?", (rel,))
+                counts["removed"] += 1
+        return counts
+
+    def _upsert(self, rel: str, raw: bytes, digest: str, st: os.stat_result) -> None:
+        parser = parse_page(raw.decode(ENCODING, errors=ENCODING_ERRORS))
+        last_mod = datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d')
+        self.conn.execute("DELETE FROM hreflangs WHERE rel_path = ?", (rel,))
+        self.conn.execute(
+            """INSERT OR REPLACE INTO pages
+               (rel_path, url, lang, hash, size, mtime_ns, title, h1, description,
+                canonical, robots, word_count, last_mod)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (rel, get_clean_url(rel), page_lang(rel, parser.lang), digest, st.st_size,
+             st.st_mtime_ns, parser.title, parser.h1, parser.meta_desc, parser.canonical,
+             parser.robots, count_words(parser.text_content), last_mod),
+        )
+        self.conn.executemany(
+            "INSERT INTO hreflangs (rel_path, lang, href) VALUES (?, ?, ?)",
+            [(rel, h["lang"], h["href"]) for h in parser.hreflangs],
+        )
+
+    # --- queries -----------------------------------------------------------
+
+    def duplicate_titles(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """SELECT title, COUNT(*) AS pages, GROUP_CONCAT(rel_path, ' | ') AS files
+               FROM pages WHERE title IS NOT NULL AND title <> ''
+               GROUP BY title HAVING COUNT(*) > 1 ORDER BY pages DESC, title""").fetchall()
+
+    def duplicate_descriptions(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """SELECT description, COUNT(*) AS pages, GROUP_CONCAT(rel_path, ' | ') AS files
+               FROM pages WHERE description IS NOT NULL AND description <> ''
+               GROUP BY description HAVING COUNT(*) > 1 ORDER BY pages DESC""").fetchall()
+
+    def missing_descriptions(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """SELECT rel_path, url FROM pages
+               WHERE description IS NULL OR description = '' ORDER BY rel_path""").fetchall()
+
+    def missing_canonicals(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """SELECT rel_path, url FROM pages
+               WHERE canonical IS NULL OR canonical = '' ORDER BY rel_path""").fetchall()
+
+    def duplicate_canonicals(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """SELECT canonical, COUNT(*) AS pages, GROUP_CONCAT(rel_path, ' | ') AS files
+               FROM pages WHERE canonical IS NOT NULL AND canonical <> ''
+               GROUP BY canonical HAVING COUNT(*) > 1 ORDER BY pages DESC""").fetchall()
+
+    def thin_pages(self, min_words: int = 300) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """SELECT rel_path, word_count FROM pages
+               WHERE word_count < ? ORDER BY word_count, rel_path""", (min_words,)).fetchall()
+
+    def hreflangs_for(self, rel_path: str) -> List[Dict]:
+        return [dict(r) for r in self.conn.execute(
+            "SELECT lang, href FROM hreflangs WHERE rel_path = ? ORDER BY rowid", (rel_path,))]
+
+    def pages(self) -> List[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM pages ORDER BY rel_path").fetchall()
+
+    def sql(self, query: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        return self.conn.execute(query, tuple(params)).fetchall()
+
+    def export_json(self, path: Path, public_dir: Path = PUBLIC_DIR) -> int:
+        """Write the audit_seo.py audit_results.json format."""
+        hreflangs: Dict[str, List[Dict]] = {}
+        for row in self.conn.execute("SELECT rel_path, lang, href FROM hreflangs ORDER BY rowid"):
+            hreflangs.setdefault(row["rel_path"], []).append({"lang": row["lang"], "href": row["href"]})
+        results = [{
+            "file_path": str(Path(public_dir) / row["rel_path"]),
+            "rel_path": row["rel_path"],
+            "url": row["url"],
+            "title": row["title"],
+            "h1": row["h1"],
+            "description": row["description"],
+            "canonical": row["canonical"],
+            "hreflangs": hreflangs.get(row["rel_path"], []),
+            "word_count": row["word_count"],
+            "last_mod": row["last_mod"],
+        } for row in self.pages()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        return len(results)
+
+
+QUERIES = {
+    "duplicate-titles": lambda inv, a: inv.duplicate_titles(),
+    "duplicate-descriptions": lambda inv, a: inv.duplicate_descriptions(),
+    "duplicate-canonicals": lambda inv, a: inv.duplicate_canonicals(),
+    "missing-descriptions": lambda inv, a: inv.missing_descriptions(),
+    "missing-canonicals": lambda inv, a: inv.missing_canonicals(),
+    "thin": lambda inv, a: inv.thin_pages(a.words),
+}
+
+
+def _print_rows(rows: List[sqlite3.Row]) -> None:
+    if not rows:
+        print("   [OK] Aucun resultat")
+        return
+    for row in rows:
+        print("   • " + "  ".join(f"{k}={row[k]}" for k in row.keys()))
+    print(f"\n   {len(rows)} ligne(s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Incremental SEO inventory (SQLite).")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="inventory database path")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("update", help="rescan pages whose content changed")
+    q = sub.add_parser("query", help="run a predefined audit query")
+    q.add_argument("name", choices=sorted(QUERIES))
+    q.add_argument("--words", type=int, default=300, help="threshold for 'thin' (default: 300)")
+    s = sub.add_parser("sql", help="run an arbitrary read-only SQL query")
+    s.add_argument("query")
+    e = sub.add_parser("export-json", help="write audit_results.json (audit_seo.py format)")
+    e.add_argument("path", type=Path)
+    args = parser.parse_args(argv)
+
+    with Inventory(args.db) as inv:
+        if args.command == "update":
+            counts = inv.update(args.src)
+            print(f"[OK] {counts['scanned']} pages : {counts['parsed']} reparsed, "
+                  f"{counts['touched']} touched (same content), {counts['removed']} removed")
+        elif args.command == "query":
+            inv.update(args.src)
+            _print_rows(QUERIES[args.name](inv, args))
+        elif args.command == "sql":
+            inv.update(args.src)
+            inv.conn.execute("PRAGMA query_only = ON")
+            _print_rows(inv.sql(args.query))
+        elif args.command == "export-json":
+            inv.update(args.src)
+            count = inv.export_json(args.path, args.src)
+            print(f"[OK] {count} pages -> {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Page loader
+Shared read path for pages and assets. Content is exposed as raw bytes
+(memory-mapped for large files) and decoded to str only when a caller
+actually needs text, so marker and prefilter checks never pay for UTF-8
+decoding of files that are left untouched.
+"""
+
+import mmap
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+ENCODING = "utf-8"
+# Round-trips bytes that are not valid UTF-8 instead of failing or losing them
+ENCODING_ERRORS = "surrogateescape"
+
+# Below this, one read() is cheaper than setting up a mapping
+MMAP_THRESHOLD = 256 * 1024
+
+MODES = ("auto", "mmap", "bytes")
+
+
+class PageSource:
+    """
+    One file opened for scanning.
+
+    raw     bytes-like view of the content (mmap or bytes); supports
+            .find() and slicing, and can be passed to write()
+    text    decoded content, computed on first access
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str = "auto"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown read mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.path = Path(path)
+        self._text: Optional[str] = None
+        self._map: Optional[mmap.mmap] = None
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            use_map = size > 0 and (mode == "mmap" or (mode == "auto" and size >= MMAP_THRESHOLD))
+            if use_map:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.raw: Union[bytes, mmap.mmap] = self._map
+            else:
+                self.raw = f.read()
+        self.size = size
+
+    def contains(self, marker: Union[str, bytes]) -> bool:
+        """Substring check on the raw bytes, without decoding."""
+        if isinstance(marker, str):
+            marker = marker.encode(ENCODING)
+        return self.raw.find(marker) != -1
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            # str() decodes straight from the buffer, mmap included, without a bytes copy
+            self._text = str(self.raw, ENCODING, ENCODING_ERRORS)
+        return self._text
+
+    @property
+    def decoded(self) -> bool:
+        return self._text is not None
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self.raw = b""
+
+    def __enter__(self) -> "PageSource":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_page(path: Union[str, Path], mode: str = "auto") -> PageSource:
+    """Open a file for scanning; use as a context manager to release the mapping."""
+    return PageSource(path, mode)
+
+
+def read_text(path: Union[str, Path]) -> str:
+    """Whole file as str, decoded the same way as PageSource.text."""
+    return Path(path).read_bytes().decode(ENCODING, errors=ENCODING_ERRORS)
+
+
+def encode_text(text: str) -> bytes:
+    return text.encode(ENCODING, errors=ENCODING_ERRORS)
+
+
+def write_if_changed(path: Union[str, Path], text: str) -> bool:
+    """
+    Write text unless the file already holds exactly these bytes. A
+    rewrite with the same content would still bump the mtime, which
+    sitemap <lastmod> and the deploy delta (deploy.py) read as a change.
+    """
+    path = Path(path)
+    data = encode_text(text)
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+NEAR-DUPLICATE CONTENT - MinHash + LSH
+Finds pages whose main text is nearly the same (zone pages cloned from
+one template, canonical variants such as zones/nice.html and
+zones/nice/index.html) and paragraphs repeated across the site.
+
+Each text is cut into word shingles, summarised by a MinHash signature
+and bucketed by LSH banding: only texts sharing a band are compared, so
+the cost grows with the number of similar pairs instead of n². Candidate
+pairs are then confirmed with their exact Jaccard similarity.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import random
+import re
+import sys
+from collections import defaultdict
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .config import PUBLIC_DIR
+from .findings import INFO, WARN, Finding, write_jsonl
+from .loader import read_text
+from .site import is_site_page, iter_site_files
+
+# Mersenne prime 2^61 - 1: universal hashing modulus for the permutations
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 61) - 1
+
+DEFAULT_PERMUTATIONS = 128
+DEFAULT_BANDS = 32
+PAGE_SHINGLE = 5
+PARAGRAPH_SHINGLE = 3
+# Paragraphs shorter than this are menus, buttons and captions
+MIN_PARAGRAPH_WORDS = 12
+
+# Never part of a page's own content
+SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "nav", "header", "footer"}
+BLOCK_TAGS = {"p", "li", "blockquote", "dd", "figcaption"}
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class TextExtractor(HTMLParser):
+    """
+    Main text and paragraphs of a page.
+
+    Text inside <main> is used when the page has one, the whole <body>
+    otherwise; navigation, header, footer and scripts are dropped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.body: List[str] = []
+        self.main: List[str] = []
+        self.paragraphs: List[str] = []
+        self._skip = 0
+        self._in_body = False
+        self._in_main = 0
+        self._block: Optional[List[str]] = None
+        self._block_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag == "body":
+            self._in_body = True
+        elif tag == "main":
+            self._in_main += 1
+        elif tag in BLOCK_TAGS and not self._skip:
+            if self._block is None:
+                self._block = []
+            self._block_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "body":
+            self._in_body = False
+        elif tag == "main":
+            self._in_main = max(0, self._in_main - 1)
+        elif tag in BLOCK_TAGS and self._block is not None:
+            self._block_depth -= 1
+            if self._block_depth <= 0:
+                text = " ".join("".join(self._block).split())
+                if text:
+                    self.paragraphs.append(text)
+                self._block, self._block_depth = None, 0
+
+    def handle_data(self, data):
+        if self._skip or not self._in_body:
+            return
+        self.body.append(data)
+        if self._in_main:
+            self.main.append(data)
+        if self._block is not None:
+            self._block.append(data)
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.main or self.body)
+
+
+def extract(html: str) -> TextExtractor:
+    parser = TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def shingles(tokens: Sequence[str], k: int) -> FrozenSet[int]:
+    """Hashed k-word shingles (a single shingle for texts shorter than k)."""
+    if not tokens:
+        return frozenset()
+    if len(tokens) <= k:
+        grams = [" ".join(tokens)]
+    else:
+        grams = [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    return frozenset(
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+        for g in grams
+    )
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """num_perm hash functions h(x) = (a*x + b) mod p, fixed by seed."""
+
+    def __init__(self, num_perm: int = DEFAULT_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: Iterable[int]) -> Tuple[int, ...]:
+        values = list(shingle_set)
+        if not values:
+            return (_MAX_HASH,) * self.num_perm
+        p = _PRIME
+        return tuple(min([(a * x + b) % p for x in values]) for a, b in self.perms)
+
+    @staticmethod
+    def estimate(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class LSHIndex:
+    """
+    LSH banding: signatures are cut into `bands` bands of `rows` values;
+    two texts become candidates when at least one band is identical.
+
+    With b bands of r rows, a pair of Jaccard similarity s is found with
+    probability 1 - (1 - s^r)^b; the curve is steepest near
+    (1/b)^(1/r), the effective threshold.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_PERMUTATIONS, bands: int = DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"{num_perm} permutations cannot be split in {bands} bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [defaultdict(list) for _ in range(bands)]
+
+    @property
+    def threshold(self) -> float:
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def add(self, key: str, signature: Sequence[int]) -> None:
+        r = self.rows
+        for i, bucket in enumerate(self._buckets):
+            bucket[tuple(signature[i * r:(i + 1) * r])].append(key)
+
+    def candidates(self) -> Set[Tuple[str, str]]:
+        pairs: Set[Tuple[str, str]] = set()
+        for bucket in self._buckets:
+            for keys in bucket.values():
+                if len(keys) < 2:
+                    continue
+                for i, a in enumerate(keys):
+                    for b in keys[i + 1:]:
+                        pairs.add((a, b) if a < b else (b, a))
+        return pairs
+
+
+def _clusters(pairs: Iterable[Tuple[str, str]]) -> List[List[str]]:
+    """Connected components of the similarity graph (union-find)."""
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for x in parent:
+        groups[find(x)].append(x)
+    return sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g[0]))
+
+
+class NearDuplicateReport:
+    """Result of detect(): page pairs, page clusters and repeated paragraphs."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.pages: List[str] = []
+        self.page_pairs: List[Dict] = []
+        self.clusters: List[List[str]] = []
+        self.paragraph_groups: List[Dict] = []
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.candidates = 0
+
+    def matrix(self, pages: Optional[List[str]] = None) -> Tuple[List[str], List[List[float]]]:
+        """
+        Estimated similarity between every two of pages (default: all pages
+        that belong to a cluster), ordered cluster by cluster.
+        """
+        if pages is None:
+            pages = [p for cluster in self.clusters for p in cluster]
+        sigs = [self.signatures[p] for p in pages]
+        rows = [[round(MinHasher.estimate(a, b), 3) for b in sigs] for a in sigs]
+        return pages, rows
+
+    def to_dict(self) -> Dict:
+        return {
+            "threshold": self.threshold,
+            "pages": len(self.pages),
+            "candidates": self.candidates,
+            "pairs": self.page_pairs,
+            "clusters": self.clusters,
+            "paragraphs": self.paragraph_groups,
+        }
+
+
+def detect(public_dir: Path = PUBLIC_DIR, threshold: float = 0.5,
+           num_perm: int = DEFAULT_PERMUTATIONS, bands: int = DEFAULT_BANDS,
+           paragraphs: bool = True, pages: Optional[Iterable[str]] = None) -> NearDuplicateReport:
+    public_dir = Path(public_dir)
+    hasher = MinHasher(num_perm)
+    page_index = LSHIndex(num_perm, bands)
+    para_index = LSHIndex(num_perm, bands)
+    report = NearDuplicateReport(threshold)
+
+    page_shingles: Dict[str, FrozenSet[int]] = {}
+    para_shingles: Dict[str, FrozenSet[int]] = {}
+    para_text: Dict[str, str] = {}
+    para_pages: Dict[str, Set[str]] = defaultdict(set)
+    exact_para: Dict[FrozenSet[int], str] = {}
+
+    rels = sorted(pages) if pages is not None else [r for r in iter_site_files(public_dir) if is_site_page(r)]
+    for rel in rels:
+        parsed = extract(read_text(public_dir / rel))
+        sh = shingles(words(parsed.text), PAGE_SHINGLE)
+        if not sh:
+            continue
+        report.pages.append(rel)
+        page_shingles[rel] = sh
+        sig = hasher.signature(sh)
+        report.signatures[rel] = sig
+        page_index.add(rel, sig)
+
+        if not paragraphs:
+            continue
+        for text in parsed.paragraphs:
+            tokens = words(text)
+            if len(tokens) < MIN_PARAGRAPH_WORDS:
+                continue
+            psh = shingles(tokens, PARAGRAPH_SHINGLE)
+            # Identical paragraphs share one key: hashed once, grouped for free
+            key = exact_para.get(psh)
+            if key is None:
+                key = f"p{len(exact_para)}"
+                exact_para[psh] = key
+                para_shingles[key] = psh
+                para_text[key] = text
+                para_index.add(key, hasher.signature(psh))
+            para_pages[key].add(rel)
+
+    candidates = page_index.candidates()
+    report.candidates = len(candidates)
+    confirmed = []
+    for a, b in sorted(candidates):
+        sim = jaccard(page_shingles[a], page_shingles[b])
+        if sim >= threshold:
+            confirmed.append((a, b))
+            report.page_pairs.append({
+                "a": a, "b": b, "jaccard": round(sim, 3),
+                "estimate": round(MinHasher.estimate(report.signatures[a], report.signatures[b]), 3),
+            })
+    report.page_pairs.sort(key=lambda p: (-p["jaccard"], p["a"], p["b"]))
+    report.clusters = _clusters(confirmed)
+
+    if paragraphs:
+        near = [(a, b) for a, b in para_index.candidates()
+                if jaccard(para_shingles[a], para_shingles[b]) >= threshold]
+        grouped = set()
+        for group in _clusters(near) + [[k] for k in para_pages]:
+            if any(k in grouped for k in group):
+                continue
+            grouped.update(group)
+            where = sorted(set().union(*(para_pages[k] for k in group)))
+            if len(where) < 2:
+                continue
+            report.paragraph_groups.append({
+                "text": para_text[group[0]],
+                "variants": len(group),
+                "pages": where,
+            })
+        report.paragraph_groups.sort(key=lambda g: (-len(g["pages"]), g["text"]))
+    return report
+
+
+def write_matrix_csv(report: NearDuplicateReport, path: Path) -> int:
+    pages, rows = report.matrix()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([""] + pages)
+        for page, row in zip(pages, rows):
+            writer.writerow([page] + row)
+    return len(pages)
+
+
+def to_findings(report: NearDuplicateReport) -> List[Finding]:
+    out = [Finding("duplicates/page-pair", WARN, pair["a"], f"{pair['jaccard']:.2f} similar to {pair['b']}",
+                   key=pair["b"]) for pair in report.page_pairs]
+    for group in report.paragraph_groups:
+        text = group["text"] if len(group["text"]) <= 90 else group["text"][:87] + "..."
+        digest = hashlib.sha1(group["text"].encode("utf-8")).hexdigest()[:12]
+        out.extend(Finding("duplicates/paragraph", INFO, page, f"repeated on {len(group['pages'])} pages: {text}",
+                           key=digest) for page in group["pages"])
+    return out
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Optional[Path] = None) -> List[Finding]:
+    return to_findings(detect(public_dir))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Near-duplicate pages and paragraphs (MinHash + LSH).")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="minimum Jaccard similarity (default: 0.5)")
+    parser.add_argument("--perm", type=int, default=DEFAULT_PERMUTATIONS, help="MinHash permutations")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS, help="LSH bands (must divide --perm)")
+    parser.add_argument("--no-paragraphs", action="store_true", help="pages only")
+    parser.add_argument("--matrix", type=Path, metavar="CSV", help="write the similarity matrix of clustered pages")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="write the full report as JSON")
+    parser.add_argument("--top", type=int, default=20, help="rows per console section")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write findings as JSON lines")
+    args = parser.parse_args(argv)
+
+    report = detect(args.src, args.threshold, args.perm, args.bands, paragraphs=not args.no_paragraphs)
+
+    print(f"\n[NEAR-DUP] {len(report.pages)} pages, {report.candidates} LSH candidate pairs "
+          f"(of {len(report.pages) * (len(report.pages) - 1) // 2}), threshold {args.threshold}")
+    print("=" * 70)
+    print(f"\nPAIRES DE PAGES ({len(report.page_pairs)})")
+    for pair in report.page_pairs[:args.top]:
+        print(f"   {pair['jaccard']:.2f}  {pair['a']}  <->  {pair['b']}")
+    print(f"\nGROUPES ({len(report.clusters)})")
+    for cluster in report.clusters[:args.top]:
+        print(f"   [{len(cluster)}] " + ", ".join(cluster))
+    if not args.no_paragraphs:
+        print(f"\nPARAGRAPHES REPETES ({len(report.paragraph_groups)})")
+        for group in report.paragraph_groups[:args.top]:
+            text = group["text"] if len(group["text"]) <= 90 else group["text"][:87] + "..."
+            print(f"   [{len(group['pages'])} pages, {group['variants']} variante(s)] {text}")
+
+    if args.matrix:
+        count = write_matrix_csv(report, args.matrix)
+        print(f"\n[OK] Matrice ({count}x{count}) : {args.matrix}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+        print(f"[OK] Rapport : {args.json}")
+    if args.jsonl:
+        count = write_jsonl(to_findings(report), args.jsonl)
+        print(f"[OK] {count} finding(s) -> {args.jsonl}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Page model
+One HTMLParser pass that extracts what the validators and indexes need
+from a page: the head model (title, meta description, og:description
+counts and values, canonical, robots, hreflangs), every outgoing
+reference (links, images, stylesheets, scripts, icons, social images),
+the raw JSON-LD blocks, the site header's navigation links, the
+fragment targets (element ids and <a name>) links can point at, every
+script tag and resource hint (thirdparty.py), and the body images with
+their <picture> sources (hints.py picks the LCP candidate among them).
+"""
+
+import posixpath
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .config import BASE_URL
+
+_SITE_HOST = urlsplit(BASE_URL).netloc
+_IGNORED_SCHEMES = ("mailto:", "tel:", "javascript:", "data:", "sms:", "whatsapp:")
+
+# (tag, attribute) -> reference kind
+REFERENCE_ATTRS = {
+    ("a", "href"): "link",
+    ("img", "src"): "image",
+    ("source", "src"): "media",
+    ("video", "src"): "media",
+    ("video", "poster"): "image",
+    ("audio", "src"): "media",
+    ("script", "src"): "script",
+    ("iframe", "src"): "frame",
+}
+SRCSET_TAGS = ("img", "source")
+LINK_REL_KINDS = {
+    "stylesheet": "stylesheet",
+    "icon": "icon",
+    "shortcut icon": "icon",
+    "apple-touch-icon": "icon",
+    "manifest": "manifest",
+    "preload": "preload",
+    "prefetch": "preload",
+    "modulepreload": "script",
+}
+META_IMAGE_KEYS = ("og:image", "twitter:image", "og:image:url")
+# Fragments that scroll without a target element (HTML spec: "" and "top")
+ALWAYS_VALID_FRAGMENTS = ("", "top")
+
+
+class Reference:
+    __slots__ = ("kind", "url", "line", "noscript")
+
+    def __init__(self, kind: str, url: str, line: int, noscript: bool = False):
+        self.kind = kind
+        self.url = url
+        self.line = line
+        # Inside <noscript>: fetched only when scripting is off
+        self.noscript = noscript
+
+    def __repr__(self) -> str:
+        return f"<Reference {self.kind} {self.url} L{self.line}>"
+
+
+class ScriptTag:
+    """One <script> other than JSON-LD: attributes, place in the page, inline body."""
+
+    __slots__ = ("attrs", "in_head", "line", "text")
+
+    def __init__(self, attrs: Dict[str, Optional[str]], in_head: bool, line: int):
+        self.attrs = attrs
+        self.in_head = in_head
+        self.line = line
+        # Inline body; None for src scripts
+        self.text: Optional[str] = None if attrs.get("src") else ""
+
+    @property
+    def src(self) -> Optional[str]:
+        return (self.attrs.get("src") or "").strip() or None
+
+
+class ImageTag:
+    """One <img> of the body outside <header>, with the <source>s of its <picture>."""
+
+    __slots__ = ("attrs", "sources", "line")
+
+    def __init__(self, attrs: Dict[str, Optional[str]], sources: List[Dict[str, Optional[str]]], line: int):
+        self.attrs = attrs
+        self.sources = sources
+        self.line = line
+
+
+HINT_RELS = ("preconnect", "dns-prefetch", "preload", "modulepreload", "prefetch")
+
+
+class PageModel(HTMLParser):
+    """Head model and outgoing references of one page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lang: Optional[str] = None
+        self.head_counts: Dict[str, int] = {"title": 0, "meta_description": 0, "og_description": 0}
+        self.title: Optional[str] = None
+        self.description: Optional[str] = None
+        self.canonical: Optional[str] = None
+        self.robots: Optional[str] = None
+        self.hreflangs: List[Tuple[str, str]] = []
+        self.references: List[Reference] = []
+        # (line, raw text) of each <script type="application/ld+json">
+        self.jsonld: List[Tuple[int, str]] = []
+        # hrefs of the <header> links, language switch excluded
+        self.header_links: List[str] = []
+        # every id and <a name>: what "#fragment" can land on
+        self.anchors: Set[str] = set()
+        self.scripts: List[ScriptTag] = []
+        # (rel, href, as, line) of each preconnect / dns-prefetch / preload / prefetch
+        self.hints: List[Tuple[str, str, str, int]] = []
+        # <img> tags after the site header, in document order
+        self.images: List[ImageTag] = []
+        self._picture: Optional[List[Dict[str, Optional[str]]]] = None
+        self._script: Optional[ScriptTag] = None
+        self._in_head = False
+        self._title_parts: Optional[List[str]] = None
+        self._jsonld_parts: Optional[List[str]] = None
+        self._jsonld_line = 0
+        self._header_depth = 0
+        self._noscript = 0
+
+    def _ref(self, kind: str, url: Optional[str]) -> None:
+        if url and url.strip():
+            self.references.append(Reference(kind, url.strip(), self.getpos()[0], self._noscript > 0))
+
+    def handle_starttag(self, tag, attrs):
+        attr_dict = dict(attrs)
+        if attr_dict.get("id"):
+            self.anchors.add(attr_dict["id"])
+        if tag == "a" and attr_dict.get("name"):
+            self.anchors.add(attr_dict["name"])
+        if tag == "noscript":
+            self._noscript += 1
+        elif tag == "picture":
+            self._picture = []
+        elif tag == "source" and self._picture is not None:
+            self._picture.append(attr_dict)
+        elif tag == "img" and not self._in_head and not self._header_depth:
+            self.images.append(ImageTag(attr_dict, self._picture or [], self.getpos()[0]))
+        if tag == "html":
+            self.lang = attr_dict.get("lang")
+        elif tag == "head":
+            self._in_head = True
+        elif tag == "body":
+            self._in_head = False
+        elif tag == "header":
+            self._header_depth += 1
+        elif tag == "script" and (attr_dict.get("type") or "").lower() == "application/ld+json":
+            self._jsonld_parts = []
+            self._jsonld_line = self.getpos()[0]
+        elif tag == "script":
+            self._script = ScriptTag(attr_dict, self._in_head, self.getpos()[0])
+            self.scripts.append(self._script)
+        elif tag == "a" and self._header_depth and "hreflang" not in attr_dict:
+            self.header_links.append(attr_dict.get("href") or "")
+        elif tag == "title":
+            if self._in_head:
+                self.head_counts["title"] += 1
+            if self.title is None:
+                self._title_parts = []
+        elif tag == "meta":
+            name = (attr_dict.get("name") or "").lower()
+            prop = (attr_dict.get("property") or "").lower()
+            if name == "description":
+                if self._in_head:
+                    self.head_counts["meta_description"] += 1
+                if self.description is None:
+                    self.description = attr_dict.get("content")
+            elif name == "robots":
+                self.robots = attr_dict.get("content")
+            if prop == "og:description" and self._in_head:
+                self.head_counts["og_description"] += 1
+            if prop in META_IMAGE_KEYS or name in META_IMAGE_KEYS:
+                self._ref("image", attr_dict.get("content"))
+        elif tag == "link":
+            rel = " ".join((attr_dict.get("rel") or "").lower().split())
+            href = attr_dict.get("href")
+            if rel == "canonical":
+                if self.canonical is None:
+                    self.canonical = href
+            elif rel == "alternate" and "hreflang" in attr_dict:
+                self.hreflangs.append((attr_dict.get("hreflang"), href))
+            elif rel in LINK_REL_KINDS:
+                self._ref(LINK_REL_KINDS[rel], href)
+            for hint in rel.split():
+                if hint in HINT_RELS and href:
+                    self.hints.append((hint, href.strip(), (attr_dict.get("as") or "").lower(),
+                                       self.getpos()[0]))
+
+        kind = REFERENCE_ATTRS.get((tag, "href" if tag == "a" else "src"))
+        if kind:
+            self._ref(kind, attr_dict.get("href" if tag == "a" else "src"))
+        if tag == "video":
+            self._ref("image", attr_dict.get("poster"))
+        if tag in SRCSET_TAGS and attr_dict.get("srcset"):
+            for candidate in attr_dict["srcset"].split(","):
+                self._ref("image", candidate.strip().split(" ")[0])
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self._in_head = False
+        elif tag == "header" and self._header_depth:
+            self._header_depth -= 1
+        elif tag == "picture":
+            self._picture = None
+        elif tag == "noscript" and self._noscript:
+            self._noscript -= 1
+        elif tag == "title" and self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip()
+            self._title_parts = None
+        elif tag == "script" and self._jsonld_parts is not None:
+            self.jsonld.append((self._jsonld_line, "".join(self._jsonld_parts)))
+            self._jsonld_parts = None
+        elif tag == "script":
+            self._script = None
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        elif self._jsonld_parts is not None:
+            self._jsonld_parts.append(data)
+        elif self._script is not None and self._script.text is not None:
+            self._script.text += data
+
+    def links(self) -> List[Reference]:
+        return [r for r in self.references if r.kind == "link"]
+
+
+def parse_page(html: str) -> PageModel:
+    model = PageModel()
+    model.feed(html)
+    model.close()
+    return model
+
+
+def site_path(url: str, source_rel: str) -> Optional[str]:
+    """
+    Absolute site path of a reference found in source_rel, without query
+    or fragment; None for other hosts and non-HTTP schemes. A pure
+    fragment ("#zones") yields the source page's own path.
+    """
+    if not url or url.lower().startswith(_IGNORED_SCHEMES):
+        return None
+    parts = urlsplit(url)
+    if parts.scheme and parts.scheme not in ("http", "https"):
+        return None
+    if parts.netloc:
+        host = parts.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        if host != _SITE_HOST:
+            return None
+    path = unquote(parts.path)
+    if not path:
+        return "/" + source_rel
+    if not path.startswith("/"):
+        path = posixpath.join("/" + posixpath.dirname(source_rel), path)
+    trailing = path.endswith("/")
+    path = posixpath.normpath(path)
+    if path.startswith("//"):
+        path = path[1:]
+    if trailing and path != "/":
+        path += "/"
+    return path
+
+
+def fragment_of(url: str) -> str:
+    """Decoded fragment of a URL ("" when there is none)."""
+    return unquote(url.partition("#")[2])
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+FR/EN PARITY - structural alignment
+Pairs every French page with its English counterpart through the
+hreflang cluster index (no hard-coded MAPPINGS as in audit-mirroring.js)
+and compares the two pages' outlines: sections, headings, link and image
+counts per section, and JSON-LD types.
+
+Outlines are aligned in linear time, so a drift is reported where it
+happens ("EN is missing the h2 after the 3rd section") instead of as a
+single PERFECT / not PERFECT flag.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .config import PUBLIC_DIR
+from .findings import WARN, Finding, write_jsonl
+from .hreflang import HreflangIndex
+from .inventory import DEFAULT_DB, Inventory
+from .loader import read_text
+
+# Elements that open an outline node
+SECTIONING = {"section", "article", "aside", "form", "table"}
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# How far ahead the aligner looks for a node that was dropped on one side
+LOOKAHEAD = 4
+# Per-node link/image differences up to this are translation noise
+COUNT_TOLERANCE = 1
+
+
+class OutlineNode:
+    __slots__ = ("tag", "depth", "label", "links", "images")
+
+    def __init__(self, tag: str, depth: int, label: str = ""):
+        self.tag = tag
+        self.depth = depth
+        self.label = label
+        self.links = 0
+        self.images = 0
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.tag, self.depth
+
+    def describe(self) -> str:
+        text = f"<{self.tag}>"
+        if self.label:
+            label = self.label if len(self.label) <= 50 else self.label[:47] + "..."
+            text += f" {label!r}"
+        return text
+
+    def to_dict(self) -> Dict:
+        return {"tag": self.tag, "depth": self.depth, "label": self.label,
+                "links": self.links, "images": self.images}
+
+
+class OutlineParser(HTMLParser):
+    """
+    Flattens <body> into outline nodes in document order.
+
+    A node is a sectioning element or a heading; links and images count
+    towards the most recent node. depth is the sectioning nesting level,
+    which is all the tree shape the aligner needs.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.nodes: List[OutlineNode] = [OutlineNode("body", 0)]
+        self.jsonld_types: List[str] = []
+        self.jsonld_errors = 0
+        self._depth = 0
+        self._stack: List[str] = []
+        self._heading: Optional[OutlineNode] = None
+        self._heading_text: List[str] = []
+        self._jsonld: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        attr_dict = dict(attrs)
+        if tag == "script" and (attr_dict.get("type") or "").lower() == "application/ld+json":
+            self._jsonld = []
+            return
+        if tag in SECTIONING:
+            self._depth += 1
+            label = attr_dict.get("id") or (attr_dict.get("class") or "").split(" ")[0]
+            self.nodes.append(OutlineNode(tag, self._depth, label))
+        elif tag in HEADINGS:
+            self._heading = OutlineNode(tag, self._depth)
+            self._heading_text = []
+            self.nodes.append(self._heading)
+        elif tag == "a" and attr_dict.get("href"):
+            self.nodes[-1].links += 1
+        elif tag == "img":
+            self.nodes[-1].images += 1
+        if tag not in VOID:
+            self._stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID and self._stack and self._stack[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._jsonld is not None:
+            self._collect_jsonld("".join(self._jsonld))
+            self._jsonld = None
+            return
+        if tag not in self._stack:
+            return
+        # Close anything left open inside tag (lenient, like browsers)
+        while self._stack:
+            open_tag = self._stack.pop()
+            if open_tag in SECTIONING:
+                self._depth -= 1
+            elif open_tag in HEADINGS and self._heading is not None:
+                self._heading.label = " ".join("".join(self._heading_text).split())
+                self._heading = None
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._jsonld is not None:
+            self._jsonld.append(data)
+        elif self._heading is not None:
+            self._heading_text.append(data)
+
+    def _collect_jsonld(self, raw: str) -> None:
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            self.jsonld_errors += 1
+            return
+        pending = [data]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, list):
+                pending.extend(item)
+            elif isinstance(item, dict):
+                types = item.get("@type")
+                if isinstance(types, str):
+                    self.jsonld_types.append(types)
+                elif isinstance(types, list):
+                    self.jsonld_types.extend(t for t in types if isinstance(t, str))
+                if "@graph" in item:
+                    pending.append(item["@graph"])
+
+
+def outline(html: str) -> OutlineParser:
+    parser = OutlineParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def align(a: Sequence[OutlineNode], b: Sequence[OutlineNode],
+          lookahead: int = LOOKAHEAD) -> List[Tuple[Optional[int], Optional[int]]]:
+    """
+    Align two outlines on (tag, depth).
+
+    Two cursors walk the outlines; on a mismatch each side looks up to
+    `lookahead` nodes ahead for the other side's current node and the
+    shorter skip wins (reported as nodes missing on the other side). If
+    neither finds it, both nodes are paired as a substitution. Every step
+    advances at least one cursor, so the cost is O((n + m) * lookahead),
+    linear in the outline size, where a full edit distance would be
+    O(n * m).
+    """
+    pairs: List[Tuple[Optional[int], Optional[int]]] = []
+    i = j = 0
+    n, m = len(a), len(b)
+    while i < n and j < m:
+        if a[i].key == b[j].key:
+            pairs.append((i, j))
+            i += 1
+            j += 1
+            continue
+        skip_b = next((k for k in range(1, lookahead + 1) if j + k < m and b[j + k].key == a[i].key), None)
+        skip_a = next((k for k in range(1, lookahead + 1) if i + k < n and a[i + k].key == b[j].key), None)
+        if skip_b is not None and (skip_a is None or skip_b <= skip_a):
+            pairs.extend((None, j + k) for k in range(skip_b))
+            j += skip_b
+        elif skip_a is not None:
+            pairs.extend((i + k, None) for k in range(skip_a))
+            i += skip_a
+        else:
+            pairs.append((i, j))
+            i += 1
+            j += 1
+    pairs.extend((k, None) for k in range(i, n))
+    pairs.extend((None, k) for k in range(j, m))
+    return pairs
+
+
+def compare(fr: OutlineParser, en: OutlineParser, tolerance: int = COUNT_TOLERANCE) -> Dict:
+    """Structural drift between two parsed pages."""
+    a, b = fr.nodes, en.nodes
+    issues: List[Dict] = []
+    matched = 0
+    for i, j in align(a, b):
+        if i is None:
+            issues.append({"kind": "extra-en", "node": b[j].describe(), "position": j})
+        elif j is None:
+            issues.append({"kind": "missing-en", "node": a[i].describe(), "position": i})
+        elif a[i].key != b[j].key:
+            issues.append({"kind": "mismatch", "node": f"{a[i].describe()} / {b[j].describe()}",
+                           "position": i})
+        else:
+            matched += 1
+            for field in ("links", "images"):
+                fa, fb = getattr(a[i], field), getattr(b[j], field)
+                if abs(fa - fb) > tolerance:
+                    issues.append({"kind": f"{field}-count", "node": a[i].describe(),
+                                   "position": i, "fr": fa, "en": fb})
+
+    types_fr, types_en = set(fr.jsonld_types), set(en.jsonld_types)
+    if types_fr != types_en:
+        issues.append({"kind": "jsonld-types",
+                       "fr_only": sorted(types_fr - types_en), "en_only": sorted(types_en - types_fr)})
+    for lang, page in (("fr", fr), ("en", en)):
+        if page.jsonld_errors:
+            issues.append({"kind": "jsonld-invalid", "lang": lang, "blocks": page.jsonld_errors})
+
+    return {
+        "similarity": round(matched / max(len(a), len(b)), 3),
+        "nodes": {"fr": len(a), "en": len(b)},
+        "links": {"fr": sum(x.links for x in a), "en": sum(x.links for x in b)},
+        "images": {"fr": sum(x.images for x in a), "en": sum(x.images for x in b)},
+        "jsonld_types": {"fr": sorted(types_fr), "en": sorted(types_en)},
+        "issues": issues,
+    }
+
+
+def hreflang_issues(index: HreflangIndex, fr: str, en: str) -> List[Dict]:
+    """Reciprocity: FR must point at EN and EN back at FR."""
+    issues = []
+    for src, dst, lang in ((fr, en, "en"), (en, fr, "fr")):
+        targets = [t for hl, _, t in index.links.get(src, []) if hl.split("-")[0].lower() == lang]
+        hrefs = [href for hl, href, _ in index.links.get(src, []) if hl.split("-")[0].lower() == lang]
+        if not targets:
+            issues.append({"kind": "hreflang-missing", "page": src, "lang": lang})
+        elif dst not in targets:
+            issues.append({"kind": "hreflang-target", "page": src, "lang": lang, "href": hrefs[0]})
+    return issues
+
+
+def audit(public_dir: Path = PUBLIC_DIR, db_path: Path = DEFAULT_DB,
+          tolerance: int = COUNT_TOLERANCE) -> Dict:
+    public_dir = Path(public_dir)
+    with Inventory(db_path) as inv:
+        inv.update(public_dir)
+        index = HreflangIndex.from_inventory(inv)
+
+    cache: Dict[str, OutlineParser] = {}
+
+    def parsed(rel: str) -> OutlineParser:
+        if rel not in cache:
+            cache[rel] = outline(read_text(public_dir / rel))
+        return cache[rel]
+
+    details = []
+    paired: Set[str] = set()
+    for cluster in index.clusters:
+        fr, en = cluster.pair("fr", "en")
+        entry: Dict = {"pair": {"fr": fr, "en": en},
+                       "aliases": cluster.aliases("fr") + cluster.aliases("en")}
+        if fr is None or en is None:
+            entry.update(status="UNPAIRED", issues=[{"kind": "no-counterpart",
+                                                     "lang": "en" if en is None else "fr"}])
+            details.append(entry)
+            continue
+        paired.update((fr, en))
+        drift = compare(parsed(fr), parsed(en), tolerance)
+        drift["issues"] = hreflang_issues(index, fr, en) + drift["issues"]
+        entry.update(drift)
+        entry["status"] = "PERFECT" if not drift["issues"] else "DRIFT"
+        details.append(entry)
+
+    unclustered = sorted(p for p, lang in index.lang.items()
+                         if lang in ("fr", "en") and p not in index.cluster_of)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "total_pairs": sum(1 for d in details if d["status"] != "UNPAIRED"),
+        "drifting_pairs": sum(1 for d in details if d["status"] == "DRIFT"),
+        "unpaired": sum(1 for d in details if d["status"] == "UNPAIRED"),
+        "unclustered_pages": unclustered,
+        "details": details,
+    }
+
+
+def _format_issue(issue: Dict) -> str:
+    kind = issue["kind"]
+    if kind in ("links-count", "images-count"):
+        return f"{kind} {issue['node']} : FR {issue['fr']} / EN {issue['en']}"
+    if kind == "jsonld-types":
+        return f"JSON-LD FR seul {issue['fr_only']} / EN seul {issue['en_only']}"
+    if "node" in issue:
+        return f"{kind} #{issue['position']} {issue['node']}"
+    return kind + " " + " ".join(f"{k}={v}" for k, v in issue.items() if k != "kind")
+
+
+# Positions and counts move with every edit; they stay out of the fingerprint
+_VOLATILE_FIELDS = ("kind", "position", "fr", "en", "blocks")
+
+
+def to_findings(report: Dict) -> List[Finding]:
+    out: List[Finding] = []
+    for entry in report["details"]:
+        fr, en = entry["pair"]["fr"], entry["pair"]["en"]
+        for issue in entry["issues"]:
+            key = " ".join(f"{k}={v}" for k, v in issue.items() if k not in _VOLATILE_FIELDS)
+            out.append(Finding(f"parity/{issue['kind']}", WARN, fr or en, _format_issue(issue),
+                               f"<-> {en}" if fr and en else "", key=key))
+    out.extend(Finding("parity/unclustered", WARN, rel, "no hreflang cluster")
+               for rel in report["unclustered_pages"])
+    return out
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Optional[Path] = None) -> List[Finding]:
+    return to_findings(audit(public_dir))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="FR/EN structural parity through hreflang clusters.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="SEO inventory database")
+    parser.add_argument("--tolerance", type=int, default=COUNT_TOLERANCE,
+                        help="allowed link/image count difference per node (default: 1)")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="write the report (mirror_report.json layout)")
+    parser.add_argument("--issues", type=int, default=5, help="issues shown per pair in the console")
+    parser.add_argument("--strict", action="store_true", help="exit 1 if any pair drifts")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write findings as JSON lines")
+    args = parser.parse_args(argv)
+
+    report = audit(args.src, args.db, args.tolerance)
+
+    print(f"\n[PARITY] {report['total_pairs']} paires FR/EN, {report['drifting_pairs']} avec derive, "
+          f"{report['unpaired']} sans contrepartie")
+    print("=" * 70)
+    for entry in report["details"]:
+        pair = entry["pair"]
+        if entry["status"] == "PERFECT":
+            print(f"[OK]     {pair['fr']} <-> {pair['en']}")
+            continue
+        if entry["status"] == "UNPAIRED":
+            print(f"[WARN]   {pair['fr'] or pair['en']} : aucune page {entry['issues'][0]['lang'].upper()}")
+            continue
+        print(f"[DRIFT]  {pair['fr']} <-> {pair['en']}  (similarite {entry['similarity']:.2f}, "
+              f"{len(entry['issues'])} ecart(s))")
+        for issue in entry["issues"][:args.issues]:
+            print(f"         - {_format_issue(issue)}")
+        if len(entry["issues"]) > args.issues:
+            print(f"         ... +{len(entry['issues']) - args.issues}")
+    if report["unclustered_pages"]:
+        print(f"\n[WARN] {len(report['unclustered_pages'])} page(s) sans hreflang : "
+              + ", ".join(report["unclustered_pages"]))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n[OK] Rapport : {args.json}")
+    if args.jsonl:
+        count = write_jsonl(to_findings(report), args.jsonl)
+        print(f"[OK] {count} finding(s) -> {args.jsonl}")
+    return 1 if args.strict and report["drifting_pairs"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
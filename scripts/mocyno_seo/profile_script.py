@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+PROFILE - legacy fixer hot paths
+Runs an unmodified scripts/*.py fixer against a throw-away copy of the
+site with every re.* call timed, then reports which regex dominates.
+
+The copy lives in a temporary directory laid out like the repo (public/,
+scripts/, firebase.json) and the script runs with that directory as cwd,
+so both os.getcwd()-relative and __file__-relative paths land in the
+copy; MOCYNO_ROOT and MOCYNO_PUBLIC_DIR point at it for the run, so a
+fixer importing mocyno_seo.config writes there too. public/ itself is
+never written.
+"""
+
+import argparse
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR, SCRIPTS_DIR
+from .instrument import Profiler, trace_regex
+
+# Repo locations read by the fixers and by config.py, redirected to the sandbox
+SANDBOX_ENV = ("MOCYNO_ROOT", "MOCYNO_PUBLIC_DIR")
+# Fixers never rewrite these; hardlink instead of copying 40 MB of images
+LINKABLE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".avif", ".gif", ".ico", ".svg", ".woff", ".woff2")
+
+
+def _copy_or_link(src: str, dst: str) -> None:
+    if src.lower().endswith(LINKABLE_SUFFIXES):
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def make_sandbox(root: Path) -> None:
+    """Lay out public/, scripts/ and firebase.json under root."""
+    shutil.copytree(PUBLIC_DIR, root / "public", copy_function=_copy_or_link)
+    shutil.copytree(SCRIPTS_DIR, root / "scripts",
+                    ignore=shutil.ignore_patterns("__pycache__", "mocyno_seo"))
+    if FIREBASE_JSON_PATH.exists():
+        shutil.copy2(FIREBASE_JSON_PATH, root / "firebase.json")
+
+
+def profile_script(script: Path, args: List[str], keep: bool = False) -> Profiler:
+    """Run script inside a sandbox copy of the repo under the regex tracer."""
+    profiler = Profiler()
+    sandbox = Path(tempfile.mkdtemp(prefix="mocyno-profile-"))
+    old_cwd, old_argv = os.getcwd(), sys.argv
+    old_env = {name: os.environ.get(name) for name in SANDBOX_ENV}
+    try:
+        with profiler.span("setup", "sandbox"):
+            make_sandbox(sandbox)
+        target = sandbox / "scripts" / script.name
+        os.chdir(sandbox)
+        os.environ["MOCYNO_ROOT"] = str(sandbox)
+        os.environ["MOCYNO_PUBLIC_DIR"] = str(sandbox / "public")
+        sys.argv = [str(target)] + args
+        start = time.perf_counter_ns()
+        with trace_regex(profiler):
+            try:
+                runpy.run_path(str(target), run_name="__main__")
+            except SystemExit:
+                pass
+        profiler.record("script", script.name, start, page=None)
+        public = str(sandbox / "public") + os.sep
+        for span in profiler.spans:
+            if span.page and span.page.startswith(public):
+                span.page = span.page[len(public):].replace(os.sep, "/")
+    finally:
+        os.chdir(old_cwd)
+        sys.argv = old_argv
+        for name, value in old_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        if keep:
+            print(f"[OK] Sandbox kept: {sandbox}")
+        else:
+            shutil.rmtree(sandbox, ignore_errors=True)
+    return profiler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile a legacy fixer's regexes on a copy of public/.")
+    parser.add_argument("script", type=Path, help="e.g. scripts/final_head_cleanup.py")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER, help="arguments passed to the script")
+    parser.add_argument("--profile-json", type=Path, metavar="PATH", help="write per-regex timings as JSON")
+    parser.add_argument("--trace", type=Path, metavar="PATH", help="write a Chrome trace (chrome://tracing)")
+    parser.add_argument("--top", type=int, default=15, help="rows in the console summary")
+    parser.add_argument("--keep", action="store_true", help="keep the sandbox directory")
+    args = parser.parse_args(argv)
+
+    script = args.script if args.script.exists() else SCRIPTS_DIR / args.script.name
+    if not script.exists():
+        print(f"[ERREUR] Script introuvable : {args.script}")
+        return 2
+
+    print(f"\n[PROFILE] {script.name}")
+    print("=" * 117)
+    profiler = profile_script(script, args.script_args, keep=args.keep)
+
+    paged = [s for s in profiler.spans if s.stage == "regex" and s.page]
+    if not paged:
+        print("[WARN] No regex call touched an HTML page "
+              "(hard-coded ROOT_DIR outside the repo?)")
+    profiler.print_summary(args.top)
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+        print(f"\n[OK] Profile : {args.profile_json}")
+    if args.trace:
+        profiler.write_chrome_trace(args.trace)
+        print(f"[OK] Trace   : {args.trace}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
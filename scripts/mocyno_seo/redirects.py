@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+REDIRECTS - firebase.json checks
+Checks every redirect of the hosting target against the files in
+public/, offline, through the hosting simulator:
+
+  broken     destination ends on a 404
+  loop       following the redirect comes back to a URL already seen
+  chain      more than one redirect hop before the final page
+  shadowed   an earlier rule already catches this source
+  dead-file  a file exists at the source path but is never served
+             (redirects win over static content)
+
+Imports only json and the hosting model, so it starts instantly.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import Finding, write_jsonl
+from .hosting import HostingSimulator, load_hosting
+from .site import iter_site_files
+
+ERROR, WARN = "error", "warn"
+
+
+def check(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH,
+          target: Optional[str] = None, sim: Optional[HostingSimulator] = None) -> List[Dict]:
+    """sim: an already-built simulator of the site (the gate shares one)."""
+    if sim is None:
+        sim = HostingSimulator(iter_site_files(public_dir), load_hosting(firebase_json, target))
+    issues: List[Dict] = []
+
+    def add(severity: str, kind: str, rule: Dict, index: int, detail: str) -> None:
+        issues.append({"severity": severity, "kind": kind, "index": index,
+                       "source": rule.get("source") or rule.get("regex"),
+                       "destination": rule.get("destination"), "detail": detail})
+
+    for index, rule in enumerate(sim.redirects.rules):
+        source = rule.get("source")
+        if source is None or any(c in source for c in "*?{}:"):
+            # Patterns: only the destination can be checked
+            dest = rule.get("destination", "")
+            if dest and not any(c in dest for c in "*:") and not dest.startswith("http"):
+                final = sim.resolve(dest)
+                if final.status == 404:
+                    add(ERROR, "broken", rule, index, f"{dest} -> 404")
+            continue
+
+        hit = sim.redirects.match(source)
+        if hit and hit[0] is not rule:
+            winner = sim.redirects.rules.index(hit[0])
+            add(WARN, "shadowed", rule, index, f"rule #{winner} ({hit[0].get('source')}) matches first")
+            continue
+
+        rel = source.lstrip("/")
+        if rel and (rel in sim.files or rel.rstrip("/") + "/index.html" in sim.files
+                    or (sim.clean_urls and rel.rstrip("/") + ".html" in sim.files)):
+            add(WARN, "dead-file", rule, index, "a file exists at this path but the redirect always wins")
+
+        hops = sim.follow(source)
+        final = hops[-1]
+        if final.is_redirect:
+            add(ERROR, "loop", rule, index, " -> ".join(h.path for h in hops))
+        elif final.status == 404:
+            add(ERROR, "broken", rule, index, f"{final.path} -> 404")
+        elif sum(1 for h in hops if h.is_redirect) > 1:
+            add(WARN, "chain", rule, index, " -> ".join(h.path for h in hops))
+    return issues
+
+
+def to_findings(issues: List[Dict]) -> List[Finding]:
+    # Keyed on the source, not the rule index, which moves as rules are added
+    return [Finding(f"redirects/{i['kind']}", i["severity"], "firebase.json",
+                    f"{i['source']} -> {i['destination']} ({i['detail']})",
+                    f"redirects[{i['index']}]", key=f"{i['source']} -> {i['destination']}")
+            for i in issues]
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    return to_findings(check(public_dir, firebase_json))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check firebase.json redirects against public/.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--target", help="hosting target name (default: first)")
+    parser.add_argument("--json", action="store_true", help="print issues as JSON")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write findings as JSON lines")
+    args = parser.parse_args(argv)
+
+    issues = check(args.src, args.firebase, args.target)
+    if args.jsonl:
+        write_jsonl(to_findings(issues), args.jsonl)
+    if args.json:
+        print(json.dumps(issues, indent=2))
+    else:
+        rules = len(load_hosting(args.firebase, args.target).get("redirects", []))
+        print(f"\n[REDIRECTS] {rules} redirections, {len(issues)} probleme(s)")
+        print("=" * 70)
+        for issue in issues:
+            marker = "[ERREUR]" if issue["severity"] == ERROR else "[WARN]"
+            print(f"{marker:8} #{issue['index']:<3} {issue['kind']:9} {issue['source']} -> "
+                  f"{issue['destination']}  ({issue['detail']})")
+        if not issues:
+            print("[OK] Toutes les redirections aboutissent en un saut")
+    return 1 if any(i["severity"] == ERROR for i in issues) else 0
+
+
+def resolve_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Show what the live site answers for URLs, offline.")
+    parser.add_argument("paths", nargs="+", help="paths or https://mocyno.com URLs")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    args = parser.parse_args(argv)
+
+    sim = HostingSimulator(iter_site_files(args.src), load_hosting(args.firebase))
+    worst = 0
+    for raw in args.paths:
+        hops = sim.follow((urlsplit(raw).path or "/") if "://" in raw else raw)
+        print(raw)
+        for hop in hops:
+            target = hop.location if hop.is_redirect else (hop.file or "(dynamic)")
+            print(f"   {hop.status}  {hop.path} -> {target}")
+        if hops[-1].status >= 400:
+            worst = 1
+    return worst
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+ROBOTS - robots.txt and llms.txt consistency
+Parses public/robots.txt and public/llms.txt and resolves every URL and
+path they list, offline, through the firebase.json redirect matcher
+(HostingSimulator) and the SEO inventory:
+
+  robots/sitemap-broken      Sitemap: answers 404
+  robots/sitemap-redirect    Sitemap: goes through a redirect
+  robots/sitemap-host        Sitemap: on another host than BASE_URL
+  robots/blocks-indexable    a Disallow for * hides an indexable page
+  llms/404                   listed URL or path answers 404
+  llms/redirect              listed URL redirects (stale pre-migration form)
+  llms/not-canonical         listed URL is served but is not the page's canonical
+  llms/noindex               listed URL is a noindex page
+
+`llms generate` rewrites llms.txt (llmstxt.org layout) from the inventory
+in one pass: every indexable, self-canonical page under its canonical
+URL, grouped by language and section, with hand-written blocks that list
+no URL (directives, FAQ) carried over.
+"""
+
+import argparse
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import BASE_URL, FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import ERROR, SEVERITY_MARKERS, WARN, Finding, write_jsonl
+from .hosting import HostingSimulator, load_hosting
+from .hreflang import url_key
+from .inventory import DEFAULT_DB, Inventory
+from .loader import read_text, write_if_changed
+from .site import iter_site_files
+
+_SITE_HOST = urlsplit(BASE_URL).netloc
+_URL_RE = re.compile(r"https?://[^\s<>()\"']+")
+_PATH_RE = re.compile(r"(?<![\w/])/[\w\-./]*")
+# llms.txt directive lines whose values are site paths
+_PATH_DIRECTIVES = ("allow", "disallow")
+LANG_ORDER = ("fr", "en")
+SECTION_TITLES = {
+    "fr": {"": "Pages", "services": "Services", "zones": "Zones d'intervention", "blog": "Actualites"},
+    "en": {"": "Pages", "services": "Services", "zones": "Areas", "blog": "News"},
+}
+
+
+def _is_site_host(netloc: str) -> bool:
+    host = netloc.lower()
+    return (host[4:] if host.startswith("www.") else host) == _SITE_HOST
+
+
+# rel_path -> (canonical, robots) of a page, or None when it is not a page
+PageMeta = Callable[[str], Optional[Tuple[Optional[str], Optional[str]]]]
+
+
+# --- robots.txt --------------------------------------------------------------
+
+class RobotsTxt:
+    """Groups of user-agents with their allow/disallow rules, and Sitemap lines."""
+
+    def __init__(self, text: str):
+        self.groups: List[Tuple[List[str], List[Tuple[str, str, int]]]] = []
+        self.sitemaps: List[Tuple[str, int]] = []
+        agents: List[str] = []
+        rules: List[Tuple[str, str, int]] = []
+        for number, raw in enumerate(text.splitlines(), 1):
+            line = raw.split("#", 1)[0].strip()
+            key, sep, value = line.partition(":")
+            if not sep:
+                continue
+            key, value = key.strip().lower(), value.strip()
+            if key == "user-agent":
+                if rules:
+                    self.groups.append((agents, rules))
+                    agents, rules = [], []
+                agents.append(value.lower())
+            elif key in ("allow", "disallow"):
+                rules.append((key, value, number))
+            elif key == "sitemap":
+                self.sitemaps.append((value, number))
+        if agents or rules:
+            self.groups.append((agents, rules))
+
+    def rules_for(self, agent: str = "*") -> List[Tuple[str, str, int]]:
+        agent = agent.lower()
+        for agents, rules in self.groups:
+            if agent in agents:
+                return rules
+        return next((rules for agents, rules in self.groups if "*" in agents), [])
+
+    @staticmethod
+    def _pattern(value: str) -> "re.Pattern":
+        anchored = value.endswith("$")
+        body = re.escape(value[:-1] if anchored else value).replace(r"\*", ".*")
+        return re.compile(body + ("$" if anchored else ""))
+
+    def blocking_rule(self, path: str, agent: str = "*") -> Optional[Tuple[str, str, int]]:
+        """The Disallow deciding path for agent (longest match; Allow wins ties), or None."""
+        best: Optional[Tuple[str, str, int]] = None
+        for rule in self.rules_for(agent):
+            kind, value, _ = rule
+            if not value or not self._pattern(value).match(path):
+                continue
+            if best is None or len(value) > len(best[1]) or (len(value) == len(best[1]) and kind == "allow"):
+                best = rule
+        return best if best and best[0] == "disallow" else None
+
+
+# --- llms.txt ----------------------------------------------------------------
+
+def llms_entries(text: str) -> List[Tuple[int, str]]:
+    """(line, URL or path) for every URL, and every path of an Allow/Disallow directive."""
+    out = []
+    for number, line in enumerate(text.splitlines(), 1):
+        urls = _URL_RE.findall(line)
+        out.extend((number, u.rstrip(".,;:")) for u in urls)
+        key, sep, value = line.partition(":")
+        if sep and key.strip().lower() in _PATH_DIRECTIVES and not urls:
+            out.extend((number, p) for p in _PATH_RE.findall(value))
+    return out
+
+
+def _inventory_meta(public_dir: Path, db_path: Path) -> PageMeta:
+    with Inventory(db_path) as inv:
+        inv.update(public_dir)
+        rows = {r["rel_path"]: (r["canonical"], r["robots"]) for r in inv.pages()}
+    return rows.get
+
+
+def check(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH,
+          sim: Optional[HostingSimulator] = None, page_meta: Optional[PageMeta] = None,
+          db_path: Path = DEFAULT_DB) -> List[Finding]:
+    """
+    sim / page_meta: a prebuilt simulator and page lookup (the gate shares
+    its parse); by default the simulator is built here and pages come
+    from the SEO inventory.
+    """
+    public_dir = Path(public_dir)
+    if sim is None:
+        sim = HostingSimulator(iter_site_files(public_dir), load_hosting(firebase_json))
+    if page_meta is None:
+        page_meta = _inventory_meta(public_dir, db_path)
+    out: List[Finding] = []
+
+    robots_path = public_dir / "robots.txt"
+    robots = RobotsTxt(read_text(robots_path)) if robots_path.is_file() else RobotsTxt("")
+    for url, line in robots.sitemaps:
+        parts = urlsplit(url)
+        if parts.netloc and not _is_site_host(parts.netloc):
+            out.append(Finding("robots/sitemap-host", WARN, "robots.txt", f"{url} is not on {_SITE_HOST}",
+                               f"line {line}", key=url))
+            continue
+        hops = sim.follow(parts.path or "/")
+        if hops[-1].status == 404:
+            out.append(Finding("robots/sitemap-broken", ERROR, "robots.txt", f"{url} -> 404", f"line {line}"))
+        elif len(hops) > 1:
+            out.append(Finding("robots/sitemap-redirect", WARN, "robots.txt", f"{url} -> {hops[-1].path}",
+                               f"line {line}", key=url))
+    for rel in sorted(sim.files):
+        meta = page_meta(rel)
+        if not meta or not meta[0] or "noindex" in (meta[1] or "").lower():
+            continue
+        path = urlsplit(meta[0]).path or "/"
+        if sim.resolve(path).file != rel:
+            continue
+        rule = robots.blocking_rule(path)
+        if rule:
+            out.append(Finding("robots/blocks-indexable", WARN, "robots.txt",
+                               f"Disallow: {rule[1]} hides {path} ({rel})", f"line {rule[2]}", key=path))
+
+    llms_path = public_dir / "llms.txt"
+    if llms_path.is_file():
+        for line, entry in llms_entries(read_text(llms_path)):
+            parts = urlsplit(entry)
+            if parts.netloc and not _is_site_host(parts.netloc):
+                continue
+            where = f"line {line}"
+            hops = sim.follow(parts.path or "/")
+            final = hops[-1]
+            if final.status == 404:
+                out.append(Finding("llms/404", ERROR, "llms.txt", f"{entry} -> 404", where, key=entry))
+                continue
+            if len(hops) > 1:
+                out.append(Finding("llms/redirect", WARN, "llms.txt", f"{entry} -> {final.path}", where, key=entry))
+            meta = page_meta(final.file) if final.file else None
+            if not meta or not parts.netloc:
+                continue  # directive paths are prefixes, not pages
+            canonical, robots_meta = meta
+            if "noindex" in (robots_meta or "").lower():
+                out.append(Finding("llms/noindex", WARN, "llms.txt", f"{entry} is noindex ({final.file})",
+                                   where, key=entry))
+            elif canonical and len(hops) == 1 and url_key(canonical) != url_key(entry):
+                out.append(Finding("llms/not-canonical", WARN, "llms.txt",
+                                   f"{entry} canonical is {canonical}", where, key=entry))
+    return out
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    return check(public_dir, firebase_json)
+
+
+# --- llms.txt generation -----------------------------------------------------
+
+def _kept_blocks(text: str) -> List[List[str]]:
+    """Blank-line separated blocks of the current file that list no URL."""
+    blocks, current = [], []
+    for line in text.splitlines() + [""]:
+        if line.strip():
+            current.append(line.rstrip())
+        elif current:
+            blocks.append(current)
+            current = []
+    return [b for b in blocks[1:] if not any(_URL_RE.search(l) for l in b)]
+
+
+def generate(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH,
+             db_path: Path = DEFAULT_DB) -> str:
+    public_dir = Path(public_dir)
+    sim = HostingSimulator(iter_site_files(public_dir), load_hosting(firebase_json))
+    with Inventory(db_path) as inv:
+        inv.update(public_dir)
+        rows = inv.pages()
+
+    # lang -> section -> [(canonical, title, description)]
+    sections: Dict[str, Dict[str, List[Tuple[str, str, str]]]] = defaultdict(lambda: defaultdict(list))
+    home = None
+    for row in rows:
+        canonical = row["canonical"]
+        if not canonical or "noindex" in (row["robots"] or "").lower() or row["lang"] not in LANG_ORDER:
+            continue
+        path = urlsplit(canonical).path or "/"
+        if sim.resolve(path).file != row["rel_path"] or len(sim.follow(path)) > 1:
+            continue
+        segments = [s for s in path.split("/") if s]
+        section = segments[1] if len(segments) > 2 and segments[0] == row["lang"] else ""
+        entry = (canonical, (row["title"] or row["h1"] or path).strip(), (row["description"] or "").strip())
+        if len(segments) == 1 and segments[0] == row["lang"]:
+            if row["lang"] == LANG_ORDER[0]:
+                home = entry
+            sections[row["lang"]][""].insert(0, entry)
+        else:
+            sections[row["lang"]][section if section in SECTION_TITLES[row["lang"]] else ""].append(entry)
+
+    llms_path = public_dir / "llms.txt"
+    current = read_text(llms_path) if llms_path.is_file() else ""
+    title = current.splitlines()[0].lstrip("# ").strip() if current.strip() else (home[1] if home else BASE_URL)
+    lines = [f"# {title}", ""]
+    if home and home[2]:
+        lines += [f"> {home[2]}", ""]
+    for lang in LANG_ORDER:
+        for key, heading in SECTION_TITLES[lang].items():
+            entries = sections[lang].get(key)
+            if not entries:
+                continue
+            lines.append(f"## {heading} ({lang.upper()})")
+            lines.append("")
+            head = [e for e in entries if urlsplit(e[0]).path.strip("/") == lang]
+            for url, name, description in head + sorted(e for e in entries if e not in head):
+                lines.append(f"- [{name}]({url})" + (f": {description}" if description else ""))
+            lines.append("")
+    for block in _kept_blocks(current):
+        heading = block[0].lstrip("# ").strip()
+        lines += [f"## {heading}", ""] + block[1:] + [""]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="robots.txt / llms.txt consistency and llms.txt generation.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    common.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    common.add_argument("--db", type=Path, default=DEFAULT_DB, help="SEO inventory database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("check", parents=[common], help="resolve every robots.txt / llms.txt entry")
+    c.add_argument("--jsonl", type=Path, metavar="PATH", help="also write findings as JSON lines")
+    g = sub.add_parser("generate", parents=[common], help="rebuild llms.txt from the inventory")
+    g.add_argument("--write", action="store_true", help="overwrite public/llms.txt (default: print)")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        text = generate(args.src, args.firebase, args.db)
+        if not args.write:
+            sys.stdout.write(text)
+            return 0
+        if not write_if_changed(Path(args.src) / "llms.txt", text):
+            print("[OK] llms.txt deja a jour")
+            return 0
+        print(f"[OK] llms.txt regenere ({text.count(chr(10) + '- [')} pages)")
+        return 0
+
+    found = check(args.src, args.firebase, db_path=args.db)
+    if args.jsonl:
+        write_jsonl(found, args.jsonl)
+    print(f"\n[ROBOTS] robots.txt + llms.txt : {len(found)} probleme(s)")
+    print("=" * 70)
+    for f in found:
+        print(f"{SEVERITY_MARKERS[f.severity]:8} {f.page}:{f.location:8} {f.rule:24} {f.message}")
+    if not found:
+        print("[OK] Toutes les URL listees sont servies en direct et canoniques")
+    return 1 if any(f.severity == ERROR for f in found) else 0
+
+
+def check_main(argv: Optional[List[str]] = None) -> int:
+    return main(["check"] + list(argv or []))
+
+
+def generate_main(argv: Optional[List[str]] = None) -> int:
+    return main(["generate"] + list(argv or []))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""
+Rule engine
+Text rewrite rules ported from the one-off fixers, applied in memory.
+
+A rule takes page text and returns the rewritten text plus the number of
+substitutions it made, so the caller decides whether anything is written.
+
+Each rule also carries the literals a page must contain for it to match
+(see prefilter.py); the Pipeline skips rules whose literals are absent.
+"""
+
+import hashlib
+import re
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+from . import facades, hints
+from .prefilter import LiteralScanner, rule_literals
+
+
+class Rule:
+    """Base class: a named, versioned text transformation."""
+
+    name = ""
+    description = ""
+    # Bump when the rule output changes so incremental builds redo pages
+    version = 1
+    # Page must contain one of these for the rule to match (empty = always run)
+    literals: FrozenSet[str] = frozenset()
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        raise NotImplementedError
+
+    def apply_to(self, text: str, page: Optional[str]) -> Tuple[str, int]:
+        """apply() for the page at rel path `page`; overridden by rules that depend on it."""
+        return self.apply(text)
+
+
+class ReplaceRule(Rule):
+    """Literal str.replace pairs, optionally skipped when a marker is present."""
+
+    def __init__(self, name: str, pairs: Sequence[Tuple[str, str]],
+                 description: str = "", skip_if: Optional[str] = None, version: int = 1,
+                 literals: Optional[Iterable[str]] = None):
+        self.name = name
+        self.pairs = list(pairs)
+        self.description = description
+        self.skip_if = skip_if
+        self.version = version
+        self.literals = frozenset(literals if literals is not None else (old for old, _ in self.pairs))
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        if self.skip_if is not None and self.skip_if in text:
+            return text, 0
+        count = 0
+        for old, new in self.pairs:
+            hits = text.count(old)
+            if hits:
+                text = text.replace(old, new)
+                count += hits
+        return text, count
+
+
+class RegexRule(Rule):
+    """Compiled re.subn pairs."""
+
+    def __init__(self, name: str, subs: Sequence[Tuple[str, Union[str, Callable]]],
+                 description: str = "", flags: int = 0, version: int = 1,
+                 literals: Optional[Iterable[str]] = None):
+        self.name = name
+        self.subs = [(re.compile(pattern, flags), repl) for pattern, repl in subs]
+        self.description = description
+        self.version = version
+        # Derived from the patterns unless given explicitly
+        self.literals = rule_literals([pattern for pattern, _ in subs], literals, flags)
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        count = 0
+        for pattern, repl in self.subs:
+            if callable(repl):
+                text, hits = self._sub_changed(pattern, repl, text)
+            else:
+                text, hits = pattern.subn(repl, text)
+            count += hits
+        return text, count
+
+    @staticmethod
+    def _sub_changed(pattern: "re.Pattern", repl: Callable, text: str) -> Tuple[str, int]:
+        """pattern.sub with a callback; a match it returns unchanged is not counted."""
+        hits = 0
+
+        def counted(m: "re.Match") -> str:
+            nonlocal hits
+            out = repl(m)
+            if out != m.group(0):
+                hits += 1
+            return out
+
+        return pattern.sub(counted, text), hits
+
+
+class FacadeRule(Rule):
+    """Widget loaders -> placeholders + the shared /scripts/facades.js (facades.py)."""
+
+    name = "facades"
+    description = "Defer GTM / tawk.to / Maps behind placeholders and one shared loader (facades.py)"
+    literals = frozenset(facades.LITERALS)
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        text, hits = facades.rewrite(text)
+        return text, sum(hits.values())
+
+
+class HintRule(Rule):
+    """
+    Each page's resource hints from its own dependencies (hints.py).
+
+    Every page gets a plan, so there is no literal gate: the rule is not a
+    default and build_site.py --hints appends it, planned on the build's
+    source tree. The site's .css / .js files feed the plan, so their hash
+    is part of the version and an edit to them rebuilds every page.
+    """
+
+    name = "hints"
+    description = "Add the page's preload / preconnect / dns-prefetch, drop stale ones (hints.py)"
+
+    def __init__(self, planner: "hints.Planner"):
+        self.planner = planner
+        self.version = f"1.{planner.fingerprint}"
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        return self.apply_to(text, None)
+
+    def apply_to(self, text: str, page: Optional[str]) -> Tuple[str, int]:
+        rel = page or "index.html"
+        if hints.category_of(rel).name in hints.SKIPPED_CATEGORIES:
+            return text, 0
+        text, added, removed = hints.rewrite(text, self.planner.plan(hints.parse_page(text), text, rel))
+        return text, len(added) + len(removed)
+
+
+# --- link_cnaps.py ---------------------------------------------------------
+
+CNAPS_TARGET_URL = "https://teleservices-cnaps.interieur.gouv.fr/teleservices/ihm/#/morale/search"
+CNAPS_LINK_HTML = (
+    f'<a href="{CNAPS_TARGET_URL}" target="_blank" rel="noopener noreferrer" '
+    f'style="color:#fff;text-decoration:underline;">AUT-83-2124-09-09-20250998415</a>'
+)
+CNAPS_FR_SEARCH = "Autorisation CNAPS : AUT-83-2124-09-09-20250998415"
+CNAPS_EN_SEARCH = "CNAPS licence: AUT-83-2124-09-09-20250998415"
+
+# --- bump_css_version.py ---------------------------------------------------
+
+CSS_VERSION = "2.8"
+
+
+def _raise_css_version(m: "re.Match") -> str:
+    """styles.css?v=<CSS_VERSION> for older versions; a newer bump is left as is."""
+    current = tuple(int(part) for part in m.group(1).split("."))
+    if current >= tuple(int(part) for part in CSS_VERSION.split(".")):
+        return m.group(0)
+    return f"styles.css?v={CSS_VERSION}"
+
+# --- optimize_tawk_lazy.py -------------------------------------------------
+
+TAWK_PATTERN = r'<!--Start of Tawk\.to Script-->.*?<!--End of Tawk\.to Script-->'
+TAWK_OPTIMIZED = '''<!--Start of Tawk.to Script (Optimized Lazy Load)-->
+<script type="text/javascript">
+  // Lazy load Tawk.to after 3s OR on user scroll/interaction
+  (function() {
+    var tawkLoaded = false;
+
+    function loadTawk() {
+      if (tawkLoaded) return;
+      tawkLoaded = true;
+
+      var Tawk_API = Tawk_API || {}, Tawk_LoadStart = new Date();
+      var s1 = document.createElement("script"), s0 = document.getElementsByTagName("script")[0];
+      s1.async = true;
+      s1.src = 'https://embed.tawk.to/693452a684fc15197fdfc2a0/1jbq65n5t';
+      s1.charset = 'UTF-8';
+      s1.setAttribute('crossorigin', '*');
+      s0.parentNode.insertBefore(s1, s0);
+    }
+
+    // Load after 3 seconds
+    setTimeout(loadTawk, 3000);
+
+    // OR load on first scroll/interaction
+    var events = ['scroll', 'mousemove', 'touchstart', 'click'];
+    var loadOnce = function() {
+      loadTawk();
+      events.forEach(function(event) {
+        window.removeEventListener(event, loadOnce);
+      });
+    };
+
+    events.forEach(function(event) {
+      window.addEventListener(event, loadOnce, { passive: true, once: true });
+    });
+  })();
+</script>
+<!--End of Tawk.to Script (Optimized Lazy Load)-->'''
+
+
+RULES: Dict[str, Rule] = {rule.name: rule for rule in (
+    ReplaceRule(
+        "cnaps-link",
+        [
+            (CNAPS_FR_SEARCH, f"Autorisation CNAPS : {CNAPS_LINK_HTML}"),
+            (CNAPS_EN_SEARCH, f"CNAPS licence: {CNAPS_LINK_HTML}"),
+        ],
+        description="Link the CNAPS licence number to the public register (link_cnaps.py)",
+        skip_if=CNAPS_LINK_HTML,
+    ),
+    ReplaceRule(
+        "double-slash",
+        [
+            ("https://mocyno.com/fr//", "https://mocyno.com/fr/"),
+            ("https://mocyno.com/en//", "https://mocyno.com/en/"),
+        ],
+        description="Collapse /fr// and /en// in absolute URLs (fix_doubleslash.py)",
+    ),
+    RegexRule(
+        "css-version",
+        [
+            (r'styles\.css\?v=(\d+(?:\.\d+)*)', _raise_css_version),
+            (r'styles-compat-patch\.css\?v=hero-fix-1', f"styles-compat-patch.css?v={CSS_VERSION}"),
+        ],
+        description=f"Raise older styles.css cache-busters to v={CSS_VERSION} (bump_css_version.py)",
+        version=2,
+    ),
+    RegexRule(
+        "tawk-lazy",
+        [(TAWK_PATTERN, lambda m: TAWK_OPTIMIZED)],
+        description="Swap the inline Tawk.to loader for the lazy one (optimize_tawk_lazy.py)",
+        flags=re.DOTALL,
+    ),
+    FacadeRule(),
+)}
+
+DEFAULT_RULES = ("cnaps-link", "double-slash", "css-version", "tawk-lazy", "facades")
+
+
+class Pipeline:
+    """Ordered list of rules applied to one page at a time."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules: List[Rule] = list(rules)
+        self.scanner = LiteralScanner(lit for rule in self.rules for lit in rule.literals)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "Pipeline":
+        names = list(names)
+        unknown = [n for n in names if n not in RULES]
+        if unknown:
+            raise KeyError(f"Unknown rule(s): {', '.join(unknown)} (available: {', '.join(RULES)})")
+        return cls(RULES[n] for n in names)
+
+    @property
+    def fingerprint(self) -> str:
+        """Changes whenever the rule list, order or a rule version changes."""
+        spec = ";".join(f"{r.name}@{r.version}" for r in self.rules)
+        return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:12]
+
+    def needs(self, found: Iterable[str]) -> bool:
+        """Whether any rule can match a page containing the `found` literals."""
+        found = set(found)
+        return any(not rule.literals or not found.isdisjoint(rule.literals) for rule in self.rules)
+
+    def run(self, text: str, profiler=None, page: Optional[str] = None,
+            found: Optional[Iterable[str]] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Apply every rule in order, skipping rules whose literals are absent.
+
+        The page is scanned once for all rule literals; it is rescanned
+        only if a rule rewrote it, since a rewrite can add literals that a
+        later rule needs. Pass `found` when the caller already scanned the
+        page (e.g. on its raw bytes).
+
+        With a Profiler, the scan is recorded as a "prefilter" span and
+        each rule that runs as a "rule" span (bytes in, match count).
+
+        Returns:
+            (new_text, {rule_name: substitutions}) for rules that matched
+        """
+        hits: Dict[str, int] = {}
+        found = set(found) if found is not None else None
+        for rule in self.rules:
+            if rule.literals:
+                if found is None:
+                    found = self._scan(text, profiler, page)
+                if found.isdisjoint(rule.literals):
+                    continue
+            if profiler is None:
+                new_text, count = rule.apply_to(text, page)
+            else:
+                start, nbytes = time.perf_counter_ns(), len(text)
+                new_text, count = rule.apply_to(text, page)
+                profiler.record("rule", rule.name, start, nbytes, count, page)
+            if count:
+                hits[rule.name] = count
+            if new_text is not text and new_text != text:
+                found = None
+            text = new_text
+        return text, hits
+
+    def _scan(self, text: str, profiler, page: Optional[str]):
+        if profiler is None:
+            return self.scanner.scan(text)
+        start = time.perf_counter_ns()
+        found = self.scanner.scan(text)
+        profiler.record("prefilter", None, start, len(text), len(found), page)
+        return found
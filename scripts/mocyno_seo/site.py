@@ -0,0 +1,43 @@
+"""
+Site tree walking
+Enumerates the files Firebase Hosting would serve from a public/ tree.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator
+
+from .config import APP_SHELL_DIRS, PUBLIC_DIR, SKIP_DIRS, SKIP_SUFFIXES
+
+
+def iter_site_files(root: Path = PUBLIC_DIR) -> Iterator[str]:
+    """
+    Yield every deployable file under root as a POSIX relative path.
+
+    Mirrors the firebase.json "ignore" list: dotfiles, node_modules and
+    the .bak copies left behind by the in-place fixers.
+    """
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")
+        )
+        rel_dir = Path(dirpath).relative_to(root)
+        for name in sorted(filenames):
+            if name.startswith(".") or name.endswith(SKIP_SUFFIXES):
+                continue
+            yield (rel_dir / name).as_posix()
+
+
+def is_html(rel_path: str) -> bool:
+    return rel_path.endswith(".html")
+
+
+def is_app_shell(rel_path: str) -> bool:
+    """True for the Vite-built admin/client/mobile bundles."""
+    return rel_path.split("/", 1)[0] in APP_SHELL_DIRS
+
+
+def is_site_page(rel_path: str) -> bool:
+    """HTML page of the marketing site (what the fixers operate on)."""
+    return is_html(rel_path) and not is_app_shell(rel_path)
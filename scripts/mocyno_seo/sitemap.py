@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+SITEMAP - entry checks
+Follows robots.txt / sitemap-index.xml down to every <loc> and checks,
+offline through the hosting simulator, that each entry:
+
+  answers 200 without a redirect
+  is the canonical URL of the page it serves
+  is not noindex
+  belongs to a category that is listed (not legal / system, classify.py)
+
+and lists the pages the classifier puts in a sitemap that no sitemap
+mentions, and the indexable pages of a listed category that it cannot
+put in one because they declare no canonical URL. `generate` rebuilds
+sitemap-fr.xml / sitemap-en.xml from the same classification
+(inclusion, priority, changefreq).
+
+<lastmod> follows the content, not the checkout: the page's JSON-LD
+dateModified, else the date of the last commit touching the file, else
+(untracked or locally modified) its mtime.
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from .classify import LANGS, PageClass, classify
+from .config import BASE_URL, FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import ERROR as FINDING_ERROR, WARN as FINDING_WARN, Finding, write_jsonl
+from .hosting import HostingSimulator, load_hosting
+from .hreflang import url_key
+from .loader import read_text, write_if_changed
+from .pagemodel import PageModel, parse_page
+from .site import is_site_page, iter_site_files
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ERROR, WARN = "error", "warn"
+_DATE_MODIFIED = re.compile(r'"dateModified"\s*:\s*"(\d{4}-\d{2}-\d{2})')
+
+
+def _git(public_dir: Path, *args: str) -> List[str]:
+    try:
+        proc = subprocess.run(["git", "-c", "core.quotepath=off", "-C", str(public_dir)] + list(args),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return []
+    return proc.stdout.splitlines() if proc.returncode == 0 else []
+
+
+def commit_dates(public_dir: Path) -> Dict[str, str]:
+    """
+    {rel: YYYY-MM-DD of the last commit touching it} for the files whose
+    working copy matches HEAD; {} outside a git checkout.
+    """
+    dates: Dict[str, str] = {}
+    date = ""
+    # Newest first: the first date seen for a file is its last commit
+    for line in _git(public_dir, "log", "--format=%x00%cs", "--name-only", "--relative", "--", "."):
+        if line.startswith("\0"):
+            date = line[1:]
+        elif line and line not in dates:
+            dates[line] = date
+    for rel in _git(public_dir, "diff", "--name-only", "--relative", "HEAD", "--", "."):
+        dates.pop(rel, None)
+    return dates
+
+
+def lastmod(public_dir: Path, rel: str, dates: Dict[str, str]) -> str:
+    found = _DATE_MODIFIED.search(read_text(Path(public_dir) / rel))
+    if found:
+        return found.group(1)
+    if rel in dates:
+        return dates[rel]
+    return time.strftime("%Y-%m-%d", time.localtime((Path(public_dir) / rel).stat().st_mtime))
+
+
+def robots_sitemaps(public_dir: Path) -> List[str]:
+    robots = public_dir / "robots.txt"
+    if not robots.exists():
+        return []
+    found = []
+    for line in read_text(robots).splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            found.append(value.strip())
+    return found
+
+
+def read_sitemaps(public_dir: Path, roots: List[str]) -> Dict[str, List[str]]:
+    """{sitemap file: [loc, ...]} following sitemap indexes."""
+    result: Dict[str, List[str]] = {}
+    pending = list(roots)
+    while pending:
+        rel = urlsplit(pending.pop(0)).path.lstrip("/")
+        if rel in result or not (public_dir / rel).is_file():
+            continue
+        try:
+            root = ET.fromstring((public_dir / rel).read_bytes())
+        except ET.ParseError as exc:
+            print(f"[ERREUR] {rel} : XML invalide ({exc})")
+            result[rel] = []
+            continue
+        locs = [loc.text.strip() for loc in root.iter(SITEMAP_NS + "loc") if loc.text]
+        if root.tag == SITEMAP_NS + "sitemapindex":
+            pending.extend(locs)
+            result[rel] = []
+        else:
+            result[rel] = locs
+    return result
+
+
+def check(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH,
+          roots: Optional[List[str]] = None, sim: Optional[HostingSimulator] = None,
+          pages: Optional[Dict[str, PageModel]] = None,
+          classes: Optional[Dict[str, PageClass]] = None) -> Dict:
+    """sim / pages / classes: an already-built simulator, page models and classes to reuse (the gate shares them)."""
+    public_dir = Path(public_dir)
+    if sim is None:
+        sim = HostingSimulator(iter_site_files(public_dir), load_hosting(firebase_json))
+    files = sorted(sim.files)
+    roots = roots or robots_sitemaps(public_dir) or ["/sitemap.xml"]
+    sitemaps = read_sitemaps(public_dir, roots)
+
+    models: Dict[str, PageModel] = dict(pages or {})
+
+    def model(rel: str):
+        if rel not in models:
+            models[rel] = parse_page(read_text(public_dir / rel))
+        return models[rel]
+
+    classes = dict(classes or {})
+
+    def page_class(rel: str) -> PageClass:
+        if rel not in classes:
+            classes[rel] = classify(rel, model(rel))
+        return classes[rel]
+
+    issues: List[Dict] = []
+    listed: Set[str] = set()
+    for sitemap, locs in sitemaps.items():
+        seen: Set[str] = set()
+        for loc in locs:
+            def add(severity: str, kind: str, detail: str) -> None:
+                issues.append({"severity": severity, "kind": kind, "sitemap": sitemap,
+                               "loc": loc, "detail": detail})
+            if loc in seen:
+                add(WARN, "duplicate", "listed twice in this sitemap")
+                continue
+            seen.add(loc)
+            hops = sim.follow(urlsplit(loc).path or "/")
+            final = hops[-1]
+            if final.status == 404:
+                add(ERROR, "404", "no page at this URL")
+                continue
+            if len(hops) > 1:
+                add(WARN, "redirect", f"-> {final.path}")
+            if not final.file or not final.file.endswith(".html"):
+                continue
+            listed.add(final.file)
+            page = model(final.file)
+            robots = (page.robots or "").lower()
+            if "noindex" in robots:
+                add(ERROR, "noindex", f"{final.file} has robots={page.robots}")
+            if page.canonical and url_key(page.canonical) != url_key(loc):
+                add(WARN, "not-canonical", f"{final.file} canonical is {page.canonical}")
+            category = page_class(final.file).category
+            if not category.sitemap:
+                add(WARN, "excluded", f"{final.file} is a {category.name} page")
+
+    unlisted, no_canonical = [], []
+    for rel in files:
+        if not is_site_page(rel) or rel in listed:
+            continue
+        page = page_class(rel)
+        if page.category.sitemap and page.indexable and not model(rel).canonical:
+            # Not self-canonical, so classify() keeps it out: it would vanish silently
+            no_canonical.append(rel)
+            continue
+        if not page.sitemap:
+            continue
+        served = sim.resolve(urlsplit(model(rel).canonical).path or "/")
+        if served.file == rel:
+            unlisted.append(rel)
+    return {"sitemaps": {k: len(v) for k, v in sitemaps.items()}, "issues": issues, "unlisted": unlisted,
+            "no_canonical": no_canonical}
+
+
+def to_findings(report: Dict) -> List[Finding]:
+    out = [Finding(f"sitemap/{i['kind']}", i["severity"], i["sitemap"], f"{i['loc']} ({i['detail']})",
+                   i["loc"], key=i["loc"]) for i in report["issues"]]
+    out.extend(Finding("sitemap/unlisted", FINDING_WARN, rel, "indexable page missing from the sitemaps")
+               for rel in report["unlisted"])
+    out.extend(Finding("sitemap/no-canonical", FINDING_ERROR, rel,
+                       "indexable page without rel=canonical, left out of the sitemaps")
+               for rel in report["no_canonical"])
+    return out
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    return to_findings(check(public_dir, firebase_json))
+
+
+def entries(public_dir: Path, sim: HostingSimulator, pages: Dict[str, PageModel],
+            classes: Dict[str, PageClass]) -> Dict[str, List[Dict]]:
+    """
+    {lang: [{loc, lastmod, priority, changefreq}]} for every page the
+    classifier puts in a sitemap and that its canonical URL serves
+    directly, so a page kept under two file names is listed once. A
+    canonical written in another form (".html/") falls back to its clean
+    URL.
+    """
+    out: Dict[str, List[Dict]] = {lang: [] for lang in LANGS}
+    dates = commit_dates(public_dir)
+    for rel in sorted(classes):
+        page = classes[rel]
+        if not page.sitemap or page.lang not in out:
+            continue
+        canonical = pages[rel].canonical
+        for path in (urlsplit(canonical).path or "/", url_key(canonical).rstrip("/") + "/"):
+            answer = sim.get(path)
+            if answer.status == 200 and answer.file == rel:
+                break
+        else:
+            continue
+        out[page.lang].append({"loc": BASE_URL + path, "lastmod": lastmod(public_dir, rel, dates),
+                               "priority": page.priority, "changefreq": page.changefreq})
+    for urls in out.values():
+        urls.sort(key=lambda u: (-float(u["priority"]), u["loc"]))
+    return out
+
+
+def render(urls: List[Dict]) -> str:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for u in urls:
+        lines += ["  <url>",
+                  f"    <loc>{escape(u['loc'])}</loc>",
+                  f"    <lastmod>{u['lastmod']}</lastmod>",
+                  f"    <changefreq>{u['changefreq']}</changefreq>",
+                  f"    <priority>{u['priority']}</priority>",
+                  "  </url>"]
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def generate_main(argv: Optional[List[str]] = None) -> int:
+    from .watch import SiteState
+
+    parser = argparse.ArgumentParser(description="Rebuild sitemap-<lang>.xml from the page classification.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--write", action="store_true", help="overwrite the sitemaps (default: show the changes)")
+    args = parser.parse_args(argv)
+
+    state = SiteState(args.src, args.firebase)
+    by_lang = entries(args.src, state.sim, state.pages, state.classes)
+    print("\n[SITEMAP] generation depuis la classification des pages")
+    print("=" * 70)
+    for lang, urls in by_lang.items():
+        rel = f"sitemap-{lang}.xml"
+        current = set(read_sitemaps(Path(args.src), [rel]).get(rel, []))
+        locs = {u["loc"] for u in urls}
+        print(f"[OK] {rel}: {len(urls)} URL(s)")
+        for loc in sorted(locs - current):
+            print(f"   + {loc}")
+        for loc in sorted(current - locs):
+            print(f"   - {loc}")
+        if args.write and not write_if_changed(Path(args.src) / rel, render(urls)):
+            print("   (inchange)")
+    if not args.write:
+        print("[INFO] Simulation : --write pour reecrire les fichiers")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check sitemap entries against public/ and firebase.json.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--sitemap", action="append", metavar="PATH",
+                        help="sitemap to start from (default: those listed in robots.txt)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write findings as JSON lines")
+    args = parser.parse_args(argv)
+
+    report = check(args.src, args.firebase, args.sitemap)
+    if args.jsonl:
+        write_jsonl(to_findings(report), args.jsonl)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        total = sum(report["sitemaps"].values())
+        print(f"\n[SITEMAP] {total} URL(s) dans " + ", ".join(f"{k} ({v})" for k, v in report["sitemaps"].items()))
+        print("=" * 70)
+        for issue in report["issues"]:
+            marker = "[ERREUR]" if issue["severity"] == ERROR else "[WARN]"
+            print(f"{marker:8} {issue['kind']:13} {issue['loc']}  ({issue['sitemap']}: {issue['detail']})")
+        if report["unlisted"]:
+            print(f"\n[WARN] {len(report['unlisted'])} page(s) indexable(s) absente(s) des sitemaps :")
+            for rel in report["unlisted"]:
+                print(f"   • {rel}")
+        if report["no_canonical"]:
+            print(f"\n[ERREUR] {len(report['no_canonical'])} page(s) indexable(s) sans canonical, "
+                  "exclue(s) des sitemaps :")
+            for rel in report["no_canonical"]:
+                print(f"   • {rel}")
+        if not report["issues"] and not report["unlisted"] and not report["no_canonical"]:
+            print("[OK] Sitemaps coherents")
+    return 1 if any(i["severity"] == ERROR for i in report["issues"]) or report["no_canonical"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
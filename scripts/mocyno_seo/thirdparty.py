@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+THIRDPARTY - script inventory and load order
+Records, from the SiteState parse (one pass over every page), each page's
+scripts and resource hints:
+
+  script   src or sha1 of the inline body, async / defer / module,
+           head or body, line, and the third-party origins it loads:
+           its own src, or the URLs an inline loader or a first-party
+           .js file injects (GTM, tawk.to ...)
+  hint     preconnect / dns-prefetch / preload / modulepreload / prefetch
+
+Checks (rule ids):
+  scripts/parser-blocking   classic script with src, neither async nor
+                            defer: ERROR for a third party, WARN in <head>
+  scripts/consent-missing   page without the consent gate (consent-ga.js,
+                            replaces fix_consent_script.py's FILES_TO_CHECK)
+  scripts/ungated-tracker   a tracker origin loaded immediately, before
+                            the deferred consent gate has run
+  hints/preconnect-unused   preconnect / dns-prefetch to an origin the
+                            page never loads
+
+    python scripts/mocyno-seo.py audit scripts              # origins, scripts, hints
+    python scripts/mocyno-seo.py audit scripts --page fr/index.html
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from .classify import BY_NAME
+from .config import BASE_URL, FIREBASE_JSON_PATH, PUBLIC_DIR
+from .findings import ERROR, WARN, Finding, write_jsonl
+from .loader import read_text
+from .pagemodel import ScriptTag, site_path
+
+SITE_ORIGIN = BASE_URL
+CONSENT_GATES = ("/consent-ga.js",)
+# Origins that set cookies / track: must wait for the consent gate
+TRACKER_HOSTS = ("googletagmanager.com", "google-analytics.com", "doubleclick.net",
+                 "connect.facebook.net", "clarity.ms", "hotjar.com", "snap.licdn.com")
+# Origins a resource fetches from in turn (Google Fonts CSS -> font files)
+IMPLIED_ORIGINS = {"https://fonts.googleapis.com": ("https://fonts.gstatic.com",)}
+# Categories that are not site pages for this audit (Vite bundles ship their own policy)
+SKIPPED_CATEGORIES = ("app-shell",)
+
+# URL literals a script loads: assigned to .src / .href, set as src / href,
+# fetched or imported. Links and SVG namespaces in strings do not count.
+_URL_IN_JS = re.compile(
+    r"""(?:\.(?:src|href)\s*=\s*|setAttribute\(\s*["'](?:src|href)["']\s*,\s*|"""
+    r"""(?:fetch|import|importScripts)\(\s*)["'](https?:)?//([a-z0-9.-]+\.[a-z]{2,})(?::\d+)?[/"'?]""",
+    re.IGNORECASE)
+# Inline code that waits for an event or a timer before running
+_DEFERRED_JS = re.compile(r"addEventListener\s*\(|setTimeout\s*\(|requestIdleCallback\s*\(|\bonload\s*=")
+
+
+def origin_of(url: str) -> Optional[str]:
+    """scheme://host of an absolute URL on another site, None for the site itself and paths."""
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+    host = parts.netloc.lower()
+    if (host[4:] if host.startswith("www.") else host) == urlsplit(SITE_ORIGIN).netloc:
+        return None
+    return f"{parts.scheme or 'https'}://{host}"
+
+
+def injected_origins(code: str) -> List[str]:
+    """Third-party origins a piece of JavaScript refers to in string literals."""
+    seen: Dict[str, None] = {}
+    for m in _URL_IN_JS.finditer(code):
+        origin = origin_of(f"{m.group(1) or 'https:'}//{m.group(2)}")
+        if origin:
+            seen.setdefault(origin)
+    return list(seen)
+
+
+def is_tracker(origin: str) -> bool:
+    host = urlsplit(origin).netloc
+    return any(host == t or host.endswith("." + t) for t in TRACKER_HOSTS)
+
+
+class ScriptInfo:
+    __slots__ = ("page", "line", "in_head", "src", "digest", "mode", "origins", "via", "immediate")
+
+    def __init__(self, page: str, tag: ScriptTag, origins: List[str], via: str):
+        self.page = page
+        self.line = tag.line
+        self.in_head = tag.in_head
+        self.src = tag.src
+        self.digest = None if tag.src else hashlib.sha1(tag.text.strip().encode("utf-8")).hexdigest()[:12]
+        attrs = tag.attrs
+        if (attrs.get("type") or "").lower() == "module":
+            self.mode = "module"
+        elif "async" in attrs:
+            self.mode = "async"
+        elif "defer" in attrs and tag.src:
+            self.mode = "defer"
+        else:
+            self.mode = "blocking" if tag.src else "inline"
+        self.origins = origins
+        # How the origins are reached: "src", "inline" loader or "file" (first-party .js)
+        self.via = via
+        # Runs while the page is parsed (third parties it injects load before deferred scripts)
+        self.immediate = self.mode in ("blocking", "inline") and not (
+            tag.text is not None and _DEFERRED_JS.search(tag.text))
+
+    @property
+    def label(self) -> str:
+        return self.src or f"inline:{self.digest}"
+
+    def to_dict(self) -> Dict:
+        return {"line": self.line, "position": "head" if self.in_head else "body", "script": self.label,
+                "mode": self.mode, "origins": self.origins, "via": self.via}
+
+
+class Inventory:
+    """Scripts, hints and third-party origins of every page."""
+
+    def __init__(self, public_dir: Path, pages: Dict, classes: Optional[Dict] = None):
+        self.public_dir = Path(public_dir)
+        self.scripts: Dict[str, List[ScriptInfo]] = {}
+        self.hints: Dict[str, List] = {}
+        # page -> origins of its other references (stylesheets, fonts, images, frames)
+        self.loaded: Dict[str, Set[str]] = {}
+        # origin -> pages loading it
+        self.origins: Dict[str, Set[str]] = defaultdict(set)
+        self._file_origins: Dict[str, List[str]] = {}
+        skipped = {BY_NAME[name] for name in SKIPPED_CATEGORIES}
+        for rel in sorted(pages):
+            if classes is not None and rel in classes and classes[rel].category in skipped:
+                continue
+            model = pages[rel]
+            infos = [self.script_info(rel, tag) for tag in model.scripts]
+            self.scripts[rel] = infos
+            self.hints[rel] = model.hints
+            self.loaded[rel] = {o for o in (origin_of(r.url) for r in model.references
+                                            if r.kind != "link") if o}
+            for info in infos:
+                for origin in info.origins:
+                    self.origins[origin].add(rel)
+
+    def script_info(self, rel: str, tag: ScriptTag) -> ScriptInfo:
+        """Load mode and third-party origins of one script tag of rel."""
+        if tag.src is None:
+            return ScriptInfo(rel, tag, injected_origins(tag.text or ""), "inline")
+        origin = origin_of(tag.src)
+        if origin:
+            return ScriptInfo(rel, tag, [origin], "src")
+        path = site_path(tag.src, rel)
+        return ScriptInfo(rel, tag, self.file_origins(path) if path else [], "file")
+
+    def file_origins(self, path: str) -> List[str]:
+        """Origins a first-party .js file loads; each file is read once."""
+        if path not in self._file_origins:
+            file = self.public_dir / path.lstrip("/")
+            self._file_origins[path] = injected_origins(read_text(file)) if file.is_file() else []
+        return self._file_origins[path]
+
+    def check(self) -> List[Finding]:
+        out: List[Finding] = []
+        for rel, infos in self.scripts.items():
+            gates = [i for i in infos if i.src and urlsplit(i.src).path in CONSENT_GATES]
+            if not gates:
+                out.append(Finding("scripts/consent-missing", ERROR, rel,
+                                   f"no consent gate ({', '.join(CONSENT_GATES)})"))
+            for info in infos:
+                third_party = info.via == "src"
+                if info.mode == "blocking" and (third_party or info.in_head):
+                    out.append(Finding("scripts/parser-blocking", ERROR if third_party else WARN, rel,
+                                       f"{info.src} blocks parsing ({'head' if info.in_head else 'body'})",
+                                       f"line {info.line}", key=info.src))
+                trackers = [o for o in info.origins if is_tracker(o)]
+                if trackers and (info.immediate or not gates):
+                    reason = "runs before the consent gate" if gates else "page has no consent gate"
+                    out.append(Finding("scripts/ungated-tracker", WARN, rel,
+                                       f"{info.label} loads {', '.join(trackers)}: {reason}",
+                                       f"line {info.line}", key=f"{info.label} {trackers}"))
+            loaded = self.loaded[rel] | {o for info in infos for o in info.origins}
+            loaded |= {i for o in list(loaded) for i in IMPLIED_ORIGINS.get(o, ())}
+            for hint, href, _, line in self.hints[rel]:
+                origin = origin_of(href)
+                if hint in ("preconnect", "dns-prefetch") and origin and origin not in loaded:
+                    out.append(Finding("hints/preconnect-unused", WARN, rel,
+                                       f"{hint} {origin}: nothing on the page loads from it",
+                                       f"line {line}", key=f"{hint} {origin}"))
+        return out
+
+    def summary(self) -> Dict:
+        by_script: Dict[str, Dict] = {}
+        for infos in self.scripts.values():
+            for info in infos:
+                entry = by_script.setdefault(info.label, {"pages": 0, "modes": set(), "origins": info.origins})
+                entry["pages"] += 1
+                entry["modes"].add(f"{info.mode}/{'head' if info.in_head else 'body'}")
+        return {
+            "origins": {o: len(p) for o, p in sorted(self.origins.items(), key=lambda kv: -len(kv[1]))},
+            "scripts": {k: {"pages": v["pages"], "modes": sorted(v["modes"]), "origins": v["origins"]}
+                        for k, v in sorted(by_script.items(), key=lambda kv: -kv[1]["pages"])},
+        }
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    from .watch import SiteState
+
+    state = SiteState(public_dir, firebase_json)
+    return Inventory(public_dir, state.pages, state.classes).check()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .watch import SiteState
+
+    parser = argparse.ArgumentParser(description="Inventory scripts, resource hints and third-party origins.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--page", action="append", metavar="REL_PATH", help="print this page's scripts and hints")
+    parser.add_argument("--json", action="store_true", help="print the inventory as JSON")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="also write the checks as JSON lines")
+    args = parser.parse_args(argv)
+
+    state = SiteState(args.src, args.firebase)
+    inventory = Inventory(args.src, state.pages, state.classes)
+    found = inventory.check()
+    if args.jsonl:
+        write_jsonl(found, args.jsonl)
+    if args.json:
+        pages = args.page or list(inventory.scripts)
+        print(json.dumps({"summary": inventory.summary(),
+                          "pages": {rel: {"scripts": [i.to_dict() for i in inventory.scripts.get(rel, [])],
+                                          "hints": [{"rel": h, "href": href, "as": as_, "line": line}
+                                                    for h, href, as_, line in inventory.hints.get(rel, [])]}
+                                    for rel in pages}}, indent=2))
+        return 0
+
+    for rel in args.page or []:
+        print(f"\n[PAGE] {rel}")
+        for info in inventory.scripts.get(rel, []):
+            origins = f" -> {', '.join(info.origins)}" if info.origins else ""
+            print(f"   L{info.line:<5} {'head' if info.in_head else 'body':4} {info.mode:8} {info.label}{origins}")
+        for hint, href, as_, line in inventory.hints.get(rel, []):
+            print(f"   L{line:<5} hint {hint:13} {href}" + (f" (as={as_})" if as_ else ""))
+
+    summary = inventory.summary()
+    print(f"\n[SCRIPTS] {len(inventory.scripts)} page(s), {len(summary['scripts'])} script(s) distinct(s), "
+          f"{len(summary['origins'])} origine(s) tierce(s)")
+    print("=" * 70)
+    for origin, count in summary["origins"].items():
+        tag = " (tracker)" if is_tracker(origin) else ""
+        print(f"   {count:>4} page(s)  {origin}{tag}")
+    print("-" * 70)
+    for label, entry in summary["scripts"].items():
+        origins = f" -> {', '.join(entry['origins'])}" if entry["origins"] else ""
+        print(f"   {entry['pages']:>4} page(s)  {label:<32} {', '.join(entry['modes'])}{origins}")
+    print("-" * 70)
+    for f in found:
+        print(f)
+    if not found:
+        print("[OK] Aucun script bloquant, consentement present partout")
+    return 1 if any(f.severity == ERROR for f in found) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+URLMAP - internal link migration
+Rewrites internal URLs through a mapping table (old path -> new URL) of
+any size. update_internal_links() in fix_seo_strict.py compiled one
+regex per TARGET_MAPPING entry and scanned every page once per entry;
+here each page is tokenized once:
+
+  href / src / srcset / action / poster / data-* attribute values
+  content values that are URLs (og:url, twitter:image, ...)
+  JSON-LD "url", "item", "contentUrl", "logo", "image" ("@id" names an
+  entity, it is not a link, and is left alone)
+
+and every site URL found is looked up in one dict, so the cost follows
+the page size, not the number of mappings.
+
+Keys are normalised the way Firebase matches clean URLs: scheme and
+host of mocyno.com (with or without www) dropped, leading slash added,
+query / fragment dropped, trailing slash ignored. The rewritten URL
+keeps the original's form (absolute stays absolute), its query and its
+fragment unless the target brings its own. Chains (a -> b, b -> c) are
+collapsed when the map is compiled, so a link takes one lookup.
+
+    python scripts/mocyno-seo.py fix migrate --map moves.csv
+    python scripts/mocyno-seo.py fix migrate --from-redirects --write
+
+Map files: CSV / TSV with two columns (an "old,new" header is skipped)
+or JSON, either an object {"old": "new"} like the legacy TARGET_MAPPING
+dicts or a list of [old, new] pairs.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import posixpath
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import BASE_URL, FIREBASE_JSON_PATH, PUBLIC_DIR
+from .hosting import HostingSimulator, load_hosting
+from .rules import Rule
+from .site import is_site_page, iter_site_files
+
+_SITE_HOST = urlsplit(BASE_URL).netloc.lower()
+_GLOB_CHARS = re.compile(r"[*?{}:!\[\]]")
+
+# One pass per page: URL-bearing attributes, then JSON-LD keys
+_TOKEN = re.compile(
+    r"""(?P<attr>\b(?:href|src|srcset|action|poster|content|data-[\w-]+)\s*=\s*)"""
+    r"""(?:"(?P<dq>[^"<>]*)"|'(?P<sq>[^'<>]*)')"""
+    r"""|(?P<key>"(?:url|item|contentUrl|logo|image)"\s*:\s*")(?P<jv>[^"\\]*)\"""",
+    re.IGNORECASE,
+)
+# Attributes whose relative values are resolved against the page
+_RELATIVE_ATTRS = ("href", "src", "srcset", "action", "poster")
+
+
+def _is_site_host(netloc: str) -> bool:
+    host = netloc.lower()
+    return (host[4:] if host.startswith("www.") else host) == _SITE_HOST
+
+
+def _strip_slash(path: str) -> str:
+    return path.rstrip("/") or "/"
+
+
+def normalize_key(url: str) -> Optional[str]:
+    """Lookup key of a site URL or path, None for another host or scheme."""
+    parts = urlsplit(url.strip())
+    if parts.scheme and parts.scheme not in ("http", "https"):
+        return None
+    if parts.netloc and not _is_site_host(parts.netloc):
+        return None
+    path = parts.path or "/"
+    return _strip_slash(path if path.startswith("/") else "/" + path)
+
+
+def page_base(rel: str) -> str:
+    """URL directory a page's relative links resolve against ("fr/zones/index.html" -> "/fr/zones/")."""
+    return "/" + posixpath.dirname(rel) + "/" if "/" in rel else "/"
+
+
+class UrlMap:
+    """Compiled old -> new table: one dict lookup per URL."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]] = ()):
+        self.table: Dict[str, str] = {}
+        # Rows dropped at compile time: (old, new, reason)
+        self.rejected: List[Tuple[str, str, str]] = []
+        for old, new in pairs:
+            self.add(old, new)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def add(self, old: str, new: str) -> None:
+        key = normalize_key(old)
+        new = new.strip()
+        if key is None or not new:
+            self.rejected.append((old, new, "not a site URL" if key is None else "empty target"))
+            return
+        if not urlsplit(new).netloc and not new.startswith("/"):
+            new = "/" + new
+        if normalize_key(new) == key:
+            self.rejected.append((old, new, "maps to itself"))
+            return
+        if key in self.table and self.table[key] != new:
+            self.rejected.append((old, new, f"duplicate, kept {self.table[key]}"))
+            return
+        self.table[key] = new
+
+    @classmethod
+    def load(cls, path: Path) -> "UrlMap":
+        path = Path(path)
+        urlmap = cls()
+        if path.suffix.lower() == ".json":
+            data = json.loads(path.read_text(encoding="utf-8"))
+            rows = data.items() if isinstance(data, dict) else data
+            for old, new in rows:
+                urlmap.add(old, new)
+            return urlmap
+        with open(path, encoding="utf-8", newline="") as handle:
+            dialect = "excel-tab" if path.suffix.lower() == ".tsv" else "excel"
+            for number, row in enumerate(csv.reader(handle, dialect)):
+                if len(row) < 2 or row[0].lstrip().startswith("#"):
+                    continue
+                if number == 0 and normalize_key(row[0]) == "/old":
+                    continue
+                urlmap.add(row[0], row[1])
+        return urlmap
+
+    @classmethod
+    def from_redirects(cls, sim: HostingSimulator) -> "UrlMap":
+        """Literal firebase.json redirects, each pointing at the page it finally serves."""
+        urlmap = cls()
+        for rule in sim.redirects.rules:
+            source = rule.get("source", "")
+            if "regex" in rule or not source or _GLOB_CHARS.search(source):
+                continue
+            final = sim.resolve(source)
+            if final.status == 200:
+                urlmap.add(source, final.path)
+            else:
+                urlmap.rejected.append((source, rule.get("destination", ""), f"redirect ends on {final.status}"))
+        return urlmap
+
+    def compile(self, sim: Optional[HostingSimulator] = None) -> "UrlMap":
+        """
+        Collapse chains so every key maps straight to its last target, and
+        with a simulator drop rows whose target does not answer 200 (a
+        migration must never rewrite a link into a 404 or a redirect).
+        """
+        collapsed: Dict[str, str] = {}
+        for key, target in self.table.items():
+            seen = {key}
+            nxt = normalize_key(target)
+            while nxt in self.table and nxt not in seen:
+                seen.add(nxt)
+                target = self._merge(target, self.table[nxt])
+                nxt = normalize_key(target)
+            if nxt in seen:
+                self.rejected.append((key, self.table[key], "loop"))
+            else:
+                collapsed[key] = target
+        self.table = collapsed
+        if sim is not None:
+            for key, target in list(self.table.items()):
+                parts = urlsplit(target)
+                if parts.netloc and not _is_site_host(parts.netloc):
+                    continue
+                answer = sim.get(parts.path or "/")
+                if answer.status != 200:
+                    detail = f"-> {answer.location}" if answer.is_redirect else ""
+                    self.rejected.append((key, self.table.pop(key), f"target answers {answer.status} {detail}".rstrip()))
+        return self
+
+    @property
+    def fingerprint(self) -> str:
+        raw = "\n".join(f"{k}\t{v}" for k, v in sorted(self.table.items()))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+    @staticmethod
+    def _merge(original: str, target: str) -> str:
+        """target, keeping original's query / fragment unless target has its own."""
+        o, t = urlsplit(original), urlsplit(target)
+        query = t.query or o.query
+        fragment = t.fragment or o.fragment
+        out = target.split("#", 1)[0].split("?", 1)[0]
+        return out + (f"?{query}" if query else "") + (f"#{fragment}" if fragment else "")
+
+    def rewrite_url(self, value: str, base: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """(matched key, new value) for one URL, or None when it is not mapped."""
+        if not value or value[0] == "#":
+            return None
+        parts = urlsplit(value)
+        if parts.scheme and parts.scheme not in ("http", "https"):
+            return None
+        if parts.netloc:
+            if not _is_site_host(parts.netloc):
+                return None
+            origin, path = value[:value.index(parts.netloc) + len(parts.netloc)], parts.path or "/"
+        elif parts.path.startswith("/"):
+            origin, path = "", parts.path
+        elif base is not None and parts.path:
+            origin = ""
+            path = posixpath.normpath(posixpath.join(base, parts.path))
+            if parts.path.endswith("/"):
+                path += "/"
+        else:
+            return None
+        key = _strip_slash(path)
+        target = self.table.get(key)
+        if target is None:
+            return None
+        if origin and not urlsplit(target).netloc:
+            target = origin + target
+        elif not origin and _is_site_host(urlsplit(target).netloc or "-"):
+            # Site-relative link to a target written as an absolute site URL
+            t = urlsplit(target)
+            target = target[target.index(t.netloc) + len(t.netloc):] or "/"
+        new = self._merge(value, target)
+        return None if new == value else (key, new)
+
+    def rewrite(self, text: str, base: Optional[str] = None) -> Tuple[str, Counter]:
+        """
+        Rewrite every mapped URL of a page.
+
+        Args:
+            base: page_base() of the page, to resolve relative links
+                  (None leaves relative links alone)
+
+        Returns:
+            (new_text, Counter of old key -> rewrites)
+        """
+        hits: Counter = Counter()
+
+        def one(value: str, relative: bool) -> str:
+            hit = self.rewrite_url(value, base if relative else None)
+            if hit is None:
+                return value
+            hits[hit[0]] += 1
+            return hit[1]
+
+        def repl(m: "re.Match") -> str:
+            if m.group("key"):
+                return m.group("key") + one(m.group("jv"), False) + '"'
+            attr = m.group("attr")
+            name = attr.split("=")[0].strip().lower()
+            quote, value = ('"', m.group("dq")) if m.group("dq") is not None else ("'", m.group("sq"))
+            if name == "content" and not value.startswith(("/", "http")):
+                return m.group(0)
+            relative = name in _RELATIVE_ATTRS
+            if name == "srcset":
+                new = ", ".join(" ".join([one(c.split()[0], relative)] + c.split()[1:])
+                                for c in value.split(",") if c.strip())
+                if new.replace(" ", "") == value.replace(" ", ""):
+                    return m.group(0)
+            else:
+                new = one(value, relative)
+            return f"{attr}{quote}{new}{quote}"
+
+        new_text = _TOKEN.sub(repl, text)
+        return (text, hits) if not hits else (new_text, hits)
+
+
+class UrlMapRule(Rule):
+    """Build-pipeline rule around a compiled UrlMap (root-relative and absolute links only)."""
+
+    name = "url-map"
+    description = "Rewrite internal URLs through a migration table (urlmap.py)"
+
+    def __init__(self, urlmap: UrlMap):
+        self.urlmap = urlmap
+        # The table is part of the output: a new table rebuilds every page
+        self.version = f"1.{urlmap.fingerprint}"
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        text, hits = self.urlmap.rewrite(text)
+        return text, sum(hits.values())
+
+
+def migrate(public_dir: Path, urlmap: UrlMap, write: bool = False) -> Dict[str, Counter]:
+    """Rewrite every site page; {rel: Counter of old key -> rewrites} for pages that change."""
+    public_dir = Path(public_dir)
+    changed: Dict[str, Counter] = {}
+    for rel in iter_site_files(public_dir):
+        if not is_site_page(rel):
+            continue
+        path = public_dir / rel
+        # Bytes in, bytes out: line endings stay as they are
+        text = path.read_bytes().decode("utf-8")
+        new_text, hits = urlmap.rewrite(text, page_base(rel))
+        if not hits:
+            continue
+        changed[rel] = hits
+        if write:
+            path.write_bytes(new_text.encode("utf-8"))
+    return changed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Migrate internal links through an old -> new URL table.")
+    parser.add_argument("--map", action="append", type=Path, default=[], metavar="FILE",
+                        help="CSV / TSV / JSON mapping table (repeatable, later files lose on conflicts)")
+    parser.add_argument("--from-redirects", action="store_true",
+                        help="also map every literal firebase.json redirect to the page it serves")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--no-verify", action="store_true", help="keep targets that do not answer 200")
+    parser.add_argument("--write", action="store_true", help="rewrite the pages (default: dry run)")
+    parser.add_argument("--show", type=int, default=10, help="pages / mappings listed")
+    args = parser.parse_args(argv)
+
+    if not args.map and not args.from_redirects:
+        parser.error("give --map FILE and/or --from-redirects")
+
+    sim = HostingSimulator(iter_site_files(args.src), load_hosting(args.firebase))
+    urlmap = UrlMap.from_redirects(sim) if args.from_redirects else UrlMap()
+    for path in args.map:
+        try:
+            loaded = UrlMap.load(path)
+        except (OSError, ValueError) as exc:
+            print(f"[ERREUR] {path}: {exc}")
+            return 2
+        urlmap.rejected.extend(loaded.rejected)
+        for key, target in loaded.table.items():
+            urlmap.add(key, target)
+    urlmap.compile(None if args.no_verify else sim)
+
+    print(f"\n[MIGRATE] {len(urlmap)} correspondance(s)" + ("" if args.write else " (simulation)"))
+    print("=" * 70)
+    for old, new, reason in urlmap.rejected[:args.show]:
+        print(f"[WARN]   ignore {old} -> {new} ({reason})")
+    if len(urlmap.rejected) > args.show:
+        print(f"         ... +{len(urlmap.rejected) - args.show}")
+
+    changed = migrate(args.src, urlmap, write=args.write)
+    totals: Counter = Counter()
+    for hits in changed.values():
+        totals.update(hits)
+    for rel in sorted(changed, key=lambda r: -sum(changed[r].values()))[:args.show]:
+        print(f"   {sum(changed[rel].values()):>4}  {rel}")
+    if len(changed) > args.show:
+        print(f"         ... +{len(changed) - args.show} page(s)")
+    print("-" * 70)
+    for key, count in totals.most_common(args.show):
+        print(f"   {count:>4}  {key} -> {urlmap.table[key]}")
+    verb = "reecrites" if args.write else "a reecrire"
+    print(f"[OK] {sum(totals.values())} URL(s) {verb} dans {len(changed)} page(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
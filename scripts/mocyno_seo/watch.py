@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+WATCH - continuous validation
+Keeps the site in memory (page models, link graph, hreflang clusters,
+Firebase hosting model) and, on every save, revalidates only what the
+change can affect: the page itself, the pages that reference it and the
+pages of its hreflang cluster.
+
+Changes are picked up with inotify on Linux (through ctypes, no extra
+dependency) and by polling mtimes elsewhere or with --poll.
+
+Checks (rule ids):
+  head/title-count, head/meta-description-count, head/og-description-count
+      exactly one of each inside <head> (validate_seo_tags.py)
+  head/canonical-missing, head/canonical-broken, head/canonical-redirect
+  links/broken        link or asset answers 404 (audit_links_seo.py)
+  links/redirect      internal link goes through a firebase.json redirect
+  links/anchor-missing  "#fragment" names no id / <a name> on the target page
+  hreflang/broken, hreflang/not-reciprocal
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .classify import PageClass, classify
+from .config import FIREBASE_JSON_PATH, PUBLIC_DIR, SKIP_DIRS, SKIP_SUFFIXES
+from .findings import Finding, write_jsonl
+from .hosting import HostingSimulator, Response, load_hosting
+from .hreflang import HreflangIndex, page_key, url_key
+from .loader import read_text
+from .pagemodel import ALWAYS_VALID_FRAGMENTS, PageModel, fragment_of, parse_page, site_path
+from .site import is_site_page, iter_site_files
+
+ERROR, WARN = "error", "warn"
+SEVERITY_MARKERS = {ERROR: "[ERREUR]", WARN: "[WARN]"}
+
+# Editors save through temporary files; a burst of events is one change
+DEBOUNCE_S = 0.03
+# Swap, backup and temp files editors leave next to the page
+IGNORED_NAME_SUFFIXES = ("~", ".swp", ".swx", ".tmp", ".part") + SKIP_SUFFIXES
+
+
+class Diagnostic:
+    __slots__ = ("rule", "severity", "page", "line", "message")
+
+    def __init__(self, rule: str, severity: str, page: str, message: str, line: int = 0):
+        self.rule = rule
+        self.severity = severity
+        self.page = page
+        self.line = line
+        self.message = message
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return self.rule, self.page, self.message
+
+    def __str__(self) -> str:
+        where = f"{self.page}:{self.line}" if self.line else self.page
+        return f"{SEVERITY_MARKERS[self.severity]} {where} {self.rule} {self.message}"
+
+    def to_finding(self) -> Finding:
+        return Finding(self.rule, self.severity, self.page, self.message,
+                       f"line {self.line}" if self.line else "")
+
+
+class SiteState:
+    """In-memory model of public/ kept up to date change by change."""
+
+    def __init__(self, public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH):
+        self.public_dir = Path(public_dir)
+        self.firebase_json = Path(firebase_json)
+        self.pages: Dict[str, PageModel] = {}
+        # page -> category, language, indexability (classify.py), kept with its model
+        self.classes: Dict[str, PageClass] = {}
+        # page -> keys it references; key -> pages referencing it (reverse link graph)
+        self.refs: Dict[str, Set[str]] = {}
+        self.inbound: Dict[str, Set[str]] = defaultdict(set)
+        self.diagnostics: Dict[str, List[Diagnostic]] = {}
+        self._resolved: Dict[str, List[Response]] = {}
+        self.sim = HostingSimulator(iter_site_files(self.public_dir), self._hosting())
+        for rel in sorted(self.sim.files):
+            if is_site_page(rel):
+                self._load_page(rel)
+        self.index = self._build_index()
+
+    # --- model -------------------------------------------------------------
+
+    def _hosting(self) -> Dict:
+        return load_hosting(self.firebase_json) if self.firebase_json.exists() else {}
+
+    def _build_index(self) -> HreflangIndex:
+        pages = [(rel, (m.lang or "").split("-")[0].lower() or None) for rel, m in self.pages.items()]
+        links = [(rel, hl, href) for rel, m in self.pages.items() for hl, href in m.hreflangs]
+        return HreflangIndex(pages, links)
+
+    def follow(self, path: str) -> List[Response]:
+        hops = self._resolved.get(path)
+        if hops is None:
+            hops = self._resolved[path] = self.sim.follow(path)
+        return hops
+
+    @staticmethod
+    def _ref_key(path: str) -> str:
+        """Key under which a referenced path is recorded in the reverse graph."""
+        return url_key(path) or path
+
+    def _file_keys(self, rel: str) -> Set[str]:
+        """Keys of every path that can serve rel."""
+        return {page_key(rel), "/" + rel}
+
+    def _load_page(self, rel: str) -> None:
+        model = parse_page(read_text(self.public_dir / rel))
+        self.pages[rel] = model
+        self.classes[rel] = classify(rel, model)
+        keys = set()
+        for ref in model.references:
+            path = site_path(ref.url, rel)
+            if path:
+                keys.add(self._ref_key(path))
+        for _, href in model.hreflangs:
+            path = site_path(href, rel) if href else None
+            if path:
+                keys.add(self._ref_key(path))
+        for key in self.refs.get(rel, ()):
+            self.inbound[key].discard(rel)
+        self.refs[rel] = keys
+        for key in keys:
+            self.inbound[key].add(rel)
+
+    def _drop_page(self, rel: str) -> None:
+        self.pages.pop(rel, None)
+        self.classes.pop(rel, None)
+        self.diagnostics.pop(rel, None)
+        for key in self.refs.pop(rel, ()):
+            self.inbound[key].discard(rel)
+
+    def referrers(self, rel: str) -> Set[str]:
+        found: Set[str] = set()
+        for key in self._file_keys(rel):
+            found |= self.inbound.get(key, set())
+        return found
+
+    def cluster(self, rel: str) -> Set[str]:
+        c = self.index.cluster_of.get(rel)
+        return set(c.pages) if c else set()
+
+    def apply(self, changed: Iterable[str]) -> Set[str]:
+        """
+        Take file changes (POSIX paths relative to public/, or
+        "firebase.json") into the model; return the pages to revalidate.
+        """
+        affected: Set[str] = set()
+        hreflangs_changed = False
+        for rel in changed:
+            if rel == "firebase.json":
+                self.sim = HostingSimulator(self.sim.files, self._hosting())
+                self._resolved.clear()
+                affected |= set(self.pages)
+                continue
+            exists = (self.public_dir / rel).is_file()
+            if exists != (rel in self.sim.files):
+                (self.sim.add_file if exists else self.sim.remove_file)(rel)
+                self._resolved.clear()
+            affected |= self.referrers(rel)
+            if not is_site_page(rel):
+                continue
+            affected |= self.cluster(rel)
+            before = self.pages[rel].hreflangs if rel in self.pages else None
+            if exists:
+                self._load_page(rel)
+                affected.add(rel)
+            else:
+                self._drop_page(rel)
+            after = self.pages[rel].hreflangs if rel in self.pages else None
+            if before != after:
+                hreflangs_changed = True
+        if hreflangs_changed:
+            self.index = self._build_index()
+            for rel in list(affected):
+                affected |= self.cluster(rel)
+        return {rel for rel in affected if rel in self.pages}
+
+    # --- checks ------------------------------------------------------------
+
+    def validate(self, rel: str) -> List[Diagnostic]:
+        return self.check_head(rel) + self.check_links(rel) + self.check_anchors(rel) + self.check_hreflang(rel)
+
+    def check_head(self, rel: str) -> List[Diagnostic]:
+        model = self.pages[rel]
+        out: List[Diagnostic] = []
+        for field, rule in (("title", "head/title-count"),
+                            ("meta_description", "head/meta-description-count"),
+                            ("og_description", "head/og-description-count")):
+            count = model.head_counts[field]
+            if count != 1:
+                out.append(Diagnostic(rule, ERROR, rel, f"{count} in <head> (expected 1)"))
+
+        if not model.canonical:
+            out.append(Diagnostic("head/canonical-missing", WARN, rel, "no <link rel=canonical>"))
+        else:
+            path = site_path(model.canonical, rel)
+            if path:
+                hops = self.follow(path)
+                if hops[-1].status == 404:
+                    out.append(Diagnostic("head/canonical-broken", ERROR, rel, f"{model.canonical} -> 404"))
+                elif len(hops) > 1:
+                    out.append(Diagnostic("head/canonical-redirect", WARN, rel,
+                                          f"{model.canonical} -> {hops[-1].path}"))
+        return out
+
+    def check_links(self, rel: str) -> List[Diagnostic]:
+        model = self.pages[rel]
+        out: List[Diagnostic] = []
+        seen: Set[Tuple[str, str]] = set()
+        for ref in model.references:
+            path = site_path(ref.url, rel)
+            if not path or (ref.kind, path) in seen:
+                continue
+            seen.add((ref.kind, path))
+            hops = self.follow(path)
+            final = hops[-1]
+            if final.status == 404 or (final.rule and "destination" in final.rule and final.file is None):
+                out.append(Diagnostic("links/broken", ERROR, rel, f"{ref.kind} {ref.url} -> 404", ref.line))
+            elif ref.kind == "link" and any(h.rule for h in hops[:-1]):
+                out.append(Diagnostic("links/redirect", WARN, rel, f"{ref.url} -> {final.path}", ref.line))
+        return out
+
+    def check_anchors(self, rel: str) -> List[Diagnostic]:
+        """Fragment links: one set lookup in the target page's anchors."""
+        out: List[Diagnostic] = []
+        seen: Set[str] = set()
+        for ref in self.pages[rel].links():
+            path, fragment = site_path(ref.url, rel), fragment_of(ref.url)
+            if not path or fragment in ALWAYS_VALID_FRAGMENTS or ref.url in seen:
+                continue
+            seen.add(ref.url)
+            final = self.follow(path)[-1]
+            target = self.pages.get(final.file) if final.status == 200 and final.file else None
+            if target is not None and fragment not in target.anchors:
+                out.append(Diagnostic("links/anchor-missing", ERROR, rel,
+                                      f"{ref.url}: no id \"{fragment}\" in {final.file}", ref.line))
+        return out
+
+    def check_hreflang(self, rel: str) -> List[Diagnostic]:
+        model = self.pages[rel]
+        out = []
+        cluster = self.index.cluster_of.get(rel)
+        own_lang = (model.lang or "").split("-")[0].lower()
+        is_primary = cluster is not None and cluster.primary.get(own_lang) == rel
+        for hl, href in model.hreflangs:
+            path = site_path(href, rel) if href else None
+            if not path:
+                continue
+            if self.follow(path)[-1].status == 404:
+                out.append(Diagnostic("hreflang/broken", ERROR, rel, f"{hl} {href} -> 404"))
+                continue
+            target = self.index.resolve(href)
+            if not is_primary or hl == "x-default" or target in (None, rel) or target not in self.pages:
+                continue
+            back = {t for _, _, t in self.index.links.get(target, [])}
+            if rel not in back:
+                out.append(Diagnostic("hreflang/not-reciprocal", WARN, rel, f"{hl} {target} does not point back"))
+        return out
+
+    def revalidate(self, pages: Iterable[str]) -> Tuple[List[Diagnostic], List[Diagnostic]]:
+        """Recheck pages; return (new, fixed) diagnostics."""
+        new, fixed = [], []
+        for rel in sorted(pages):
+            before = {d.key: d for d in self.diagnostics.get(rel, [])}
+            current = self.validate(rel)
+            after = {d.key for d in current}
+            new.extend(d for d in current if d.key not in before)
+            fixed.extend(d for k, d in before.items() if k not in after)
+            self.diagnostics[rel] = current
+        return new, fixed
+
+    def all_diagnostics(self) -> List[Diagnostic]:
+        return [d for rel in sorted(self.diagnostics) for d in self.diagnostics[rel]]
+
+
+# --- change sources ----------------------------------------------------------
+
+def _ignored(rel: str) -> bool:
+    parts = rel.split("/")
+    if any(p.startswith(".") or p in SKIP_DIRS for p in parts):
+        return True
+    return parts[-1].endswith(IGNORED_NAME_SUFFIXES) or parts[-1].startswith(".#")
+
+
+class PollingWatcher:
+    """Portable fallback: compares (mtime, size) snapshots."""
+
+    name = "polling"
+
+    def __init__(self, public_dir: Path, extra: Iterable[Path] = (), interval: float = 0.5):
+        self.public_dir = public_dir
+        self.extra = [Path(p) for p in extra]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snap = {}
+        for rel in iter_site_files(self.public_dir):
+            try:
+                st = os.stat(self.public_dir / rel)
+            except OSError:
+                continue
+            snap[rel] = (st.st_mtime_ns, st.st_size)
+        for path in self.extra:
+            if path.exists():
+                st = path.stat()
+                snap[path.name] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            current = self._scan()
+            changed = {k for k in current.keys() | self._snapshot.keys()
+                       if current.get(k) != self._snapshot.get(k)}
+            self._snapshot = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify through libc, one watch per directory under public/."""
+
+    name = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, public_dir: Path, extra: Iterable[Path] = ()):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is Linux only")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.public_dir = public_dir
+        self._dirs: Dict[int, Path] = {}
+        self._extra = {Path(p).name: Path(p) for p in extra}
+        self._extra_wd: Set[int] = set()
+        for parent in {p.parent for p in self._extra.values()}:
+            wd = self._add(parent, recursive=False)
+            if wd is not None:
+                self._extra_wd.add(wd)
+        self._add(public_dir, recursive=True)
+        self.overflowed = False
+
+    def _add(self, directory: Path, recursive: bool) -> Optional[int]:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), self.MASK)
+        if wd < 0:
+            return None
+        self._dirs[wd] = directory
+        if recursive:
+            for entry in os.scandir(directory):
+                if entry.is_dir(follow_symlinks=False) and not _ignored(entry.name):
+                    self._add(Path(entry.path), recursive=True)
+        return wd
+
+    def _remove(self, directory: Path) -> None:
+        """Drop the watches on directory and below; a moved tree would report under its old path."""
+        for wd, watched in list(self._dirs.items()):
+            if watched == directory or directory in watched.parents:
+                # EINVAL when the kernel already dropped it (deleted tree): nothing to do
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dirs[wd]
+
+    def _read(self, timeout: Optional[float]) -> Set[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[str] = set()
+        try:
+            buf = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(buf, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & self.IN_IGNORED:
+                # Watch gone with its directory (deleted, or removed below)
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if wd in self._extra_wd and directory != self.public_dir:
+                if name in self._extra:
+                    changed.add(name)
+                continue
+            if not name:
+                # IN_DELETE_SELF: the parent's IN_DELETE already reported it
+                continue
+            path = directory / name
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and not _ignored(name):
+                    self._add(path, recursive=True)
+                    # Files copied in before the watch existed
+                    prefix = path.relative_to(self.public_dir)
+                    changed.update((prefix / r).as_posix() for r in iter_site_files(path))
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    self._remove(path)
+                    try:
+                        changed.add(path.relative_to(self.public_dir).as_posix() + "/")
+                    except ValueError:
+                        pass
+                continue
+            try:
+                rel = path.relative_to(self.public_dir).as_posix()
+            except ValueError:
+                continue
+            if not _ignored(rel):
+                changed.add(rel)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Changed paths relative to public/; a path ending in "/" is a
+        directory deleted or moved out, with everything that was under it.
+        """
+        changed = self._read(timeout)
+        if changed:
+            # Collect the rest of the burst (write temp + rename, formatters)
+            while True:
+                more = self._read(DEBOUNCE_S)
+                if not more:
+                    break
+                changed |= more
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(public_dir: Path, extra: Iterable[Path], poll: bool = False, interval: float = 0.5):
+    if not poll:
+        try:
+            return InotifyWatcher(public_dir, extra)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(public_dir, extra, interval)
+
+
+def _print_summary(diagnostics: List[Diagnostic]) -> None:
+    by_rule = Counter(d.rule for d in diagnostics)
+    if not by_rule:
+        print("   [OK] Aucun probleme")
+        return
+    for rule, count in sorted(by_rule.items()):
+        severity = next(d.severity for d in diagnostics if d.rule == rule)
+        print(f"   {SEVERITY_MARKERS[severity]:9} {rule:28} {count}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Revalidate pages as they are saved.")
+    parser.add_argument("--src", type=Path, default=PUBLIC_DIR, help="site root (default: public/)")
+    parser.add_argument("--firebase", type=Path, default=FIREBASE_JSON_PATH, help="firebase.json")
+    parser.add_argument("--poll", action="store_true", help="poll mtimes instead of using inotify")
+    parser.add_argument("--interval", type=float, default=0.5, help="polling interval in seconds")
+    parser.add_argument("--once", action="store_true", help="validate everything, print, exit (1 on errors)")
+    parser.add_argument("--no-redirect-warnings", action="store_true", help="hide links/redirect")
+    parser.add_argument("--verbose", action="store_true", help="list every diagnostic at startup")
+    parser.add_argument("--jsonl", type=Path, metavar="PATH", help="write startup diagnostics as findings")
+    args = parser.parse_args(argv)
+
+    def shown(items: List[Diagnostic]) -> List[Diagnostic]:
+        if args.no_redirect_warnings:
+            return [d for d in items if d.rule != "links/redirect"]
+        return items
+
+    start = time.perf_counter()
+    state = SiteState(args.src, args.firebase)
+    state.revalidate(state.pages)
+    elapsed = (time.perf_counter() - start) * 1000
+    diagnostics = shown(state.all_diagnostics())
+    print(f"\n[WATCH] {len(state.pages)} pages, {len(state.sim.files)} fichiers charges en {elapsed:.0f} ms")
+    print("=" * 70)
+    if args.verbose or args.once:
+        for d in diagnostics:
+            print(f"   {d}")
+        print()
+    _print_summary(diagnostics)
+    if args.jsonl:
+        count = write_jsonl((d.to_finding() for d in diagnostics), args.jsonl)
+        print(f"[OK] {count} finding(s) -> {args.jsonl}")
+    if args.once:
+        return 1 if any(d.severity == ERROR for d in diagnostics) else 0
+
+    watcher = make_watcher(state.public_dir, [state.firebase_json], args.poll, args.interval)
+    print(f"\n[WATCH] {watcher.name} sur {state.public_dir} (Ctrl+C pour quitter)")
+    try:
+        while True:
+            changed = watcher.wait()
+            if getattr(watcher, "overflowed", False):
+                watcher.overflowed = False
+                changed |= set(state.sim.files) | set(iter_site_files(state.public_dir))
+            # A directory deleted or moved out: every file the model had under it
+            for prefix in [c for c in changed if c.endswith("/")]:
+                changed.discard(prefix)
+                changed |= {rel for rel in state.sim.files if rel.startswith(prefix)}
+            # Drop temp files that came and went within the burst
+            changed = {c for c in changed if c == "firebase.json" or c in state.sim.files
+                       or (state.public_dir / c).is_file()}
+            if not changed:
+                continue
+            start = time.perf_counter()
+            affected = state.apply(changed)
+            new, fixed = state.revalidate(affected)
+            elapsed = (time.perf_counter() - start) * 1000
+            new, fixed = shown(new), shown(fixed)
+            names = ", ".join(sorted(changed)[:3]) + (" ..." if len(changed) > 3 else "")
+            print(f"\n[{time.strftime('%H:%M:%S')}] {names} -> {len(affected)} page(s) "
+                  f"revalidee(s) en {elapsed:.1f} ms")
+            for d in new:
+                print(f"   + {d}")
+            for d in fixed:
+                print(f"   - [CORRIGE] {d.page} {d.rule} {d.message}")
+            if not new and not fixed:
+                print("   [OK] Aucun changement de diagnostic")
+    except KeyboardInterrupt:
+        print("\n[OK] Arret du watcher")
+    finally:
+        watcher.close()
+    return 0
+
+
+def findings(public_dir: Path = PUBLIC_DIR, firebase_json: Path = FIREBASE_JSON_PATH) -> List[Finding]:
+    state = SiteState(public_dir, firebase_json)
+    state.revalidate(state.pages)
+    return [d.to_finding() for d in state.all_diagnostics()]
+
+
+def once_main(argv: Optional[List[str]] = None) -> int:
+    """Single full pass (mocyno-seo verify site)."""
+    return main(["--once"] + list(argv or []))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+FR/EN structural parity, pairs found through hreflang clusters.
+See mocyno_seo/parity.py (python scripts/parity_fr_en.py --help).
+"""
+
+import sys
+
+from mocyno_seo.parity import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Profile a legacy fixer's regexes on a sandbox copy of public/.
+See mocyno_seo/profile_script.py (python scripts/profile_fixer.py --help).
+"""
+
+import sys
+
+from mocyno_seo.profile_script import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Incremental SEO inventory (SQLite) of public/.
+See mocyno_seo/inventory.py (python scripts/seo_inventory.py --help).
+"""
+
+import sys
+
+from mocyno_seo.inventory import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,14 @@
 import json
+import os
 import re
 
+ROOT_DIR = os.environ.get("MOCYNO_PUBLIC_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public")
+
 FILES = [
-    r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public\index.html",
-    r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public\contact.html",
-    r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public\a-propos.html",
-    r"c:\Users\abdel\Desktop\Mocyno3\mocyno2\public\services\securite-cynophile.html"
+    os.path.join(ROOT_DIR, "index.html"),
+    os.path.join(ROOT_DIR, "contact.html"),
+    os.path.join(ROOT_DIR, "a-propos.html"),
+    os.path.join(ROOT_DIR, "services", "securite-cynophile.html")
 ]
 
 def validate_json_ld(file_path):
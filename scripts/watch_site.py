@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Watch public/ and revalidate changed pages, their referrers and their
+hreflang cluster on every save.
+See mocyno_seo/watch.py (python scripts/watch_site.py --help).
+"""
+
+import sys
+
+from mocyno_seo.watch import main
+
+if __name__ == "__main__":
+    sys.exit(main())